@@ -40,4 +40,50 @@ def create_app():
 	app.register_blueprint(user_profile_bp)
 	app.register_blueprint(utility_bp)
 
+	# the gazetteer is parsed now rather than by the first offline trip
+	if app.config["OFFLINE_GEOCODING"]:
+		from app.gazetteer import get_gazetteer
+
+		get_gazetteer()
+
+	# keep the most requested routes planned ahead of time
+	if app.config["ROUTE_WARMER_INTERVAL_SECONDS"] > 0:
+		from app.route_table import RouteWarmer
+
+		RouteWarmer(app).start()
+
+	# gas prices are read from their on-disk snapshot, kept fresh in the background
+	if app.config["GAS_PRICE_REFRESH_SECONDS"] > 0:
+		from app.gas_prices import gas_prices
+
+		gas_prices.start(app.config["GAS_PRICE_REFRESH_SECONDS"])
+
+	# trip planning runs on worker threads, fed by the travel form
+	from app.trip_jobs import TripJobQueue
+
+	trip_jobs = TripJobQueue(app, workers=app.config["TRIP_JOB_WORKERS"])
+	app.extensions["trip_jobs"] = trip_jobs
+	if trip_jobs.workers > 0:
+		trip_jobs.start()
+
+	# Place search/favorite counts, written through or in write-behind batches
+	from app.place_counters import PlaceCounters
+
+	place_counters = PlaceCounters(
+		app, write_behind=app.config["PLACE_COUNTER_WRITE_BEHIND"]
+	)
+	app.extensions["place_counters"] = place_counters
+	if place_counters.write_behind:
+		place_counters.start()
+
+	# Places created as stubs (LAZY_PLACE_ENRICHMENT) are scraped in the background
+	from app.place_enricher import PlaceEnricher
+
+	place_enricher = PlaceEnricher(
+		app, interval_seconds=app.config["PLACE_ENRICHER_INTERVAL_SECONDS"]
+	)
+	app.extensions["place_enricher"] = place_enricher
+	if place_enricher.interval_seconds > 0:
+		place_enricher.start()
+
 	return app
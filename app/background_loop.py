@@ -0,0 +1,117 @@
+"""
+A long-lived asyncio event loop on a background thread, so synchronous Flask views can
+run the async route-planning pipeline without building a new loop per request.
+"""
+
+import asyncio
+import atexit
+import os
+import threading
+from typing import AsyncIterator, Awaitable, Callable, Iterator, TypeVar
+
+from app.log_manager import global_logger as log
+
+T = TypeVar("T")
+
+
+class BackgroundEventLoop:
+	"""Runs coroutines on one event loop that lives for the whole worker process.
+
+	The loop thread is started on first use, and restarted in a child process after
+	a fork (e.g. a pre-forking WSGI server), since threads don't survive fork().
+
+	Attributes:
+	        name (str): Name given to the loop's thread.
+	"""
+
+	def __init__(self, name: str = "route-planning-loop"):
+		self.name = name
+		self._loop = None
+		self._thread = None
+		self._pid = None
+		self._lock = threading.Lock()
+		self._shutdown_hooks = []
+
+	def _ensure_started(self) -> asyncio.AbstractEventLoop:
+		with self._lock:
+			if self._loop is None or self._pid != os.getpid():
+				self._loop = asyncio.new_event_loop()
+				self._thread = threading.Thread(
+					target=self._loop.run_forever, name=self.name, daemon=True
+				)
+				self._pid = os.getpid()
+				self._thread.start()
+				log.info(f"Started background event loop '{self.name}'")
+			return self._loop
+
+	def run(self, coro: Awaitable[T], timeout: float | None = None) -> T:
+		"""
+		Runs coro on the background loop and blocks until it finishes.
+
+		Raises:
+		RuntimeError: If called from a coroutine already running on the background
+		loop, which would deadlock; await the coroutine there instead.
+		"""
+		loop = self._ensure_started()
+		if threading.current_thread() is self._thread:
+			coro.close()
+			raise RuntimeError(
+				"BackgroundEventLoop.run() called from its own loop; await instead"
+			)
+		return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+	def iterate(
+		self, agen: AsyncIterator[T], timeout: float | None = None
+	) -> Iterator[T]:
+		"""
+		Runs an async generator on the background loop, yielding each of its items as
+		soon as it is produced. Closing the iterator early closes the generator too.
+		"""
+		loop = self._ensure_started()
+		if threading.current_thread() is self._thread:
+			raise RuntimeError(
+				"BackgroundEventLoop.iterate() called from its own loop; use async for"
+			)
+
+		async def next_item():
+			return await agen.__anext__()
+
+		async def close():
+			await agen.aclose()
+
+		try:
+			while True:
+				try:
+					yield asyncio.run_coroutine_threadsafe(next_item(), loop).result(
+						timeout
+					)
+				except StopAsyncIteration:
+					return
+		finally:
+			asyncio.run_coroutine_threadsafe(close(), loop).result(timeout)
+
+	def add_shutdown_hook(self, hook: Callable[[], Awaitable[None]]):
+		"""Registers an async callable (e.g. a session's close) to run before the loop stops."""
+		self._shutdown_hooks.append(hook)
+
+	def stop(self):
+		"""Runs the shutdown hooks, then stops and closes the loop."""
+		with self._lock:
+			loop, thread = self._loop, self._thread
+			if loop is None or self._pid != os.getpid():
+				return
+			self._loop = self._thread = None
+
+		for hook in self._shutdown_hooks:
+			try:
+				asyncio.run_coroutine_threadsafe(hook(), loop).result(5)
+			except Exception as e:
+				log.error(f"Background loop shutdown hook failed: {e}")
+		loop.call_soon_threadsafe(loop.stop)
+		thread.join(5)
+		loop.close()
+
+
+# shared loop used by the sync facades in map_requests
+background_loop = BackgroundEventLoop()
+atexit.register(background_loop.stop)
@@ -0,0 +1,196 @@
+"""
+GasBuddy state gas prices, kept as a timestamped snapshot on disk.
+
+Nothing is scraped on import. The snapshot is read the first time a price is needed
+and only scraped then if there is none on disk yet; after that, a stale snapshot keeps
+being served while a fresh one is scraped in the background, so pricing a trip does
+not wait on GasBuddy.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from statistics import mean
+
+import requests
+
+from app.log_manager import global_logger as log
+from app.map_requests import APIError
+from app.scraping_functions.gas import Gas
+from app.scraping_functions.state_abbreviations import state_abbr
+from config import Config
+
+
+@dataclass(frozen=True)
+class GasSnapshot:
+	"""State gas prices as scraped at one point in time.
+
+	Attributes:
+	        fetched_at (float): When the prices were scraped (epoch seconds).
+	        prices (dict): Dollars per gallon by lowercase state name.
+	"""
+
+	fetched_at: float
+	prices: dict
+
+	@property
+	def national_average(self) -> float:
+		return round(mean(self.prices.values()), 2)
+
+
+class GasPriceService:
+	"""Serves gas prices from a snapshot file, scraping GasBuddy only to refresh it.
+
+	Attributes:
+	        path (str): Location of the JSON snapshot, shared by every process.
+	        max_age_seconds (float): Age at which the snapshot is refreshed.
+	"""
+
+	def __init__(
+		self,
+		path: str = Config.GAS_PRICE_SNAPSHOT_PATH,
+		max_age_seconds: float = Config.GAS_PRICE_MAX_AGE_SECONDS,
+	):
+		self.path = path
+		self.max_age_seconds = max_age_seconds
+		self._snapshot = None
+		# held for the length of a scrape, so only one runs at a time
+		self._scraping = threading.Lock()
+		self._background = None
+		self._stop = threading.Event()
+		self._thread = None
+
+	def national_average(self) -> float:
+		return self.snapshot().national_average
+
+	def state_price(self, state: str) -> float | None:
+		"""Price in a state, by name or abbreviation; None if GasBuddy has none for it."""
+		if len(state) == 2:
+			state = state_abbr.get(state.upper(), state)
+		return self.snapshot().prices.get(state.lower())
+
+	def price_for(self, *states: str) -> float:
+		"""The mean price across the given states, or the national average for none known."""
+		prices = [p for p in map(self.state_price, states) if p is not None]
+		return round(mean(prices), 2) if prices else self.national_average()
+
+	def snapshot(self) -> GasSnapshot:
+		"""
+		The current snapshot, loaded (or, failing that, scraped) on first use.
+
+		Raises:
+		APIError: If there is no snapshot yet and GasBuddy can't be scraped.
+		"""
+		if self._snapshot is None:
+			with self._scraping:
+				if self._snapshot is None:
+					self._snapshot = self._load() or self._scrape()
+		if self._is_stale(self._snapshot):
+			self.refresh_in_background()
+		return self._snapshot
+
+	def refresh(self) -> GasSnapshot:
+		"""
+		Brings the snapshot up to date (committed to disk) and returns it.
+		A fresher snapshot written by another process is adopted instead of re-scraping.
+
+		Raises:
+		APIError: If GasBuddy can't be scraped.
+		"""
+		with self._scraping:
+			return self._refresh()
+
+	def refresh_in_background(self):
+		"""Starts a refresh on its own thread, unless one is already running."""
+		if not self._scraping.acquire(blocking=False):
+			return
+
+		def run():
+			try:
+				self._refresh()
+			except APIError as e:
+				log.warning(f"Keeping the current gas prices: {e}")
+			finally:
+				self._scraping.release()
+
+		self._background = threading.Thread(
+			target=run, name="gas-price-refresh", daemon=True
+		)
+		self._background.start()
+
+	def start(self, interval_seconds: float = Config.GAS_PRICE_REFRESH_SECONDS):
+		"""Keeps the snapshot fresh every interval_seconds, whether or not it is used."""
+		self._thread = threading.Thread(
+			target=self._run, args=(interval_seconds,), name="gas-prices", daemon=True
+		)
+		self._thread.start()
+		return self
+
+	def stop(self):
+		self._stop.set()
+		if self._thread is not None:
+			self._thread.join()
+
+	def _run(self, interval_seconds: float):
+		while not self._stop.wait(interval_seconds):
+			try:
+				if self._snapshot is None or self._is_stale(self._snapshot):
+					self.refresh()
+			except Exception:
+				log.exception("Gas price refresh failed")
+
+	def _refresh(self) -> GasSnapshot:
+		snapshot = self._load()
+		if snapshot is None or self._is_stale(snapshot):
+			snapshot = self._scrape()
+		self._snapshot = snapshot
+		return snapshot
+
+	def _is_stale(self, snapshot: GasSnapshot) -> bool:
+		return time.time() - snapshot.fetched_at > self.max_age_seconds
+
+	def _load(self) -> GasSnapshot | None:
+		try:
+			with open(self.path) as f:
+				data = json.load(f)
+			return GasSnapshot(data["fetched_at"], data["prices"])
+		except FileNotFoundError:
+			return None
+		except (ValueError, KeyError, TypeError):
+			log.warning(f"Ignoring unreadable gas price snapshot at {self.path}")
+			return None
+
+	def _scrape(self) -> GasSnapshot:
+		try:
+			scraped = Gas().lookup_state
+		except requests.RequestException as e:
+			raise APIError(f"Could not scrape gas prices: {e}", Config.GASBUDDY_URL)
+
+		prices = {}
+		for state, price in scraped.items():
+			try:
+				prices[state] = float(price)
+			except (TypeError, ValueError):
+				# e.g. Washington D.C., which doesn't have a gas price
+				continue
+		if not prices:
+			raise APIError("No gas prices found", Config.GASBUDDY_URL)
+
+		snapshot = GasSnapshot(time.time(), prices)
+		self._save(snapshot)
+		log.info(f"Scraped gas prices for {len(prices)} states")
+		return snapshot
+
+	def _save(self, snapshot: GasSnapshot):
+		# written whole then renamed, so other processes never read half a snapshot
+		os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+		tmp_path = f"{self.path}.{os.getpid()}.tmp"
+		with open(tmp_path, "w") as f:
+			json.dump({"fetched_at": snapshot.fetched_at, "prices": snapshot.prices}, f)
+		os.replace(tmp_path, self.path)
+
+
+# shared by every request and worker thread in the process
+gas_prices = GasPriceService()
@@ -0,0 +1,139 @@
+"""
+Offline reverse geocoding of route coordinates against a local gazetteer of US places.
+
+The index is built from a US Census Gazetteer "places" file (tab-delimited, with the
+USPS, NAME, INTPTLAT and INTPTLONG columns), e.g. 2023_Gaz_place_national.txt.
+Place names are normalized so that "City, State" lines up with the keys of
+population_dictionary.pop_dictionary.
+"""
+
+import csv
+import math
+import os
+import re
+import threading
+from collections import defaultdict
+
+from app.log_manager import global_logger as log
+from app.route_geometry import haversine_km
+from app.scraping_functions.population_dictionary import pop_dictionary
+from app.scraping_functions.state_abbreviations import state_abbr
+from config import Config
+
+# legal/statistical descriptions the Census appends to place names
+_PLACE_SUFFIX = re.compile(
+	r"\s+(city and borough|(consolidated|metropolitan|unified) government \(balance\)"
+	r"|urban county|municipality|borough|village|town|city|CDP|comunidad|zona urbana)$"
+)
+
+# size of a grid cell in degrees (~28 km of latitude)
+GRID_CELL_DEG = 0.25
+
+
+def gazetteer_city_name(census_name: str, state: str) -> str:
+	"""
+	Strips the Census description from a place name ("Socorro city" -> "Socorro"),
+	unless the description is part of the name pop_dictionary uses for the place.
+	"""
+	if f"{census_name}, {state}" in pop_dictionary:
+		return census_name
+	return _PLACE_SUFFIX.sub("", census_name).strip()
+
+
+class Gazetteer:
+	"""A grid-bucketed spatial index of US places for nearest-place lookups.
+
+	Attributes:
+	        places (list[tuple]): (city, state, lat, lng) for every indexed place.
+	        max_km (float): Lookups farther than this from any place return None.
+	"""
+
+	def __init__(self, places: list[tuple[str, str, float, float]], max_km: float):
+		self.places = places
+		self.max_km = max_km
+		self._grid = defaultdict(list)
+		for i, (_, _, lat, lng) in enumerate(places):
+			self._grid[self._cell(lat, lng)].append(i)
+
+	@classmethod
+	def from_census_file(cls, path: str, max_km: float = Config.GAZETTEER_MAX_KM):
+		"""Builds the index from a Census Gazetteer places file."""
+		places = []
+		with open(path, newline="", encoding="utf-8", errors="replace") as f:
+			reader = csv.reader(f, delimiter="\t")
+			# the last header in Census files carries trailing whitespace
+			header = [column.strip() for column in next(reader)]
+			usps, name = header.index("USPS"), header.index("NAME")
+			lat, lng = header.index("INTPTLAT"), header.index("INTPTLONG")
+
+			for row in reader:
+				state = state_abbr.get(row[usps].strip())
+				if state is None:
+					# territories (PR, GU, ...) aren't part of the app
+					continue
+				city = gazetteer_city_name(row[name].strip(), state)
+				places.append((city, state, float(row[lat]), float(row[lng])))
+
+		log.info(f"Loaded {len(places)} gazetteer places from {path}")
+		return cls(places, max_km)
+
+	@staticmethod
+	def _cell(lat: float, lng: float) -> tuple[int, int]:
+		return (math.floor(lat / GRID_CELL_DEG), math.floor(lng / GRID_CELL_DEG))
+
+	def nearest(self, lat: float, lng: float) -> tuple[str, str] | None:
+		"""Returns (city, state) of the closest place within max_km, or None."""
+		lat_rings = math.ceil(self.max_km / (111.0 * GRID_CELL_DEG))
+		km_per_lng_cell = 111.0 * GRID_CELL_DEG * max(math.cos(math.radians(lat)), 0.01)
+		lng_rings = math.ceil(self.max_km / km_per_lng_cell)
+
+		cell_lat, cell_lng = self._cell(lat, lng)
+		candidates = [
+			i
+			for d_lat in range(-lat_rings, lat_rings + 1)
+			for d_lng in range(-lng_rings, lng_rings + 1)
+			for i in self._grid.get((cell_lat + d_lat, cell_lng + d_lng), ())
+		]
+		if not candidates:
+			return None
+
+		coords = [self.places[i][2:] for i in candidates]
+		distances = list(haversine_km((lat, lng), coords))
+		best = min(range(len(candidates)), key=distances.__getitem__)
+		if distances[best] > self.max_km:
+			return None
+
+		city, state, _, _ = self.places[candidates[best]]
+		return city, state
+
+	def reverse_geocode(self, lat: float, lng: float) -> list[str] | None:
+		"""
+		Offline counterpart of map_requests.get_city_name.
+
+		Returns:
+		[city, county, state] for the nearest place (county is unknown offline and
+		left as None), or None if no place is within max_km.
+		"""
+		if (match := self.nearest(lat, lng)) is None:
+			return None
+		city, state = match
+		return [city, None, state]
+
+	def __len__(self) -> int:
+		return len(self.places)
+
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer | None:
+	"""Lazily loads the shared gazetteer from GAZETTEER_PATH; None if there is no file."""
+	global _gazetteer
+	with _gazetteer_lock:
+		if _gazetteer is None and Config.GAZETTEER_PATH:
+			if os.path.exists(Config.GAZETTEER_PATH):
+				_gazetteer = Gazetteer.from_census_file(Config.GAZETTEER_PATH)
+			else:
+				log.warning(f"Gazetteer file not found: {Config.GAZETTEER_PATH}")
+		return _gazetteer
@@ -0,0 +1,157 @@
+"""
+Shared async HTTP client for fanning out requests to the Google APIs.
+"""
+
+import asyncio
+import os
+import tempfile
+from typing import Iterable
+
+import aiohttp
+
+from app.json_stream import parse_fields_async
+from app.log_manager import global_logger as log
+from app.rate_governor import RateGovernor, google_governor, is_retryable_response
+from config import Config
+
+
+class AsyncHTTPClient:
+	"""A long-lived aiohttp session with keep-alive pooling and a per-host cap.
+
+	The session is created lazily on first use and is bound to the running event
+	loop. If a later call runs on a different loop, a fresh session is opened.
+
+	Attributes:
+	        limit_per_host (int): Max simultaneous connections to a single host.
+	        keepalive_timeout (float): Seconds an idle connection is kept open.
+	        governor (RateGovernor): Quotas and retries applied to every request, if any.
+	        stats (dict): Counters for requests sent and connections created/reused.
+	"""
+
+	def __init__(
+		self,
+		limit_per_host: int = Config.GOOGLE_MAX_CONNECTIONS_PER_HOST,
+		keepalive_timeout: float = Config.GOOGLE_KEEPALIVE_TIMEOUT,
+		governor: RateGovernor | None = None,
+	):
+		self.limit_per_host = limit_per_host
+		self.keepalive_timeout = keepalive_timeout
+		self.governor = governor
+		self.stats = {"requests": 0, "connections_created": 0, "connections_reused": 0}
+		self._session = None
+		self._loop = None
+
+	def _get_session(self) -> aiohttp.ClientSession:
+		loop = asyncio.get_running_loop()
+		if self._session is None or self._session.closed or self._loop is not loop:
+			trace_config = aiohttp.TraceConfig()
+			trace_config.on_connection_create_end.append(self._on_connection_create)
+			trace_config.on_connection_reuseconn.append(self._on_connection_reuse)
+
+			connector = aiohttp.TCPConnector(
+				limit_per_host=self.limit_per_host,
+				keepalive_timeout=self.keepalive_timeout,
+			)
+			self._session = aiohttp.ClientSession(
+				connector=connector, trace_configs=[trace_config]
+			)
+			self._loop = loop
+		return self._session
+
+	async def _on_connection_create(self, session, context, params):
+		self.stats["connections_created"] += 1
+
+	async def _on_connection_reuse(self, session, context, params):
+		self.stats["connections_reused"] += 1
+
+	async def get_json(self, url: str, fields: Iterable[str] | None = None) -> dict:
+		"""
+		GETs the url through the pooled session and returns the decoded JSON body.
+		An error response without a JSON body comes back as {"status": "HTTP <code>"}.
+		fields, if given, are the only parts of a 200 body kept (see fetch_json).
+		"""
+		status, body = await self.fetch_json(url, fields)
+		if body is None:
+			return {"status": f"HTTP {status}"}
+		return body
+
+	async def fetch_json(
+		self, url: str, fields: Iterable[str] | None = None
+	) -> tuple[int, dict | None]:
+		"""
+		GETs the url and returns the HTTP status code along with the decoded JSON body
+		(None when an error response isn't JSON, e.g. a 503 page from a proxy).
+
+		With fields (ijson prefixes, see app.json_stream), a 200 body is parsed as it
+		streams in and only those fields are built, so a large response never sits in
+		memory whole. Error bodies are small and always decoded in full.
+		"""
+
+		async def send() -> tuple[int, dict | None]:
+			session = self._get_session()
+			self.stats["requests"] += 1
+			async with session.get(url) as response:
+				if fields is not None and response.status == 200:
+					return 200, await parse_fields_async(response.content, fields)
+				try:
+					return response.status, await response.json(content_type=None)
+				except ValueError:
+					if response.status == 200:
+						raise
+					return response.status, None
+
+		if self.governor is None:
+			return await send()
+		return await self.governor.call_async(
+			self.governor.endpoint_for(url),
+			send,
+			lambda result: is_retryable_response(*result),
+		)
+
+	async def download(self, url: str, dest_path: str, chunk_size: int = 65536) -> int:
+		"""
+		Streams the body of url into dest_path without holding it in memory.
+		The file only appears at dest_path once it is complete.
+
+		Returns:
+		The HTTP status code; nothing is written unless it is 200.
+		"""
+		if self.governor is None:
+			return await self._download(url, dest_path, chunk_size)
+		return await self.governor.call_async(
+			self.governor.endpoint_for(url),
+			lambda: self._download(url, dest_path, chunk_size),
+			is_retryable_response,
+		)
+
+	async def _download(self, url: str, dest_path: str, chunk_size: int) -> int:
+		session = self._get_session()
+		self.stats["requests"] += 1
+		async with session.get(url) as response:
+			if response.status != 200:
+				return response.status
+
+			fd, tmp_path = tempfile.mkstemp(
+				dir=os.path.dirname(dest_path), suffix=".part"
+			)
+			try:
+				with os.fdopen(fd, "wb") as f:
+					async for chunk in response.content.iter_chunked(chunk_size):
+						f.write(chunk)
+				os.replace(tmp_path, dest_path)
+			except BaseException:
+				os.unlink(tmp_path)
+				raise
+		return 200
+
+	async def close(self):
+		"""Closes the underlying session, if one is open."""
+		if self._session is not None and not self._session.closed:
+			await self._session.close()
+			log.debug(f"Closed HTTP client session: {self.stats}")
+		self._session = None
+		self._loop = None
+
+
+# shared client for the Directions, Snap-to-Roads and Geocoding calls in map_requests
+google_client = AsyncHTTPClient(governor=google_governor)
@@ -0,0 +1,104 @@
+"""
+Content-addressed on-disk store for Google Place photos and their thumbnails.
+
+Thumbnails are made with Pillow when it is installed; otherwise the full-size photo
+is served in their place.
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass
+
+from app.log_manager import global_logger as log
+from config import Config
+
+try:
+	from PIL import Image
+except ImportError:
+	Image = None
+
+
+@dataclass(frozen=True)
+class PhotoHandle:
+	"""A lightweight reference to a stored photo, returned instead of the raw bytes.
+
+	Attributes:
+	        photo_reference (str): Google's photo_reference the photo was fetched with.
+	        key (str): Content address of the photo within the store.
+	        path (str): Location of the full-size photo on disk.
+	        thumbnail_path (str): Location of the thumbnail (the photo itself without Pillow).
+	"""
+
+	photo_reference: str
+	key: str
+	path: str
+	thumbnail_path: str
+
+
+class ImageStore:
+	"""Stores photos under a hash of their photo_reference, sharded by the first two hex digits.
+
+	Attributes:
+	        root (str): Directory holding the store.
+	        thumbnail_size (int): Longest side of generated thumbnails, in pixels.
+	"""
+
+	def __init__(
+		self,
+		root: str = Config.IMAGE_STORE_PATH,
+		thumbnail_size: int = Config.THUMBNAIL_SIZE,
+	):
+		self.root = root
+		self.thumbnail_size = thumbnail_size
+
+	@staticmethod
+	def key_for(photo_reference: str) -> str:
+		return hashlib.sha256(photo_reference.encode()).hexdigest()
+
+	def path_for(self, key: str, thumbnail: bool = False) -> str:
+		"""Full-size (or thumbnail) path for a key; raises ValueError for malformed keys."""
+		if len(key) != 64 or any(c not in "0123456789abcdef" for c in key):
+			raise ValueError(f"Invalid image key: {key!r}")
+		suffix = f"_{self.thumbnail_size}" if thumbnail else ""
+		return os.path.join(self.root, key[:2], f"{key}{suffix}.jpg")
+
+	def handle_for(self, photo_reference: str) -> PhotoHandle:
+		key = self.key_for(photo_reference)
+		path = self.path_for(key)
+		thumbnail_path = self.path_for(key, thumbnail=True)
+		if not os.path.exists(thumbnail_path):
+			thumbnail_path = path
+		return PhotoHandle(photo_reference, key, path, thumbnail_path)
+
+	def has(self, photo_reference: str) -> bool:
+		return os.path.exists(self.path_for(self.key_for(photo_reference)))
+
+	def make_dirs(self, photo_reference: str):
+		os.makedirs(
+			os.path.dirname(self.path_for(self.key_for(photo_reference))), exist_ok=True
+		)
+
+	def make_thumbnail(self, photo_reference: str) -> bool:
+		"""Writes the photo's thumbnail once; returns False when Pillow isn't available."""
+		if Image is None:
+			return False
+
+		key = self.key_for(photo_reference)
+		thumbnail_path = self.path_for(key, thumbnail=True)
+		if os.path.exists(thumbnail_path):
+			return True
+
+		try:
+			with Image.open(self.path_for(key)) as image:
+				image.thumbnail((self.thumbnail_size, self.thumbnail_size))
+				tmp_path = f"{thumbnail_path}.{os.getpid()}.part"
+				image.convert("RGB").save(tmp_path, "JPEG", quality=85)
+			os.replace(tmp_path, thumbnail_path)
+		except OSError as e:
+			log.error(f"Could not make thumbnail for {key}: {e}")
+			return False
+		return True
+
+
+# shared store used by map_requests.get_place_images and the places blueprint
+image_store = ImageStore()
@@ -0,0 +1,118 @@
+"""
+Incremental JSON parsing that keeps only selected fields of a response body.
+
+Directions and Snap-to-Roads bodies are mostly fields the app never reads (step
+instructions and polylines, addresses, ...). Parsing them as the bytes arrive and
+building only the wanted fields keeps memory at the size of the result rather than
+the body, and overlaps parsing with the download.
+
+Fields are ijson prefixes, e.g. "routes.item.legs.item.distance" keeps the whole
+distance object of every leg. ijson is used when installed; otherwise the body is
+read whole and pruned to the same shape.
+"""
+
+import json
+from typing import Iterable, Iterator
+
+try:
+	import ijson
+except ImportError:
+	ijson = None
+
+
+class FieldPruner:
+	"""Rebuilds a JSON document from ijson parse events, keeping only some fields.
+
+	Attributes:
+	        fields (frozenset): Prefixes of the kept fields, each kept with everything under it.
+	        result: The pruned document, once its last event has been fed.
+	"""
+
+	def __init__(self, fields: Iterable[str]):
+		self.fields = frozenset(fields)
+		self.result = None
+		# containers leading to a kept field: built, but only with their kept members
+		self._ancestors = {
+			".".join(field.split(".")[:depth])
+			for field in self.fields
+			for depth in range(field.count(".") + 1)
+		}
+		self._kept = {}
+		# [container, pending map key, prefix] for each open container being built
+		self._stack = []
+
+	def _is_kept(self, prefix: str) -> bool:
+		if (kept := self._kept.get(prefix)) is None:
+			kept = prefix in self.fields or any(
+				prefix.startswith(f"{field}.") for field in self.fields
+			)
+			self._kept[prefix] = kept
+		return kept
+
+	def _is_built(self, prefix: str) -> bool:
+		return prefix in self._ancestors or self._is_kept(prefix)
+
+	def _attach(self, value):
+		if not self._stack:
+			self.result = value
+			return
+		container, key, _ = self._stack[-1]
+		if isinstance(container, list):
+			container.append(value)
+		else:
+			container[key] = value
+
+	def feed(self, prefix: str, event: str, value):
+		if event == "map_key":
+			if self._stack and self._stack[-1][2] == prefix:
+				self._stack[-1][1] = value
+		elif event in ("start_map", "start_array"):
+			if self._is_built(prefix):
+				container = {} if event == "start_map" else []
+				self._attach(container)
+				self._stack.append([container, None, prefix])
+		elif event in ("end_map", "end_array"):
+			if self._is_built(prefix):
+				self._stack.pop()
+		elif self._is_kept(prefix):
+			self._attach(value)
+
+
+def prune(document, fields: Iterable[str]):
+	"""The already parsed document with only fields kept, as parse_fields_async builds it."""
+	pruner = FieldPruner(fields)
+	for prefix, event, value in _events(document):
+		pruner.feed(prefix, event, value)
+	return pruner.result
+
+
+async def parse_fields_async(stream, fields: Iterable[str]):
+	"""
+	Parses a JSON byte stream (anything with an async read(), e.g. an aiohttp
+	response's content) as it arrives, building only the given fields.
+	"""
+	if ijson is None:
+		return prune(json.loads(await stream.read()), fields)
+
+	pruner = FieldPruner(fields)
+	async for prefix, event, value in ijson.parse_async(stream, use_float=True):
+		pruner.feed(prefix, event, value)
+	return pruner.result
+
+
+def _events(node, prefix: str = "") -> Iterator[tuple[str, str, object]]:
+	"""The ijson parse events of an already parsed document."""
+	if isinstance(node, dict):
+		yield prefix, "start_map", None
+		for key, value in node.items():
+			yield prefix, "map_key", key
+			yield from _events(value, f"{prefix}.{key}" if prefix else key)
+		yield prefix, "end_map", None
+	elif isinstance(node, list):
+		yield prefix, "start_array", None
+		item_prefix = f"{prefix}.item" if prefix else "item"
+		for value in node:
+			yield from _events(value, item_prefix)
+		yield prefix, "end_array", None
+	else:
+		yield prefix, "value", node
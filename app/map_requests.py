@@ -1,91 +1,447 @@
 import asyncio
-import json
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import AsyncIterator
 
-import aiohttp
-import requests
 from geopy.distance import geodesic
 
+from app.background_loop import background_loop
+from app.gazetteer import Gazetteer, get_gazetteer
+from app.http_client import AsyncHTTPClient, google_client
+from app.image_store import ImageStore, PhotoHandle, image_store
 from app.log_manager import global_logger as log
+from app.place_cache import (
+	SQLiteCache,
+	activity_tile_cache,
+	coordinates_cache,
+	pair_distance_cache,
+	place_cache,
+)
+from app.route_geometry import (
+	anchor_filter,
+	decode_polyline,
+	geohash_center,
+	geohash_encode,
+	resample,
+)
+from app.single_flight import SingleFlight, upstream_flights
+from config import Config
 
 # @TODO update google map api key
 API_KEY = "REDACTED"
 
+# Snap-to-Roads accepts at most 100 points per request
+ROADS_MAX_POINTS = 100
+# points shared between consecutive chunks so snapping is continuous across seams
+ROADS_CHUNK_OVERLAP = 5
+# Distance Matrix accepts at most 25 origins, 25 destinations and 100 elements per request
+MATRIX_MAX_SIDE = 25
+MATRIX_MAX_ELEMENTS = 100
+# seconds before a Nearby Search next_page_token can be used
+NEARBY_PAGE_TOKEN_DELAY = 2.0
+
+# the only parts of Directions and Snap-to-Roads responses the route pipeline reads;
+# everything else (step instructions and polylines, addresses, ...) is skipped while
+# the body streams in
+DIRECTIONS_FIELDS = (
+	"status",
+	"routes.item.legs.item.distance",
+	"routes.item.legs.item.duration",
+	"routes.item.legs.item.steps.item.end_location",
+	"routes.item.overview_polyline.points",
+)
+DISTANCE_MATRIX_FIELDS = (
+	"status",
+	"rows.item.elements.item.status",
+	"rows.item.elements.item.distance.value",
+)
+SNAP_TO_ROADS_FIELDS = (
+	"snappedPoints.item.location",
+	"snappedPoints.item.originalIndex",
+	"snappedPoints.item.placeId",
+	"warningMessage",
+)
+
+# the pooled session lives as long as the background loop it is bound to
+background_loop.add_shutdown_hook(google_client.close)
+
+
+def get_cities_list(
+	origin: str,
+	destination: str,
+	offline: bool = Config.OFFLINE_GEOCODING,
+	refresh: bool = False,
+) -> dict[str, list]:
+	"""
+	Returns list of cities and their IDs in between origin and destination (inclusive)
+	Sync facade over get_cities_list_async, run on the shared background event loop.
+	"""
+	return background_loop.run(
+		get_cities_list_async(origin, destination, offline, refresh)
+	)
+
+
+async def get_cities_list_async(
+	origin: str,
+	destination: str,
+	offline: bool = Config.OFFLINE_GEOCODING,
+	refresh: bool = False,
+) -> dict[str, list]:
+	"""
+	Runs the whole route pipeline (directions -> snap -> geocode) without blocking.
+	When offline, cities are looked up in the local gazetteer instead of being snapped
+	and geocoded through Google; Google is only asked about points the gazetteer
+	misses if GAZETTEER_FALLBACK is set.
+	refresh re-fetches Directions even if the route is memoized.
+	"""
+	# {cityA_id: [city,county,state], cityB_id: [city,county,state]}
+	return {
+		key: city_info
+		async for key, city_info in iter_cities_list_async(
+			origin, destination, offline, refresh
+		)
+	}
 
-def get_cities_list(origin: str, destination: str) -> dict[str, list]:
-	"""Returns list of cities and their IDs in between origin and destination (inclusive)"""
+
+async def iter_cities_list_async(
+	origin: str,
+	destination: str,
+	offline: bool = Config.OFFLINE_GEOCODING,
+	refresh: bool = False,
+) -> AsyncIterator[tuple[str, list]]:
+	"""
+	get_cities_list_async as a stream: yields each (id, [city, county, state]) in
+	route order as soon as it is known, so callers can show the first cities while
+	the rest are still being geocoded.
+	"""
 	log.info(f"Fetching route from {origin} to {destination}")
+	route = await get_route_async(origin, destination, refresh)
+
+	gazetteer = None
+	if offline:
+		# loaded on first use unless create_app did so already; parsing the file on
+		#   the loop would stall every other coroutine
+		loop = asyncio.get_running_loop()
+		gazetteer = await loop.run_in_executor(None, get_gazetteer)
+	if gazetteer is not None:
+		for item in (await _get_cities_from_gazetteer(route, gazetteer)).items():
+			yield item
+		return
+
+	place_response = await fetch_snapped_points_async(route.sampled_path())
+	placeIDs = _get_placeids_from_snapped(place_response)
+	async for item in iter_cities(placeIDs):
+		yield item
+
+
+async def _get_cities_from_gazetteer(
+	route: "RouteResult",
+	gazetteer: Gazetteer,
+	fallback: bool = Config.GAZETTEER_FALLBACK,
+) -> dict:
+	"""
+	Finds the route's cities from the gazetteer, without Snap-to-Roads or Geocoding
+	calls for any point that lies near an indexed place. Points that don't are
+	geocoded through Google with fallback, and skipped without it.
+
+	Returns:
+	{"lat,lng": [city, county, state]} for each distinct city, in route order.
+	"""
+	coords = resample(route.geometry, Config.ROUTE_SAMPLE_SPACING_KM)
+	kept = [coords[i] for i in anchor_filter(coords, 5.0)]
+	keys = [f"{lat:.6f},{lng:.6f}" for lat, lng in kept]
+
+	city_infos = {
+		key: gazetteer.reverse_geocode(*coord) for key, coord in zip(keys, kept)
+	}
+	misses = [key for key, city_info in city_infos.items() if city_info is None]
+	if misses and fallback:
+		log.info(
+			f"{len(misses)} of {len(keys)} route points not in gazetteer, geocoding"
+		)
+		geocoded = await asyncio.gather(*(get_city_from_latlng(ll) for ll in misses))
+		city_infos.update(geocoded)
 
-	path = _get_coord_path(origin, destination)
-	placeIDs = get_placeids_from_path(path)
-	cities = asyncio.run(build_cities_list(placeIDs))
+	return _trim_duplicate_cities(keys, city_infos)
 
-	return cities  # {cityA_id: [city,county,state], cityB_id: [city,county,state]}
 
+@dataclass(frozen=True)
+class RouteResult:
+	"""A single Directions API route, shared by pricing and city extraction.
 
-def _get_coord_path(origin: str, destination: str) -> str:
+	Attributes:
+	        origin (str): Normalized origin the route was fetched for.
+	        destination (str): Normalized destination the route was fetched for.
+	        distance_meters (int): Total driving distance over all legs.
+	        duration_seconds (int): Total driving time over all legs.
+	        legs (list[dict]): The first route's legs, reduced to DIRECTIONS_FIELDS.
+	        geometry (list[tuple]): Decoded (lat, lng) points of the overview polyline.
 	"""
-	Calculate route and return as list of pipe delimited coordinate points.
 
-	Parameters:
-	origin (str): The starting point of the route.
-	destination (str): The endpoint of the route.
+	origin: str
+	destination: str
+	distance_meters: int
+	duration_seconds: int
+	legs: list[dict]
+	geometry: list[tuple[float, float]]
+
+	@property
+	def distance_miles(self) -> float:
+		return self.distance_meters * 0.000621371
+
+	def sampled_path(self, spacing_km: float = Config.ROUTE_SAMPLE_SPACING_KM) -> str:
+		"""Pipe-delimited "lat,lng" points spaced evenly every spacing_km along the route."""
+		return "|".join(
+			f"{lat:.6f},{lng:.6f}" for lat, lng in resample(self.geometry, spacing_km)
+		)
 
-	Returns:
-	str: A string of pipe-delimited coordinates representing the route.
+
+def normalize_place_name(name: str) -> str:
+	"""Canonical form of a "City, State" string used to key memoized routes."""
+	return ", ".join(part.strip() for part in " ".join(name.split()).split(",")).lower()
+
+
+# memoized RouteResults keyed by normalized (origin, destination), most recent last
+_route_memo: OrderedDict[tuple[str, str], RouteResult] = OrderedDict()
+_route_memo_lock = threading.Lock()
+ROUTE_MEMO_SIZE = 128
+
+
+def get_route(origin: str, destination: str) -> RouteResult:
+	"""Sync facade over get_route_async."""
+	return background_loop.run(get_route_async(origin, destination))
+
+
+async def get_route_async(
+	origin: str, destination: str, refresh: bool = False
+) -> RouteResult:
+	"""
+	Returns the route between origin and destination, fetching Directions at most once
+	per normalized origin/destination pair for the life of the process (unless refresh).
 
 	Raises:
 	APIError: If the Directions API returns an error status.
 	"""
-	url = f"https://maps.googleapis.com/maps/api/directions/json?origin={origin}&destination={destination}&key={API_KEY}"
-	response = requests.get(url)
-	route_response = response.json()
+	key = (normalize_place_name(origin), normalize_place_name(destination))
+	with _route_memo_lock:
+		if not refresh and (route := _route_memo.get(key)) is not None:
+			_route_memo.move_to_end(key)
+			return route
+
+	route = await _fetch_route(*key)
+	with _route_memo_lock:
+		_route_memo[key] = route
+		if len(_route_memo) > ROUTE_MEMO_SIZE:
+			_route_memo.popitem(last=False)
+	return route
+
+
+def clear_route_memo():
+	with _route_memo_lock:
+		_route_memo.clear()
+
 
-	if route_response["status"] != "OK":
-		if route_response["status"] == "ZERO_RESULTS":
+async def _fetch_route(
+	origin: str, destination: str, client: AsyncHTTPClient = google_client
+) -> RouteResult:
+	url = f"{Config.GOOGLE_MAPS_BASE_URL}/maps/api/directions/json?origin={origin}&destination={destination}&key={API_KEY}"
+	route_response = await client.get_json(url, fields=DIRECTIONS_FIELDS)
+
+	if (status := route_response["status"]) != "OK":
+		if status == "ZERO_RESULTS":
 			trimmed_origin = simplify_city_name(origin)
 			trimmed_destination = simplify_city_name(destination)
 
 			if trimmed_origin != origin or trimmed_destination != destination:
-				return _get_coord_path(trimmed_origin, trimmed_destination)
+				return await _fetch_route(trimmed_origin, trimmed_destination, client)
 
-		raise APIError(f"Directions API Error: {route_response['status']}", url)
+		log.critical(f"Directions API Error: {status}")
+		raise APIError(f"Directions API returned status: {status}", url)
 
-	# Extracts coordinates from the route steps
-	legs = route_response["routes"][0]["legs"]
-	path = "|".join(
-		f"{step['end_location']['lat']},{step['end_location']['lng']}"
-		for leg in legs
-		for step in leg["steps"]
+	route = route_response["routes"][0]
+	legs = route["legs"]
+
+	return RouteResult(
+		origin=origin,
+		destination=destination,
+		distance_meters=sum(leg["distance"]["value"] for leg in legs),
+		duration_seconds=sum(leg["duration"]["value"] for leg in legs),
+		legs=legs,
+		geometry=_get_route_geometry(route),
 	)
 
-	return path
+
+def _get_route_geometry(route: dict) -> list[tuple[float, float]]:
+	"""Decodes the route's overview polyline, falling back to the step end locations."""
+	if encoded := route.get("overview_polyline", {}).get("points"):
+		return decode_polyline(encoded)
+
+	return [
+		(step["end_location"]["lat"], step["end_location"]["lng"])
+		for leg in route["legs"]
+		for step in leg["steps"]
+	]
+
+
+def _get_coord_path(origin: str, destination: str) -> str:
+	"""
+	Calculate route and return as list of pipe delimited coordinate points,
+	resampled every ROUTE_SAMPLE_SPACING_KM along the route.
+
+	Parameters:
+	origin (str): The starting point of the route.
+	destination (str): The endpoint of the route.
+
+	Returns:
+	str: A string of pipe-delimited coordinates representing the route.
+
+	Raises:
+	APIError: If the Directions API returns an error status.
+	"""
+	return get_route(origin, destination).sampled_path()
 
 
 def get_route_distance_meters(
 	origin: str, destination: str, spangled: bool = False
 ) -> float:
-	url = f"https://maps.googleapis.com/maps/api/directions/json?origin={origin}&destination={destination}&key={API_KEY}"
-	response = requests.get(url)
-	route_response = json.loads(response.text)
+	route = get_route(origin, destination)
+	return route.distance_meters if not spangled else route.distance_miles
 
-	if (status := route_response["status"]) != "OK":
-		if status == "ZERO_RESULTS":
-			n_origin = simplify_city_name(origin)
-			n_destination = simplify_city_name(destination)
 
-			if n_origin != origin or n_destination != destination:
-				return get_route_distance_meters(n_origin, n_destination)
+def get_distances_meters(pairs: list[tuple[str, str]]) -> list[int | None]:
+	"""Sync facade over get_distances_meters_async."""
+	return background_loop.run(get_distances_meters_async(pairs))
 
-		log.critical(f"Directions API Error: {status}")
-		raise APIError(f"Directions API returned status: {status}", url)
 
-	legs = route_response["routes"][0]["legs"]
+async def get_distances_meters_async(
+	pairs: list[tuple[str, str]],
+	client: AsyncHTTPClient = google_client,
+	cache: SQLiteCache | None = pair_distance_cache,
+	flights: SingleFlight = upstream_flights,
+) -> list[int | None]:
+	"""
+	Driving distance of every (origin, destination) pair, in the order given.
+	Pairs with a memoized route or a cached distance are answered locally; the rest
+	are fetched with Distance Matrix calls that request only those pairs, and cached.
+
+	Returns:
+	The distance in meters of each pair, or None for pairs with no driving route.
 
-	total_distance_meters = sum([leg["distance"]["value"] for leg in legs])
-	return (
-		total_distance_meters if not spangled else total_distance_meters * 0.000621371
+	Raises:
+	APIError: If the Distance Matrix API returns an error status.
+	"""
+	keys = [
+		(normalize_place_name(origin), normalize_place_name(destination))
+		for origin, destination in pairs
+	]
+	distances = {}
+	with _route_memo_lock:
+		for key in keys:
+			if (route := _route_memo.get(key)) is not None:
+				distances[key] = route.distance_meters
+
+	unknown = list(dict.fromkeys(key for key in keys if key not in distances))
+	if cache is not None:
+		cached = cache.get_many([_pair_key(key) for key in unknown])
+		distances.update(
+			(key, cached[_pair_key(key)]) for key in unknown if _pair_key(key) in cached
+		)
+
+	if missing := [key for key in unknown if key not in distances]:
+		matrices = await asyncio.gather(
+			*(
+				_fetch_distance_matrix(origins, destinations, client, flights)
+				for origins, destinations in _matrix_tiles(missing)
+			)
+		)
+		fetched = {key: value for matrix in matrices for key, value in matrix.items()}
+		if cache is not None:
+			cache.set_many({_pair_key(key): value for key, value in fetched.items()})
+		distances.update(fetched)
+
+	return [distances[key] for key in keys]
+
+
+def _pair_key(key: tuple[str, str]) -> str:
+	return "|".join(key)
+
+
+def _matrix_tiles(pairs: list[tuple[str, str]]) -> list[tuple[list, list]]:
+	"""
+	Covers the pairs with Distance Matrix sized tiles holding only requested elements,
+	as the API bills per element. Pairs are taken a row (one origin, its destinations)
+	or a column (one destination, its origins) at a time, longest first; rows with the
+	same destinations (and columns with the same origins) then share tiles.
+	One-to-many comparisons fit in a single call per 25 destinations.
+	"""
+	remaining = list(dict.fromkeys(pairs))
+	# the rows taken, by their set of destinations: (destinations, [origins]); and the
+	#   columns, by their set of origins: (origins, [destinations])
+	rows, columns = {}, {}
+	while remaining:
+		by_origin, by_destination = defaultdict(list), defaultdict(list)
+		for origin, destination in remaining:
+			by_origin[origin].append(destination)
+			by_destination[destination].append(origin)
+		origin, destinations = max(by_origin.items(), key=lambda item: len(item[1]))
+		destination, origins = max(
+			by_destination.items(), key=lambda item: len(item[1])
+		)
+		if len(destinations) >= len(origins):
+			rows.setdefault(frozenset(destinations), (destinations, []))[1].append(
+				origin
+			)
+			remaining = [pair for pair in remaining if pair[0] != origin]
+		else:
+			columns.setdefault(frozenset(origins), (origins, []))[1].append(destination)
+			remaining = [pair for pair in remaining if pair[1] != destination]
+
+	tiles = []
+	for destinations, origins in rows.values():
+		tiles += _stacked_tiles(origins, destinations)
+	for origins, destinations in columns.values():
+		tiles += [
+			(tile_origins, tile_destinations)
+			for tile_destinations, tile_origins in _stacked_tiles(destinations, origins)
+		]
+	return tiles
+
+
+def _stacked_tiles(stacked: list, shared: list) -> list[tuple[list, list]]:
+	# every stacked item wants every shared one: split the shared side into pieces of
+	#   up to 25, and stack as many items on each piece as the element limit allows
+	tiles = []
+	for j in range(0, len(shared), MATRIX_MAX_SIDE):
+		piece = shared[j : j + MATRIX_MAX_SIDE]
+		height = min(MATRIX_MAX_SIDE, MATRIX_MAX_ELEMENTS // len(piece))
+		for i in range(0, len(stacked), height):
+			tiles.append((stacked[i : i + height], piece))
+	return tiles
+
+
+async def _fetch_distance_matrix(
+	origins: list[str],
+	destinations: list[str],
+	client: AsyncHTTPClient = google_client,
+	flights: SingleFlight = upstream_flights,
+) -> dict[tuple[str, str], int | None]:
+	url = f"{Config.GOOGLE_MAPS_BASE_URL}/maps/api/distancematrix/json?origins={'|'.join(origins)}&destinations={'|'.join(destinations)}&key={API_KEY}"
+	matrix_response = await flights.do_async(
+		url, lambda: client.get_json(url, fields=DISTANCE_MATRIX_FIELDS)
 	)
 
+	if (status := matrix_response["status"]) != "OK":
+		raise APIError(f"Distance Matrix API returned status: {status}", url)
+
+	return {
+		(origin, destination): (
+			element["distance"]["value"] if element["status"] == "OK" else None
+		)
+		for origin, row in zip(origins, matrix_response["rows"])
+		for destination, element in zip(destinations, row["elements"])
+	}
+
 
 def simplify_city_name(name: str) -> str:
 	"""
@@ -99,39 +455,90 @@ def simplify_city_name(name: str) -> str:
 	return first_part + "," + parts[1] if len(parts) > 1 else name
 
 
-async def build_cities_list(placeIDs: list[str]) -> dict:
+async def build_cities_list(
+	placeIDs: list[str],
+	client: AsyncHTTPClient = google_client,
+	cache: SQLiteCache | None = place_cache,
+) -> dict:
 	"""
 	Asynchronously fetches city information for each place ID and trims duplicate entries.
+	Place IDs already in the cache are answered locally; only the misses are geocoded,
+	all sharing the client's pooled session, which caps connections per host.
 
 	Args:
 	placeIDs: A list of place IDs for which to fetch city information.
+	client: The shared HTTP client to send the geocoding requests through.
+	cache: The placeId cache to consult first (None to always geocode).
 
 	Returns:
 	A dictionary mapping place IDs to a list containing city, county, and state names.
 
 	"""
+	return {
+		placeID: city_info
+		async for placeID, city_info in iter_cities(placeIDs, client, cache)
+	}
 
-	# Asynchronously fetch city information for each placeID
-	city_info_futures = [get_city_from_id(placeID) for placeID in placeIDs]
-	unfiltered_cities_list = await asyncio.gather(*city_info_futures)
 
+async def iter_cities(
+	placeIDs: list[str],
+	client: AsyncHTTPClient = google_client,
+	cache: SQLiteCache | None = place_cache,
+) -> AsyncIterator[tuple[str, list]]:
+	"""
+	build_cities_list as a stream. Every uncached place ID is geocoded at once, and
+	each distinct city is yielded, in route order, as soon as it and the place IDs
+	before it are resolved.
+	"""
+	city_infos = cache.get_many(placeIDs) if cache is not None else {}
+	lookups = {
+		placeID: asyncio.ensure_future(get_city_from_id(placeID, client))
+		for placeID in dict.fromkeys(placeIDs)
+		if placeID not in city_infos
+	}
+
+	fetched = {}
+	seen_city_names = set()
+	try:
+		for placeID in placeIDs:
+			if placeID not in city_infos:
+				_, city_infos[placeID] = await lookups[placeID]
+				fetched[placeID] = city_infos[placeID]
+
+			city_info = city_infos[placeID]
+			if city_info and city_info[0] not in seen_city_names:
+				seen_city_names.add(city_info[0])
+				yield placeID, city_info
+	finally:
+		# a failed lookup or a consumer that stopped early leaves the rest unneeded
+		for lookup in lookups.values():
+			lookup.cancel()
+		if cache is not None:
+			cache.set_many(fetched)
+
+
+def _trim_duplicate_cities(keys: list[str], city_infos: dict) -> dict:
+	"""Keeps the first key for each city name, in route order, dropping unknown cities."""
 	# Optimize duplicate trimming using a set for faster lookups
 	seen_city_names = set()
 	cities = {}
-	for placeID, city_info in unfiltered_cities_list:
+	for key in keys:
+		city_info = city_infos[key]
 		if city_info and city_info[0] not in seen_city_names:
 			seen_city_names.add(city_info[0])
-			cities[placeID] = city_info
+			cities[key] = city_info
 
 	return cities
 
 
-async def get_city_from_id(placeID: str) -> tuple[str, list[str]]:
+async def get_city_from_id(
+	placeID: str,
+	client: AsyncHTTPClient = google_client,
+	flights: SingleFlight = upstream_flights,
+) -> tuple[str, list[str]]:
 	"""Returns city name (ID, [City, County, State]) from given place ID"""
-	url = f"https://maps.googleapis.com/maps/api/geocode/json?place_id={placeID}&key={API_KEY}"
-	async with aiohttp.ClientSession() as session:
-		async with session.get(url) as response:
-			geocode_response = await response.json()
+	url = f"{Config.GOOGLE_MAPS_BASE_URL}/maps/api/geocode/json?place_id={placeID}&key={API_KEY}"
+	geocode_response = await flights.do_async(url, lambda: client.get_json(url))
 
 	if (status := geocode_response["status"]) != "OK":
 		raise APIError(f"Geocoding API error for ID '{placeID}': {status}", url)
@@ -139,12 +546,30 @@ async def get_city_from_id(placeID: str) -> tuple[str, list[str]]:
 	return placeID, get_city_name(geocode_response["results"][0]["address_components"])
 
 
+async def get_city_from_latlng(
+	latlng: str, client: AsyncHTTPClient = google_client
+) -> tuple[str, list[str]]:
+	"""Returns city name ("lat,lng", [City, County, State]) for a coordinate string"""
+	url = f"{Config.GOOGLE_MAPS_BASE_URL}/maps/api/geocode/json?latlng={latlng}&key={API_KEY}"
+	geocode_response = await client.get_json(url)
+
+	if (status := geocode_response["status"]) == "ZERO_RESULTS":
+		return latlng, None
+	if status != "OK":
+		raise APIError(f"Geocoding API error for '{latlng}': {status}", url)
+
+	return latlng, get_city_name(geocode_response["results"][0]["address_components"])
+
+
 def get_placeids_from_path(path: str) -> list:
 	"""
 	Returns a list of place IDs from a given path of coordinates.
 	Filters out closely spaced points (less than 5 km apart).
 	"""
-	place_response = fetch_snapped_points(path)
+	return _get_placeids_from_snapped(fetch_snapped_points(path))
+
+
+def _get_placeids_from_snapped(place_response: dict) -> list:
 	if "warningMessage" in place_response:
 		# Handle the warning appropriately, e.g., log it or alert the user
 		handle_api_warning(place_response["warningMessage"])
@@ -156,31 +581,115 @@ def get_placeids_from_path(path: str) -> list:
 
 
 def fetch_snapped_points(path: str) -> dict:
+	"""Sync facade over fetch_snapped_points_async."""
+	return background_loop.run(fetch_snapped_points_async(path))
+
+
+async def fetch_snapped_points_async(path: str) -> dict:
 	"""
 	Fetches snapped points from Google Maps Snap-to-Roads API.
+	Paths longer than the API's point cap are split into overlapping chunks which are
+	snapped concurrently, then stitched back together in route order.
 	"""
-	url = f"https://roads.googleapis.com/v1/snapToRoads?path={path}&interpolate=true&key={API_KEY}"
-	response = requests.get(url)
-	if response.status_code != 200:
+	points = path.split("|") if path else []
+	chunk_starts = _get_chunk_starts(len(points))
+	chunks = ["|".join(points[i : i + ROADS_MAX_POINTS]) for i in chunk_starts]
+
+	if len(chunks) == 1:
+		return await _fetch_snapped_chunk(chunks[0])
+
+	semaphore = asyncio.Semaphore(Config.ROADS_MAX_CONCURRENCY)
+
+	async def fetch_chunk(chunk: str) -> dict:
+		async with semaphore:
+			return await _fetch_snapped_chunk(chunk)
+
+	# gather() returns responses in chunk order regardless of completion order
+	responses = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+
+	return _stitch_snapped_chunks(responses, chunk_starts)
+
+
+def _get_chunk_starts(n_points: int) -> list[int]:
+	"""Start index of each Snap-to-Roads chunk, consecutive chunks sharing ROADS_CHUNK_OVERLAP points."""
+	step = ROADS_MAX_POINTS - ROADS_CHUNK_OVERLAP
+	return list(range(0, max(n_points - ROADS_CHUNK_OVERLAP, 1), step))
+
+
+async def _fetch_snapped_chunk(
+	path: str, client: AsyncHTTPClient = google_client
+) -> dict:
+	url = f"{Config.GOOGLE_ROADS_BASE_URL}/v1/snapToRoads?path={path}&interpolate=true&key={API_KEY}"
+	status_code, snapped_response = await client.fetch_json(
+		url, fields=SNAP_TO_ROADS_FIELDS
+	)
+	if status_code != 200:
 		# Handle non-200 responses here, e.g., by raising an exception
-		raise APIError(
-			f"API request failed with status code: {response.status_code}", url
-		)
-	return json.loads(response.text)
+		raise APIError(f"API request failed with status code: {status_code}", url)
+	return snapped_response
+
 
+def _stitch_snapped_chunks(responses: list[dict], chunk_starts: list[int]) -> dict:
+	"""
+	Joins per-chunk Snap-to-Roads responses into one response for the whole path.
 
-def filter_distant_points(points: list) -> list:
+	Each chunk after the first re-snaps the last ROADS_CHUNK_OVERLAP points of the
+	previous chunk for context; those points (and the interpolated points leading up
+	to them) are dropped, originalIndex is shifted back to the full path, and any
+	duplicate point left at a seam is removed.
 	"""
-	Filters out points that are less than 5 km apart.
+	snapped_points = []
+	warnings = []
+	for i, (start, response) in enumerate(zip(chunk_starts, responses)):
+		if "warningMessage" in response:
+			warnings.append(response["warningMessage"])
+
+		points = response.get("snappedPoints", [])
+		if i > 0:
+			seam = max(
+				(
+					j
+					for j, point in enumerate(points)
+					if point.get("originalIndex", ROADS_CHUNK_OVERLAP)
+					< ROADS_CHUNK_OVERLAP
+				),
+				default=-1,
+			)
+			points = points[seam + 1 :]
+
+		for point in points:
+			if "originalIndex" in point:
+				point = {**point, "originalIndex": point["originalIndex"] + start}
+			if snapped_points and snapped_points[-1]["location"] == point["location"]:
+				continue
+			snapped_points.append(point)
+
+	stitched = {"snappedPoints": snapped_points}
+	if warnings:
+		stitched["warningMessage"] = "\n".join(warnings)
+	return stitched
+
+
+def filter_distant_points(
+	points: list, min_distance_km: float = 5.0, exact: bool = False
+) -> list:
 	"""
-	placeIDs = []
-	for i, point in enumerate(points):
-		if (
-			i == 0
-			or get_point_distance(points[i - 1]["location"], point["location"]) > 5
-		):
-			placeIDs.append(point["placeId"])
-	return placeIDs
+	Filters out points that are less than 5 km from the last point kept.
+
+	Args:
+	points: Snap-to-Roads `snappedPoints`, each with a `location` and `placeId`.
+	min_distance_km: Minimum spacing between kept points.
+	exact: Measure geodesic instead of haversine distances (slower).
+
+	Returns:
+	The place IDs of the kept points, in route order.
+	"""
+	coords = [
+		(point["location"]["latitude"], point["location"]["longitude"])
+		for point in points
+	]
+	kept = anchor_filter(coords, min_distance_km, exact)
+	return [points[i]["placeId"] for i in kept]
 
 
 def handle_api_warning(warning_message: str):
@@ -190,78 +699,201 @@ def handle_api_warning(warning_message: str):
 
 
 def get_place_images(name: str, input_type: str = "name") -> list | None:
-	"""Requests list of images for a place (name) from google."""
+	"""Sync facade over get_place_images_async."""
+	return background_loop.run(get_place_images_async(name, input_type))
+
+
+async def get_place_images_async(
+	name: str,
+	input_type: str = "name",
+	client: AsyncHTTPClient = google_client,
+	store: ImageStore = image_store,
+) -> list[PhotoHandle] | None:
+	"""
+	Requests the images for a place (name or place ID) from google.
+	Photos not already in the image store are downloaded concurrently and streamed to
+	disk, and a thumbnail is made once for each.
+
+	Returns:
+	A PhotoHandle for every photo that is on disk, in Google's order.
+	"""
 
 	log.info(f"Fetching images for {name}")
 
-	url = "https://maps.googleapis.com/maps/api/place/"
-	photos_path: str
+	url = f"{Config.GOOGLE_MAPS_BASE_URL}/maps/api/place/"
 
 	match input_type:
 		case "name":
 			url += f"findplacefromtext/json?input={name}&inputtype=textquery&fields=photo&key={API_KEY}"
-			photos_path = "image_response['candidates'][0]['photos']"
 		case "id":
 			url += f"details/json?place_id={name}&fields=photo&key={API_KEY}"
-			photos_path = "image_response['result']['photos']"
 		case _:
 			log.error(f"Invalid image search input type: {input_type}")
 			return None
 
-	image_response = json.loads(requests.get(url).text)
+	image_response = await client.get_json(url)
 
 	if (status := image_response["status"]) != "OK":
 		raise APIError(f"Image API returned status: {status}", url)
 
-	photo_codes = eval(photos_path)
-	photos = []
+	if input_type == "name":
+		photo_codes = image_response["candidates"][0].get("photos", [])
+	else:
+		photo_codes = image_response["result"].get("photos", [])
+	references = [photo["photo_reference"] for photo in photo_codes]
 
-	base_url = "https://maps.googleapis.com/maps/api/place/photo?"
-	for photo in photo_codes:
-		url = (
-			base_url
-			+ f"photo_reference={photo['photo_reference']}&maxheight=1600&maxwidth=1600&key={API_KEY}"
-		)
+	semaphore = asyncio.Semaphore(Config.PHOTO_MAX_CONCURRENCY)
+	loop = asyncio.get_running_loop()
+
+	async def store_photo(reference: str) -> bool:
+		if store.has(reference):
+			return True
 
-		photo_response = requests.get(url)
-		if photo_response.status_code == 400:
+		photo_url = f"{Config.GOOGLE_MAPS_BASE_URL}/maps/api/place/photo?photo_reference={reference}&maxheight=1600&maxwidth=1600&key={API_KEY}"
+		store.make_dirs(reference)
+		async with semaphore:
+			status_code = await client.download(
+				photo_url, store.path_for(store.key_for(reference))
+			)
+		if status_code != 200:
 			log.error(
-				f"An unknown error occured grabbing image with reference {photo['photo_reference']}"
+				f"An unknown error occured grabbing image with reference {reference} ({status_code})"
 			)
-		photos.append(photo_response.content)
+			return False
+
+		# resizing is CPU bound, keep it off the event loop
+		await loop.run_in_executor(None, store.make_thumbnail, reference)
+		return True
+
+	stored = await asyncio.gather(*(store_photo(ref) for ref in references))
 
-	return photos
+	return [store.handle_for(ref) for ref, ok in zip(references, stored) if ok]
 
 
 def get_nearby_activities(city: str) -> list[tuple[str, str]]:
+	"""Sync facade over get_nearby_activities_async."""
+	return background_loop.run(get_nearby_activities_async(city))
+
+
+async def get_nearby_activities_async(
+	city: str,
+	client: AsyncHTTPClient = google_client,
+	tile_cache: SQLiteCache = activity_tile_cache,
+	flights: SingleFlight = upstream_flights,
+) -> list[tuple[str, str]]:
 	"""
 	Gets list of nearby activities given a city name.
 	Weird behavior, use with caution
+
+	Results are cached per geohash tile (ACTIVITY_TILE_PRECISION), searched from the
+	tile's center, so neighbouring places in the same tile share one Nearby Search.
+	Concurrent lookups landing in a tile whose search is still running join it.
 	"""
-	lat, lng = get_coordinates(city)
-	url = f"https://maps.googleapis.com/maps/api/place/nearbysearch/json?location={lat},{lng}&radius=50000&type=tourist_attraction&key={API_KEY}"
-	activity_list_response = json.loads(requests.get(url).text)
+	lat, lng = await get_coordinates_async(city, client)
+	tile = geohash_encode(lat, lng, Config.ACTIVITY_TILE_PRECISION)
+	if (cached := tile_cache.get(tile)) is not None:
+		return [tuple(activity) for activity in cached]
+
+	async def search_tile() -> list[tuple[str, str]]:
+		activities = await _nearby_search_tile(tile, client)
+		tile_cache.set_many({tile: activities})
+		return activities
+
+	return await flights.do_async(("nearbysearch", tile), search_tile)
+
+
+def get_nearby_activities_many(
+	cities: list[str],
+) -> dict[str, list[tuple[str, str]] | None]:
+	"""Sync facade over get_nearby_activities_many_async."""
+	return background_loop.run(get_nearby_activities_many_async(cities))
 
-	if (status := activity_list_response["status"]) != "OK":
-		log.critical(f"Nearby Search Error ({city}): {status}")
-		raise APIError(f"Nearby Search API returned status: {status}", url)
+
+async def get_nearby_activities_many_async(
+	cities: list[str], client: AsyncHTTPClient = google_client
+) -> dict[str, list[tuple[str, str]] | None]:
+	"""
+	Looks up the activities of many cities at once, so the paginated searches of
+	different tiles overlap instead of running back to back.
+
+	Returns:
+	{city: activities}, with None for cities whose search failed.
+	"""
+
+	async def search(city: str):
+		try:
+			return await get_nearby_activities_async(city, client)
+		except APIError as e:
+			log.warning(f"No nearby results for '{city}': {e}")
+			return None
+
+	results = await asyncio.gather(*(search(city) for city in cities))
+	return dict(zip(cities, results))
+
+
+async def _nearby_search_tile(
+	tile: str, client: AsyncHTTPClient
+) -> list[tuple[str, str]]:
+	"""Runs Nearby Search around a tile's center, following up to NEARBY_MAX_PAGES pages."""
+	lat, lng = geohash_center(tile)
+	base_url = (
+		f"{Config.GOOGLE_MAPS_BASE_URL}/maps/api/place/nearbysearch/json?key={API_KEY}"
+	)
+	url = f"{base_url}&location={lat},{lng}&radius=50000&type=tourist_attraction"
 
 	activities = []
-	for activity in activity_list_response["results"]:
-		activities.append((activity["name"], activity["place_id"]))
+	for page in range(Config.NEARBY_MAX_PAGES):
+		activity_list_response = await client.get_json(url)
+		status = activity_list_response["status"]
+
+		if status == "INVALID_REQUEST" and page > 0:
+			# a next_page_token takes a moment to become valid; wait and retry once
+			await asyncio.sleep(NEARBY_PAGE_TOKEN_DELAY)
+			activity_list_response = await client.get_json(url)
+			status = activity_list_response["status"]
+
+		if status == "ZERO_RESULTS":
+			break
+		if status != "OK":
+			log.critical(f"Nearby Search Error (tile {tile}): {status}")
+			raise APIError(f"Nearby Search API returned status: {status}", url)
+
+		for activity in activity_list_response["results"]:
+			activities.append((activity["name"], activity["place_id"]))
+
+		if not (token := activity_list_response.get("next_page_token")):
+			break
+		# the loop yields here, so other tiles' searches proceed while this one waits
+		await asyncio.sleep(NEARBY_PAGE_TOKEN_DELAY)
+		url = f"{base_url}&pagetoken={token}"
 
 	return activities
 
 
 def get_coordinates(city: str) -> tuple[float, float]:
+	"""Sync facade over get_coordinates_async."""
+	return background_loop.run(get_coordinates_async(city))
+
+
+async def get_coordinates_async(
+	city: str,
+	client: AsyncHTTPClient = google_client,
+	cache: SQLiteCache = coordinates_cache,
+	flights: SingleFlight = upstream_flights,
+) -> tuple[float, float]:
 	"""Returns tuple containing lat/lng coords of given city"""
-	url = f"https://maps.googleapis.com/maps/api/place/findplacefromtext/json?input={city}&inputtype=textquery&fields=geometry&key={API_KEY}"
-	city_id_response = json.loads(requests.get(url).text)
+	key = normalize_place_name(city)
+	if (cached := cache.get(key)) is not None:
+		return tuple(cached)
+
+	url = f"{Config.GOOGLE_MAPS_BASE_URL}/maps/api/place/findplacefromtext/json?input={city}&inputtype=textquery&fields=geometry&key={API_KEY}"
+	city_id_response = await flights.do_async(url, lambda: client.get_json(url))
 
 	if (status := city_id_response["status"]) != "OK":
 		raise APIError(f"Place API returned status: {status}", url)
 
 	location = city_id_response["candidates"][0]["geometry"]["location"]
+	cache.set_many({key: [location["lat"], location["lng"]]})
 	return (location["lat"], location["lng"])
 
 
@@ -76,22 +76,45 @@ class Place(db.Model):
 	Attributes:
 	        id (int): Primary key.
 	        city (str): Name of the city.
+	        county (str): Name of the county, if known; helps find the city's Wikipedia article.
 	        state (str): Name of the state.
 	        population (int): Population of the place.
 	        activities (str): String of activities available at the place.
-	        wiki (str): Wiki information about the place.
+	        wiki (str): Wiki information about the place (None until enriched).
 	        times_favorited (int): Number of times this place has been favorited.
 	        times_searched (int): Number of times this place has been searched.
+	        enrichment_status (str): "pending" for a stub still to be scraped, then "ready" or "failed".
+	        enrichment_attempts (int): Times scraping the stub has failed so far.
+	        enrichment_retry_at (DateTime): When a stub that failed may be tried again (UTC).
+	        created_at (DateTime): When the Place was created (UTC).
+	        enriched_at (DateTime): When its wiki and activities were scraped (UTC).
 	"""
 
+	# one Place per city and state; also the index routing_helper_functions.resolve_places reads
+	__table_args__ = (db.UniqueConstraint("city", "state", name="uq_place_city_state"),)
+
 	id = db.Column(db.Integer, primary_key=True)
 	city = db.Column(db.String(80), index=True, unique=False)
+	county = db.Column(db.String(80))
 	state = db.Column(db.String(80), index=True, unique=False)
 	population = db.Column(db.Integer, index=False, unique=False)
 	activities = db.Column(db.String(1000), index=False, unique=False)
 	wiki = db.Column(db.String(5000), index=False, unique=False)
 	times_favorited = db.Column(db.Integer, index=False, unique=False)
 	times_searched = db.Column(db.Integer, index=False, unique=False)
+	enrichment_status = db.Column(
+		db.String(16),
+		nullable=False,
+		default="ready",
+		server_default="ready",
+		index=True,
+	)
+	enrichment_attempts = db.Column(
+		db.Integer, nullable=False, default=0, server_default="0"
+	)
+	enrichment_retry_at = db.Column(db.DateTime)
+	created_at = db.Column(db.DateTime, default=datetime.utcnow)
+	enriched_at = db.Column(db.DateTime)
 
 	# custom representation for html
 	def __repr__(self):
@@ -108,7 +131,9 @@ class Favoriteitem(db.Model):
 	"""
 
 	id = db.Column(db.Integer, primary_key=True)
-	place_id = db.Column(db.Integer, db.ForeignKey("place.id"))
+	place_id = db.Column(
+		db.Integer, db.ForeignKey("place.id", ondelete="CASCADE"), index=True
+	)
 	favoritelist_id = db.Column(db.Integer, db.ForeignKey("favoritelist.id"))
 
 	def __repr__(self):
@@ -127,10 +152,14 @@ class Searchitem(db.Model):
 	"""
 
 	id = db.Column(db.Integer, primary_key=True)
-	place_id = db.Column(db.Integer, db.ForeignKey("place.id"))
+	place_id = db.Column(
+		db.Integer, db.ForeignKey("place.id", ondelete="CASCADE"), index=True
+	)
 	searchlist_id = db.Column(db.Integer, db.ForeignKey("searchlist.id"))
 
 
+# The *item tables' rows go with their Place when it is removed (ON DELETE CASCADE; see
+#   routing_helper_functions.delete_place), while Travels keep their route without it.
 # Like the other *item classes, this class is for abstracting a Place() with the list Class that stores it.
 # That way, if a 'place' needs to ever be removed from a list, the Place() entity itself isn't removed from the db, just the abstracted item class.
 class Travelplaceitem(db.Model):
@@ -143,7 +172,9 @@ class Travelplaceitem(db.Model):
 	"""
 
 	id = db.Column(db.Integer, primary_key=True)
-	place_id = db.Column(db.Integer, db.ForeignKey("place.id"))
+	place_id = db.Column(
+		db.Integer, db.ForeignKey("place.id", ondelete="CASCADE"), index=True
+	)
 	travel_id = db.Column(db.Integer, db.ForeignKey("travel.id"))
 
 
@@ -198,15 +229,23 @@ class Travel(db.Model):
 	        origin_place_id (int): Foreign key to the Place of origin.
 	        destination_place_id (int): Foreign key to the destination Place.
 	        travellist_id (int): Foreign key to the user's Travellist.
-	        price (Numeric): Estimated cost of the travel.
+	        price (Numeric): Estimated cost of the travel, once planned.
+	        status (str): "pending" while its Tripjob plans it, then "ready" or "failed".
 	        route_places (relationship): Dynamically loaded list of Places on the travel route.
 	"""
 
 	id = db.Column(db.Integer, primary_key=True)
-	origin_place_id = db.Column(db.Integer, db.ForeignKey("place.id"))
-	destination_place_id = db.Column(db.Integer, db.ForeignKey("place.id"))
+	origin_place_id = db.Column(
+		db.Integer, db.ForeignKey("place.id", ondelete="SET NULL")
+	)
+	destination_place_id = db.Column(
+		db.Integer, db.ForeignKey("place.id", ondelete="SET NULL")
+	)
 	travellist_id = db.Column(db.Integer, db.ForeignKey("travellist.id"))
-	price = db.Column(db.Numeric(precision=10, scale=2), nullable=False)
+	price = db.Column(db.Numeric(precision=10, scale=2))
+	status = db.Column(
+		db.String(16), nullable=False, default="ready", server_default="ready"
+	)
 
 	# 1 Travel() -> Many TravelPlaceItem()'s where each TravelPlaceItem has a foreign key to the Travel entity and a Place entity
 	route_places = db.relationship(
@@ -218,6 +257,8 @@ class Travel(db.Model):
 
 	def __repr__(self) -> str:
 		# return super().__repr__()
+		if self.status != "ready" and self.job is not None:
+			return f"{self.job.origin}   --->   {self.job.destination} ({self.status})"
 		origin_place = Place.query.filter_by(id=self.origin_place_id).first()
 		dest_place = Place.query.filter_by(id=self.destination_place_id).first()
 		return f"{origin_place}   --->   {dest_place}"
@@ -238,3 +279,82 @@ class Travellist(db.Model):
 		lazy="dynamic",
 		cascade="all, delete, delete-orphan",
 	)
+
+
+class Popularroute(db.Model):
+	"""A materialized Directions + city extraction result for an origin/destination pair.
+
+	Rows are created the first time a pair is requested and counted on every request;
+	the most requested ones are kept fresh by app.route_table.RouteWarmer.
+
+	Attributes:
+	        id (int): Primary key.
+	        origin_key (str): Canonical (normalized) origin, e.g. "socorro, nm".
+	        destination_key (str): Canonical (normalized) destination.
+	        cities (str): JSON of the ordered {placeId: [city, county, state]} route cities.
+	        distance_meters (int): Total driving distance.
+	        duration_seconds (int): Total driving time.
+	        geometry (str): The route's encoded overview polyline.
+	        times_requested (int): Number of times the pair has been planned.
+	        requested_at (DateTime): When the pair was last planned (UTC).
+	        refreshed_at (DateTime): When the route data was last computed (UTC), if ever.
+	"""
+
+	__table_args__ = (db.UniqueConstraint("origin_key", "destination_key"),)
+
+	id = db.Column(db.Integer, primary_key=True)
+	origin_key = db.Column(db.String(160), nullable=False)
+	destination_key = db.Column(db.String(160), nullable=False)
+	cities = db.Column(db.Text)
+	distance_meters = db.Column(db.Integer)
+	duration_seconds = db.Column(db.Integer)
+	geometry = db.Column(db.Text)
+	times_requested = db.Column(db.Integer, nullable=False, default=0, index=True)
+	requested_at = db.Column(db.DateTime)
+	refreshed_at = db.Column(db.DateTime)
+
+	def __repr__(self):
+		return f"{self.origin_key}   --->   {self.destination_key}"
+
+
+class Tripjob(db.Model):
+	"""A queued trip planning for a pending Travel, worked by app.trip_jobs.TripJobQueue.
+
+	Jobs live in the database, so trips queued or in flight when a worker process
+	stops are picked up again once their lease runs out.
+
+	Attributes:
+	        id (int): Primary key.
+	        travel_id (int): Foreign key to the pending Travel the job fills in.
+	        user_id (int): Foreign key to the User who asked for the trip.
+	        origin (str): The origin as entered, "City, State".
+	        destination (str): The destination as entered, "City, State".
+	        status (str): "queued", "running", "done" or "failed".
+	        attempts (int): Number of times a worker has started the job.
+	        error (str): Why the job failed, if it did.
+	        created_at (DateTime): When the job was queued (UTC).
+	        started_at (DateTime): When a worker last claimed the job (UTC).
+	        finished_at (DateTime): When the job finished or failed (UTC).
+	"""
+
+	id = db.Column(db.Integer, primary_key=True)
+	travel_id = db.Column(db.Integer, db.ForeignKey("travel.id"), nullable=False)
+	user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+	origin = db.Column(db.String(160), nullable=False)
+	destination = db.Column(db.String(160), nullable=False)
+	status = db.Column(db.String(16), nullable=False, default="queued", index=True)
+	attempts = db.Column(db.Integer, nullable=False, default=0)
+	error = db.Column(db.String(500))
+	created_at = db.Column(db.DateTime, default=datetime.utcnow)
+	started_at = db.Column(db.DateTime)
+	finished_at = db.Column(db.DateTime)
+
+	travel = db.relationship(
+		"Travel",
+		backref=db.backref("job", uselist=False, cascade="all, delete-orphan"),
+	)
+
+	def __repr__(self):
+		return (
+			f"Tripjob {self.id} ({self.status}): {self.origin} ---> {self.destination}"
+		)
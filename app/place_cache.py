@@ -0,0 +1,191 @@
+"""
+Durable SQLite caches for upstream place lookups, e.g. Google placeIds to the
+[city, county, state] result of geocoding.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+from config import Config
+
+# cache hits' accessed_at are written this many at a time (or with the next set_many),
+#   so a read is never a write transaction of its own
+TOUCH_BATCH_SIZE = 500
+
+
+class SQLiteCache:
+	"""SQLite-backed key/JSON-value cache with a TTL, a size bound, and hit/miss counters.
+
+	Entries older than `ttl_seconds` are treated as misses. Once the table grows
+	past `max_entries`, the least recently used entries are evicted; the row count
+	is kept in the file beside the table, so every process sharing it sees the same
+	bound. Reads only record their hits in memory; the access times reach the file
+	in batches.
+
+	Attributes:
+	        path (str): Location of the SQLite file (":memory:" for a throwaway cache).
+	        table (str): Table holding this cache's entries within the file.
+	        ttl_seconds (int): How long a cached result stays valid.
+	        max_entries (int): Upper bound on the number of cached keys.
+	        stats (dict): Hit, miss, and eviction counters.
+	"""
+
+	def __init__(
+		self,
+		path: str = Config.PLACE_CACHE_PATH,
+		table: str = "place_city",
+		ttl_seconds: int = Config.PLACE_CACHE_TTL_SECONDS,
+		max_entries: int = Config.PLACE_CACHE_MAX_ENTRIES,
+	):
+		self.path = path
+		self.table = table
+		self.ttl_seconds = ttl_seconds
+		self.max_entries = max_entries
+		self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+		self._conn = None
+		self._lock = threading.Lock()
+		# {key: accessed_at} of hits not yet written
+		self._touched = {}
+
+	def _connect(self) -> sqlite3.Connection:
+		# opened lazily so importing the module never touches the disk
+		if self._conn is None:
+			self._conn = sqlite3.connect(self.path, check_same_thread=False)
+			self._conn.execute(
+				f"CREATE TABLE IF NOT EXISTS {self.table} ("
+				"key TEXT PRIMARY KEY, value TEXT, "
+				"fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+			)
+			self._conn.execute(
+				f"CREATE INDEX IF NOT EXISTS ix_{self.table}_accessed_at "
+				f"ON {self.table} (accessed_at)"
+			)
+			# the table's row count, counted once when the file is first opened
+			self._conn.execute(
+				f"CREATE TABLE IF NOT EXISTS {self.table}_size (rows INTEGER NOT NULL)"
+			)
+			self._conn.execute(
+				f"INSERT INTO {self.table}_size SELECT COUNT(*) FROM {self.table} "
+				f"WHERE NOT EXISTS (SELECT 1 FROM {self.table}_size)"
+			)
+			self._conn.commit()
+		return self._conn
+
+	def get_many(self, keys: list[str]) -> dict:
+		"""Returns {key: value} for every key with a fresh cache entry."""
+		if not keys:
+			return {}
+
+		now = time.time()
+		unique_keys = list(dict.fromkeys(keys))
+		found = {}
+		with self._lock:
+			conn = self._connect()
+			# stay well under SQLite's bound-parameter limit
+			for i in range(0, len(unique_keys), 500):
+				chunk = unique_keys[i : i + 500]
+				marks = ",".join("?" * len(chunk))
+				rows = conn.execute(
+					f"SELECT key, value FROM {self.table} "
+					f"WHERE key IN ({marks}) AND fetched_at >= ?",
+					(*chunk, now - self.ttl_seconds),
+				)
+				found.update((key, json.loads(value)) for key, value in rows)
+
+			self._touched.update(dict.fromkeys(found, now))
+			if len(self._touched) >= TOUCH_BATCH_SIZE:
+				self._write_touches(conn)
+				conn.commit()
+
+			self.stats["hits"] += len(found)
+			self.stats["misses"] += len(unique_keys) - len(found)
+
+		return found
+
+	def get(self, key: str, default=None):
+		return self.get_many([key]).get(key, default)
+
+	def set_many(self, results: dict):
+		"""Stores JSON-serializable results, evicting the least recently used rows if over the bound."""
+		if not results:
+			return
+
+		now = time.time()
+		with self._lock:
+			conn = self._connect()
+			# taken before reading which keys exist, so no other process's write can
+			#   land between that and updating the row count
+			conn.execute("BEGIN IMMEDIATE")
+			# the LRU order has to be current before anything is evicted by it
+			self._write_touches(conn)
+
+			keys = list(results)
+			existing = 0
+			for i in range(0, len(keys), 500):
+				chunk = keys[i : i + 500]
+				(n,) = conn.execute(
+					f"SELECT COUNT(*) FROM {self.table} "
+					f"WHERE key IN ({','.join('?' * len(chunk))})",
+					chunk,
+				).fetchone()
+				existing += n
+			conn.executemany(
+				f"INSERT OR REPLACE INTO {self.table} "
+				"(key, value, fetched_at, accessed_at) VALUES (?, ?, ?, ?)",
+				[(key, json.dumps(value), now, now) for key, value in results.items()],
+			)
+			conn.execute(
+				f"UPDATE {self.table}_size SET rows = rows + ?", (len(keys) - existing,)
+			)
+			(count,) = conn.execute(f"SELECT rows FROM {self.table}_size").fetchone()
+
+			if (overflow := count - self.max_entries) > 0:
+				evicted = conn.execute(
+					f"DELETE FROM {self.table} WHERE key IN ("
+					f"SELECT key FROM {self.table} ORDER BY accessed_at LIMIT ?)",
+					(overflow,),
+				).rowcount
+				conn.execute(
+					f"UPDATE {self.table}_size SET rows = rows - ?", (evicted,)
+				)
+				self.stats["evictions"] += evicted
+			conn.commit()
+
+	def _write_touches(self, conn: sqlite3.Connection):
+		if self._touched:
+			conn.executemany(
+				f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+				[(accessed_at, key) for key, accessed_at in self._touched.items()],
+			)
+			self._touched = {}
+
+	def __len__(self) -> int:
+		with self._lock:
+			conn = self._connect()
+			return conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+	def clear(self):
+		with self._lock:
+			conn = self._connect()
+			conn.execute(f"DELETE FROM {self.table}")
+			conn.execute(f"UPDATE {self.table}_size SET rows = 0")
+			conn.commit()
+			self._touched = {}
+
+
+# placeId -> [city, county, state], consulted by map_requests.build_cities_list
+place_cache = SQLiteCache(table="place_city")
+# normalized city name -> [lat, lng] from Find Place
+coordinates_cache = SQLiteCache(
+	table="city_coordinates", ttl_seconds=Config.ACTIVITY_TILE_TTL_SECONDS
+)
+# geohash tile -> [[name, place_id], ...] from Nearby Search
+activity_tile_cache = SQLiteCache(
+	table="activity_tile", ttl_seconds=Config.ACTIVITY_TILE_TTL_SECONDS
+)
+# "origin|destination" (normalized) -> driving distance in meters from Distance Matrix
+pair_distance_cache = SQLiteCache(
+	table="pair_distance", ttl_seconds=Config.PAIR_DISTANCE_TTL_SECONDS
+)
@@ -0,0 +1,136 @@
+"""
+Place.times_searched and Place.times_favorited, updated with atomic SQL increments.
+
+By default each increment is an UPDATE ... SET times_searched = times_searched + 1
+within the caller's transaction, so concurrent requests never overwrite each other's
+counts. With PLACE_COUNTER_WRITE_BEHIND, increments are instead summed in memory and
+written every PLACE_COUNTER_FLUSH_SECONDS as one batch, sparing popular Places a write
+per request; counts then lag by up to an interval, and a process killed outright loses
+its unflushed increments.
+"""
+
+import atexit
+import threading
+from collections import defaultdict
+
+from flask import Flask, current_app
+from sqlalchemy import bindparam, update
+
+from app.log_manager import global_logger as log
+from app.models import Place
+from config import Config
+from database import db
+
+COUNTER_COLUMNS = ("times_searched", "times_favorited")
+
+
+class PlaceCounters:
+	"""Applies increments to Places' counters, at once or in write-behind batches.
+
+	Attributes:
+	        app (Flask): The app whose database holds the Places.
+	        write_behind (bool): Whether increments are buffered until the next flush.
+	        flush_seconds (float): Time between write-behind flushes.
+	"""
+
+	def __init__(
+		self,
+		app: Flask,
+		write_behind: bool = Config.PLACE_COUNTER_WRITE_BEHIND,
+		flush_seconds: float = Config.PLACE_COUNTER_FLUSH_SECONDS,
+	):
+		self.app = app
+		self.write_behind = write_behind
+		self.flush_seconds = flush_seconds
+		# {place_id: {column: delta}} waiting for the next flush
+		self._pending = defaultdict(lambda: dict.fromkeys(COUNTER_COLUMNS, 0))
+		self._lock = threading.Lock()
+		self._stop = threading.Event()
+		self._thread = None
+
+	def add(self, place_id: int, column: str, delta: int = 1):
+		"""
+		Adds delta to one of the Place's counters. Written through, the UPDATE joins the
+		caller's transaction and lands with its commit.
+		"""
+		if column not in COUNTER_COLUMNS:
+			raise ValueError(f"Not a Place counter: {column!r}")
+
+		if self.write_behind:
+			with self._lock:
+				self._pending[place_id][column] += delta
+		else:
+			Place.query.filter_by(id=place_id).update(
+				{column: getattr(Place, column) + delta}, synchronize_session=False
+			)
+
+	def flush(self) -> int:
+		"""Writes the buffered increments in one batch (committed); returns how many Places."""
+		with self._lock:
+			pending, self._pending = (
+				self._pending,
+				defaultdict(self._pending.default_factory),
+			)
+		# bound as delta_<column>, as the column names themselves are reserved for SET
+		rows = [
+			{
+				"place_id": place_id,
+				**{f"delta_{column}": delta for column, delta in deltas.items()},
+			}
+			for place_id, deltas in pending.items()
+			if any(deltas.values())
+		]
+		if not rows:
+			return 0
+
+		statement = (
+			update(Place.__table__)
+			.where(Place.__table__.c.id == bindparam("place_id"))
+			.values(
+				{
+					column: Place.__table__.c[column] + bindparam(f"delta_{column}")
+					for column in COUNTER_COLUMNS
+				}
+			)
+		)
+		with self.app.app_context():
+			try:
+				db.session.execute(statement, rows)
+				db.session.commit()
+			except Exception:
+				# put the batch back, to be written by a later flush
+				db.session.rollback()
+				with self._lock:
+					for place_id, deltas in pending.items():
+						for column, delta in deltas.items():
+							self._pending[place_id][column] += delta
+				raise
+		return len(rows)
+
+	def start(self) -> "PlaceCounters":
+		self._thread = threading.Thread(
+			target=self._run, name="place-counters", daemon=True
+		)
+		self._thread.start()
+		# whatever is still buffered when the process exits normally is written out
+		atexit.register(self.stop)
+		return self
+
+	def stop(self):
+		self._stop.set()
+		if self._thread is not None:
+			self._thread.join()
+			self._thread = None
+		self.flush()
+
+	def _run(self):
+		while not self._stop.wait(self.flush_seconds):
+			try:
+				self.flush()
+			except Exception:
+				log.exception("Place counter flush failed")
+
+
+# adds to a Place's counter through the current app's PlaceCounters
+def add_to_place_counter(place_id: int, column: str, delta: int = 1):
+	current_app.extensions["place_counters"].add(place_id, column, delta)
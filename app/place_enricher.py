@@ -0,0 +1,155 @@
+"""
+Background enrichment of stub Places.
+
+With LAZY_PLACE_ENRICHMENT, a new Place is inserted as a stub (city, state and
+population only; see routing_helper_functions.stub_place) so a trip's Places exist at
+once. The PlaceEnricher scrapes their wiki and activities afterwards, a batch at a
+time, and place_info renders whatever is ready meanwhile. A stub that can't be
+scraped stays pending and is tried again after a growing backoff, until it has
+failed PLACE_ENRICHER_MAX_ATTEMPTS times.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import or_
+
+from app.log_manager import global_logger as log
+from app.models import Place
+from app.routing_helper_functions import enrich_place, nearby_activities_of
+from config import Config
+from database import db
+
+# the columns a stub is missing until it is enriched
+ENRICHED_COLUMNS = ("population", "activities", "wiki", "enriched_at")
+
+
+class PlaceEnricher:
+	"""Fills in pending stub Places on a schedule, or as soon as it is woken.
+
+	Attributes:
+	        app (Flask): The app whose database holds the Places.
+	        interval_seconds (float): Time between passes when nobody wakes it.
+	        batch_size (int): Stubs enriched per pass.
+	        concurrency (int): Stubs scraped at once.
+	        retry_seconds (float): Wait before a stub's first retry, doubled after each.
+	        max_attempts (int): Failed scrapes after which a stub is marked failed.
+	"""
+
+	def __init__(
+		self,
+		app: Flask,
+		interval_seconds: float = Config.PLACE_ENRICHER_INTERVAL_SECONDS,
+		batch_size: int = Config.PLACE_ENRICHER_BATCH_SIZE,
+		concurrency: int = Config.PLACE_ENRICH_CONCURRENCY,
+		retry_seconds: float = Config.PLACE_ENRICHER_RETRY_SECONDS,
+		max_attempts: int = Config.PLACE_ENRICHER_MAX_ATTEMPTS,
+	):
+		self.app = app
+		self.interval_seconds = interval_seconds
+		self.batch_size = batch_size
+		self.concurrency = concurrency
+		self.retry_seconds = retry_seconds
+		self.max_attempts = max_attempts
+		self._wakeup = threading.Event()
+		self._stop = threading.Event()
+		self._thread = None
+
+	def start(self) -> "PlaceEnricher":
+		self._thread = threading.Thread(
+			target=self._run, name="place-enricher", daemon=True
+		)
+		self._thread.start()
+		return self
+
+	def stop(self):
+		self._stop.set()
+		self._wakeup.set()
+		if self._thread is not None:
+			self._thread.join()
+
+	def wake(self):
+		"""Starts a pass now rather than at the next interval."""
+		self._wakeup.set()
+
+	def _run(self):
+		while not self._stop.is_set():
+			try:
+				while not self._stop.is_set() and self.enrich_once():
+					pass
+			except Exception:
+				log.exception("Place enrichment pass failed")
+			self._wakeup.wait(self.interval_seconds)
+			self._wakeup.clear()
+
+	def enrich_once(self) -> int:
+		"""Enriches the oldest batch_size pending stubs due a try; returns how many it took."""
+		with self.app.app_context():
+			now = datetime.utcnow()
+			stubs = (
+				Place.query.filter(
+					Place.enrichment_status == "pending",
+					or_(
+						Place.enrichment_retry_at.is_(None),
+						Place.enrichment_retry_at <= now,
+					),
+				)
+				.order_by(Place.id)
+				.limit(self.batch_size)
+				.all()
+			)
+			if not stubs:
+				return 0
+
+			# the batch's activities are searched for together, their pages overlapping
+			activities = nearby_activities_of(
+				[(place.city, place.state) for place in stubs]
+			)
+			with ThreadPoolExecutor(
+				max_workers=self.concurrency, thread_name_prefix="place-enrich"
+			) as pool:
+				scraped = list(
+					pool.map(
+						self._scrape,
+						[
+							(
+								place.city,
+								place.county or "",
+								place.state,
+								activities[(place.city, place.state)],
+							)
+							for place in stubs
+						],
+					)
+				)
+
+			for place, fields in zip(stubs, scraped):
+				# a stub enriched elsewhere meanwhile keeps what it has
+				if fields is not None:
+					values = {column: fields[column] for column in ENRICHED_COLUMNS}
+					values["enrichment_status"] = "ready"
+				else:
+					values = self._retry(place.enrichment_attempts + 1, now)
+				Place.query.filter_by(id=place.id, enrichment_status="pending").update(
+					values, synchronize_session=False
+				)
+			db.session.commit()
+			return len(stubs)
+
+	def _retry(self, attempts: int, now: datetime) -> dict:
+		# the columns of a stub whose scrape just failed for the attempts-th time
+		if attempts >= self.max_attempts:
+			return {"enrichment_status": "failed", "enrichment_attempts": attempts}
+		backoff = timedelta(seconds=self.retry_seconds * 2 ** (attempts - 1))
+		return {"enrichment_attempts": attempts, "enrichment_retry_at": now + backoff}
+
+	@staticmethod
+	def _scrape(key: tuple) -> dict | None:
+		city, county, state, activities = key
+		try:
+			return enrich_place(city, county, state, activities)
+		except Exception:
+			log.exception(f"Could not enrich {city}, {state}")
+			return None
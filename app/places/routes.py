@@ -1,8 +1,12 @@
 import json
+import os
 
-from flask import render_template
+from flask import abort, render_template, send_file, url_for
 from flask_login import login_required
 
+from app.image_store import image_store
+from app.log_manager import global_logger as log
+from app.map_requests import APIError, get_place_images
 from app.models import Place
 from app.places import places
 from app.scraping_functions.wiki_places import get_main_image
@@ -16,12 +20,25 @@ def place_info(place_id):
 	# get the unique place by id
 	place = Place.query.get(place_id)
 
+	# a stub Place (see PlaceEnricher) renders what it has until its wiki is scraped
 	try:
-		place_wiki = json.loads(place.wiki)
+		place_wiki = {} if place.wiki is None else json.loads(place.wiki)
 	except json.decoder.JSONDecodeError:
 		place_wiki = json.dumps('{"error": "wiki not availble"}')
 
-	url_string = get_main_image(place.city, place.state)
+	# the photo lookups are scrapes too, so they wait for the stub's enrichment
+	# Google's photos are served from the image store (see place_photo), with the
+	#   Wikipedia image as the fallback
+	url_string, photos = None, []
+	if place.enrichment_status != "pending":
+		try:
+			photos = get_place_images(f"{place.city}, {place.state}") or []
+		except APIError as e:
+			log.warning(f"No photos for {place}: {e}")
+		if photos:
+			url_string = url_for("places.place_photo", key=photos[0].key)
+		else:
+			url_string = get_main_image(place.city, place.state)
 	if not url_string:
 		url_string = "https://en.wikipedia.org/static/images/icons/wikipedia.png"
 
@@ -31,4 +48,25 @@ def place_info(place_id):
 		place=place,
 		wiki_content=place_wiki,
 		url_string=url_string,
+		photos=photos,
 	)
+
+
+# Serves a Place photo (or its thumbnail) from the on-disk image store
+# photos are keyed by content address, so they can be cached by the browser indefinitely
+@places.route("/place_photo/<string:key>")
+@places.route("/place_photo/<string:key>/<string:size>")
+@login_required
+def place_photo(key, size="full"):
+	try:
+		path = image_store.path_for(key, thumbnail=size == "thumbnail")
+	except ValueError:
+		abort(404)
+
+	if size == "thumbnail" and not os.path.exists(path):
+		# no thumbnail without Pillow, fall back to the full-size photo
+		path = image_store.path_for(key)
+	if not os.path.exists(path):
+		abort(404)
+
+	return send_file(path, mimetype="image/jpeg", max_age=31536000)
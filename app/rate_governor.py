@@ -0,0 +1,146 @@
+"""
+Per-endpoint request quotas and retry/backoff for the upstream Google APIs.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Awaitable, Callable, TypeVar
+from urllib.parse import urlsplit
+
+from app.log_manager import global_logger as log
+from config import Config
+
+T = TypeVar("T")
+
+# HTTP statuses and API `status` values worth retrying after a pause
+RETRYABLE_HTTP_STATUSES = {429, 500, 502, 503, 504}
+RETRYABLE_API_STATUSES = {"OVER_QUERY_LIMIT", "UNKNOWN_ERROR", "RESOURCE_EXHAUSTED"}
+
+
+class TokenBucket:
+	"""Allows `rate` calls per second on average, with bursts of up to `capacity`.
+
+	Callers reserve a token and are told how long to wait for it, so the same bucket
+	serves threads (time.sleep) and coroutines (asyncio.sleep) alike.
+	"""
+
+	def __init__(self, rate: float, capacity: float | None = None):
+		self.rate = rate
+		self.capacity = capacity if capacity is not None else max(rate, 1.0)
+		self._tokens = self.capacity
+		self._updated = time.monotonic()
+		self._lock = threading.Lock()
+
+	def reserve(self) -> float:
+		"""Takes a token and returns the seconds to wait before using it."""
+		with self._lock:
+			now = time.monotonic()
+			self._tokens = min(
+				self.capacity, self._tokens + (now - self._updated) * self.rate
+			)
+			self._updated = now
+			self._tokens -= 1
+			# a negative balance is a queue of callers already waiting for tokens
+			return max(0.0, -self._tokens / self.rate)
+
+
+class RateGovernor:
+	"""Shared token buckets per API endpoint plus jittered exponential backoff.
+
+	Attributes:
+	        limits (dict): Queries per second allowed for each endpoint name.
+	        max_retries (int): Retries after the first attempt on a retryable result.
+	        backoff_base (float): Delay before the first retry, in seconds.
+	        backoff_max (float): Upper bound on any single retry delay.
+	        stats (dict): Counters of calls, throttled calls, retries, and gave-ups.
+	"""
+
+	def __init__(
+		self,
+		limits: dict[str, float] = Config.GOOGLE_QPS_LIMITS,
+		max_retries: int = Config.GOOGLE_MAX_RETRIES,
+		backoff_base: float = Config.GOOGLE_BACKOFF_BASE,
+		backoff_max: float = Config.GOOGLE_BACKOFF_MAX,
+	):
+		self.limits = limits
+		self.max_retries = max_retries
+		self.backoff_base = backoff_base
+		self.backoff_max = backoff_max
+		self.stats = {"calls": 0, "throttled": 0, "retried": 0, "gave_up": 0}
+		self._buckets = {endpoint: TokenBucket(qps) for endpoint, qps in limits.items()}
+
+	def endpoint_for(self, url: str) -> str | None:
+		"""Name of the quota a url counts against (first limit name found in its path)."""
+		# the query string holds place names, which must not pick the quota
+		path = urlsplit(url).path
+		return next((endpoint for endpoint in self.limits if endpoint in path), None)
+
+	def _reserve(self, endpoint: str | None) -> float:
+		self.stats["calls"] += 1
+		if (bucket := self._buckets.get(endpoint)) is None:
+			return 0.0
+		if (delay := bucket.reserve()) > 0:
+			self.stats["throttled"] += 1
+		return delay
+
+	def _backoff(self, attempt: int) -> float:
+		# "full jitter": anywhere between 0 and the exponential ceiling
+		return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+	def _should_retry(self, endpoint, attempt: int, retryable: bool) -> bool:
+		if not retryable:
+			return False
+		if attempt >= self.max_retries:
+			self.stats["gave_up"] += 1
+			log.error(f"Giving up on {endpoint} after {attempt + 1} attempts")
+			return False
+		self.stats["retried"] += 1
+		return True
+
+	def call(
+		self,
+		endpoint: str | None,
+		send: Callable[[], T],
+		is_retryable: Callable[[T], bool],
+	) -> T:
+		"""
+		Sends a blocking request (e.g. requests.get) under the endpoint's quota,
+		retrying with backoff while is_retryable(result) holds.
+		"""
+		attempt = 0
+		while True:
+			time.sleep(self._reserve(endpoint))
+			result = send()
+			if not self._should_retry(endpoint, attempt, is_retryable(result)):
+				return result
+			time.sleep(self._backoff(attempt))
+			attempt += 1
+
+	async def call_async(
+		self,
+		endpoint: str | None,
+		send: Callable[[], Awaitable[T]],
+		is_retryable: Callable[[T], bool],
+	) -> T:
+		"""Async counterpart of call(); waits with asyncio.sleep so the loop keeps running."""
+		attempt = 0
+		while True:
+			await asyncio.sleep(self._reserve(endpoint))
+			result = await send()
+			if not self._should_retry(endpoint, attempt, is_retryable(result)):
+				return result
+			await asyncio.sleep(self._backoff(attempt))
+			attempt += 1
+
+
+def is_retryable_response(status_code: int, body: dict | None = None) -> bool:
+	"""Whether an HTTP status / Google API JSON body is a transient quota or server error."""
+	if status_code in RETRYABLE_HTTP_STATUSES:
+		return True
+	return isinstance(body, dict) and body.get("status") in RETRYABLE_API_STATUSES
+
+
+# shared governor for every Google API call made through app.http_client
+google_governor = RateGovernor()
@@ -0,0 +1,278 @@
+"""
+Batch distance helpers for decoding, resampling, and thinning out route geometry.
+
+NumPy is used when installed; otherwise the same haversine math runs in pure Python.
+"""
+
+import math
+
+from geopy.distance import geodesic
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+# mean Earth radius (IUGG), matches what geopy's great_circle uses
+EARTH_RADIUS_KM = 6371.0088
+
+# haversine is within ~0.5% of the WGS-84 geodesic; used as a safe lower bound in exact mode
+HAVERSINE_MAX_ERROR = 0.01
+
+# number of points compared against an anchor in one batch, before any adaptation
+ANCHOR_WINDOW = 64
+
+
+def haversine_km(anchor: tuple[float, float], coords) -> list[float]:
+	"""
+	Great-circle distances from anchor to every point in coords.
+
+	Args:
+	anchor: A (lat, lng) tuple in decimal degrees.
+	coords: A sequence (or N x 2 array) of (lat, lng) points in decimal degrees.
+
+	Returns:
+	The distances in kilometers, as a NumPy array when NumPy is available.
+	"""
+	if np is not None:
+		coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+		lat1, lng1 = np.radians(anchor[0]), np.radians(anchor[1])
+		lat2, lng2 = np.radians(coords[:, 0]), np.radians(coords[:, 1])
+		a = (
+			np.sin((lat2 - lat1) / 2) ** 2
+			+ np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+		)
+		return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+	lat1, lng1 = math.radians(anchor[0]), math.radians(anchor[1])
+	cos_lat1 = math.cos(lat1)
+	distances = []
+	for lat, lng in coords:
+		lat2, lng2 = math.radians(lat), math.radians(lng)
+		a = (
+			math.sin((lat2 - lat1) / 2) ** 2
+			+ cos_lat1 * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+		)
+		distances.append(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a)))
+	return distances
+
+
+def geodesic_km(anchor: tuple[float, float], coords) -> list[float]:
+	"""Exact WGS-84 geodesic distances (km) from anchor to every point in coords."""
+	return [geodesic(tuple(anchor), tuple(coord)).km for coord in coords]
+
+
+def distances_km(anchor: tuple[float, float], coords, exact: bool = False):
+	"""Distances from anchor to coords; haversine by default, geodesic if exact."""
+	return geodesic_km(anchor, coords) if exact else haversine_km(anchor, coords)
+
+
+def anchor_filter(coords, min_km: float = 5.0, exact: bool = False) -> list[int]:
+	"""
+	Thins a route down to points spaced more than min_km apart.
+
+	The first point is always kept. Each following point is compared to the last
+	point *kept* (the anchor), not its neighbour, so a long run of short steps
+	still yields a point every min_km. Distances from the anchor are computed a
+	window at a time, and the window adapts to the spacing of the route. In exact
+	mode haversine narrows down the candidate first, so only a couple of geodesic
+	solves are needed per kept point.
+
+	Args:
+	coords: A sequence (or N x 2 array) of (lat, lng) points in decimal degrees.
+	min_km: Minimum distance between kept points, in kilometers.
+	exact: Use geodesic distances instead of haversine.
+
+	Returns:
+	The indices of the kept points, in route order.
+	"""
+	n_points = len(coords)
+	if n_points == 0:
+		return []
+	if np is not None:
+		coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+
+	kept = [0]
+	anchor, start, window = 0, 1, ANCHOR_WINDOW
+	while start < n_points:
+		end = min(start + window, n_points)
+		distances = haversine_km(coords[anchor], coords[start:end])
+		if exact:
+			far = _first_beyond(distances, min_km * (1 - HAVERSINE_MAX_ERROR))
+			if far is not None:
+				far = _first_geodesic_beyond(coords, anchor, start + far, end, min_km)
+				far = far - start if far is not None else None
+		else:
+			far = _first_beyond(distances, min_km)
+
+		if far is None:
+			# nothing far enough in this window; look further ahead next time
+			start, window = end, window * 2
+		else:
+			anchor = start + far
+			kept.append(anchor)
+			start, window = anchor + 1, max(ANCHOR_WINDOW, 2 * (far + 1))
+
+	return kept
+
+
+def _first_beyond(distances, min_km: float) -> int | None:
+	"""Index of the first distance greater than min_km, or None."""
+	if np is not None and isinstance(distances, np.ndarray):
+		beyond = np.flatnonzero(distances > min_km)
+		return int(beyond[0]) if beyond.size else None
+	return next((i for i, d in enumerate(distances) if d > min_km), None)
+
+
+def _first_geodesic_beyond(coords, anchor: int, start: int, end: int, min_km: float):
+	"""Index in [start, end) of the first point more than min_km (geodesic) from anchor."""
+	anchor_coord = tuple(coords[anchor])
+	for i in range(start, end):
+		if geodesic(anchor_coord, tuple(coords[i])).km > min_km:
+			return i
+	return None
+
+
+def decode_polyline(encoded: str) -> list[tuple[float, float]]:
+	"""
+	Decodes a Google encoded polyline (e.g. a Directions `overview_polyline`).
+
+	Returns:
+	The (lat, lng) points of the polyline in decimal degrees.
+	"""
+	coords = []
+	index, lat, lng = 0, 0, 0
+	while index < len(encoded):
+		deltas = []
+		for _ in range(2):
+			shift, result = 0, 0
+			while True:
+				byte = ord(encoded[index]) - 63
+				index += 1
+				result |= (byte & 0x1F) << shift
+				shift += 5
+				if byte < 0x20:
+					break
+			deltas.append(~(result >> 1) if result & 1 else result >> 1)
+		lat += deltas[0]
+		lng += deltas[1]
+		coords.append((lat / 1e5, lng / 1e5))
+	return coords
+
+
+def encode_polyline(coords) -> str:
+	"""Encodes (lat, lng) points with Google's polyline algorithm; inverse of decode_polyline."""
+	chunks = []
+	prev_lat, prev_lng = 0, 0
+	for lat, lng in coords:
+		lat, lng = round(lat * 1e5), round(lng * 1e5)
+		for delta in (lat - prev_lat, lng - prev_lng):
+			value = ~(delta << 1) if delta < 0 else delta << 1
+			while value >= 0x20:
+				chunks.append(chr((0x20 | (value & 0x1F)) + 63))
+				value >>= 5
+			chunks.append(chr(value + 63))
+		prev_lat, prev_lng = lat, lng
+	return "".join(chunks)
+
+
+def segment_lengths_km(coords) -> list[float]:
+	"""Haversine length (km) of each segment between consecutive points of coords."""
+	if np is not None:
+		coords = np.radians(np.asarray(coords, dtype=float).reshape(-1, 2))
+		lat1, lng1 = coords[:-1, 0], coords[:-1, 1]
+		lat2, lng2 = coords[1:, 0], coords[1:, 1]
+		a = (
+			np.sin((lat2 - lat1) / 2) ** 2
+			+ np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+		)
+		return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+	return [haversine_km(a, [b])[0] for a, b in zip(coords, coords[1:])]
+
+
+def resample(coords, spacing_km: float) -> list[tuple[float, float]]:
+	"""
+	Places points every spacing_km along a route, interpolating between vertices.
+
+	Dense stretches (city streets) are thinned and sparse ones (long interstate
+	segments) are filled in, so the number of points is proportional to the route
+	length. The first and last points of the route are always included.
+
+	Args:
+	coords: The route's (lat, lng) points in order.
+	spacing_km: Along-route distance between emitted points.
+
+	Returns:
+	The resampled (lat, lng) points.
+	"""
+	if len(coords) < 2:
+		return [tuple(coord) for coord in coords]
+
+	lengths = segment_lengths_km(coords)
+	if np is not None:
+		coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+		along = np.concatenate(([0.0], np.cumsum(lengths)))
+		targets = np.append(np.arange(0.0, along[-1], spacing_km), along[-1])
+		lats = np.interp(targets, along, coords[:, 0])
+		lngs = np.interp(targets, along, coords[:, 1])
+		return list(zip(lats.tolist(), lngs.tolist()))
+
+	along = [0.0]
+	for length in lengths:
+		along.append(along[-1] + length)
+
+	resampled = []
+	segment = 0
+	n_targets = math.ceil(along[-1] / spacing_km)
+	for target in [i * spacing_km for i in range(n_targets)] + [along[-1]]:
+		while segment < len(lengths) - 1 and along[segment + 1] < target:
+			segment += 1
+		length = lengths[segment]
+		t = (target - along[segment]) / length if length else 0.0
+		(lat1, lng1), (lat2, lng2) = coords[segment], coords[segment + 1]
+		resampled.append((lat1 + t * (lat2 - lat1), lng1 + t * (lng2 - lng1)))
+	return resampled
+
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(lat: float, lng: float, precision: int) -> str:
+	"""Returns the geohash tile of the given precision containing (lat, lng)."""
+	lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+	geohash = []
+	bits, bit_count, even = 0, 0, True
+	while len(geohash) < precision:
+		# bits alternate between longitude and latitude, starting with longitude
+		value, interval = (lng, lng_range) if even else (lat, lat_range)
+		mid = (interval[0] + interval[1]) / 2
+		if value >= mid:
+			bits = (bits << 1) | 1
+			interval[0] = mid
+		else:
+			bits <<= 1
+			interval[1] = mid
+		even = not even
+		bit_count += 1
+		if bit_count == 5:
+			geohash.append(_GEOHASH_ALPHABET[bits])
+			bits, bit_count = 0, 0
+	return "".join(geohash)
+
+
+def geohash_center(geohash: str) -> tuple[float, float]:
+	"""Returns the (lat, lng) center of a geohash tile."""
+	lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+	even = True
+	for char in geohash:
+		bits = _GEOHASH_ALPHABET.index(char)
+		for shift in range(4, -1, -1):
+			interval = lng_range if even else lat_range
+			mid = (interval[0] + interval[1]) / 2
+			if bits >> shift & 1:
+				interval[0] = mid
+			else:
+				interval[1] = mid
+			even = not even
+	return ((lat_range[0] + lat_range[1]) / 2, (lng_range[0] + lng_range[1]) / 2)
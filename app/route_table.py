@@ -0,0 +1,240 @@
+"""
+Materialized table of planned routes, so popular trips skip the route pipeline.
+
+Every planned origin/destination pair gets a Popularroute row counting its requests.
+A row holding data younger than ROUTE_TABLE_TTL_SECONDS is served as is; otherwise
+the route is planned through map_requests and stored. RouteWarmer re-plans the
+ROUTE_WARMER_TOP_N most requested pairs in the background before they go stale.
+"""
+
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from flask import Flask
+from sqlalchemy.exc import IntegrityError
+
+from app.background_loop import background_loop
+from app.log_manager import global_logger as log
+from app.map_requests import (
+	APIError,
+	RouteResult,
+	get_cities_list,
+	get_route,
+	iter_cities_list_async,
+	normalize_place_name,
+)
+from app.models import Popularroute
+from app.route_geometry import encode_polyline
+from config import Config
+from database import db
+
+
+def is_fresh(
+	row: Popularroute, max_age_seconds: float = Config.ROUTE_TABLE_TTL_SECONDS
+) -> bool:
+	return (
+		row.refreshed_at is not None
+		and datetime.utcnow() - row.refreshed_at < timedelta(seconds=max_age_seconds)
+	)
+
+
+def route_cities(row: Popularroute) -> dict[str, list]:
+	"""The row's {placeId: [city, county, state]} route cities, in route order."""
+	return json.loads(row.cities)
+
+
+def record_request(origin: str, destination: str) -> Popularroute:
+	"""Counts a request for the pair, creating its (still empty) row on first sight."""
+	row = route_row(origin, destination)
+	row.times_requested = Popularroute.times_requested + 1
+	row.requested_at = datetime.utcnow()
+	db.session.commit()
+	return row
+
+
+def route_row(origin: str, destination: str) -> Popularroute:
+	"""The pair's row, created (still empty and uncounted) on first sight."""
+	keys = {
+		"origin_key": normalize_place_name(origin),
+		"destination_key": normalize_place_name(destination),
+	}
+	if (row := Popularroute.query.filter_by(**keys).first()) is None:
+		db.session.add(Popularroute(**keys, times_requested=0))
+		try:
+			db.session.commit()
+		except IntegrityError:
+			# another request created the row first
+			db.session.rollback()
+		row = Popularroute.query.filter_by(**keys).one()
+	return row
+
+
+def refresh_route(row: Popularroute, refresh: bool = False) -> Popularroute:
+	"""
+	Plans the row's route through map_requests and stores the result (uncommitted).
+	refresh bypasses the in-process route memo, for the warmer.
+
+	Raises:
+	APIError: If any of the Google APIs fail.
+	"""
+	cities = get_cities_list(row.origin_key, row.destination_key, refresh=refresh)
+	# memoized by get_cities_list above
+	route = get_route(row.origin_key, row.destination_key)
+
+	_store_route(row, route)
+	return _store_cities(row, cities)
+
+
+def _store_route(row: Popularroute, route: RouteResult):
+	row.distance_meters = route.distance_meters
+	row.duration_seconds = route.duration_seconds
+	row.geometry = encode_polyline(route.geometry)
+
+
+def _store_cities(row: Popularroute, cities: dict[str, list]) -> Popularroute:
+	row.cities = json.dumps(cities)
+	row.refreshed_at = datetime.utcnow()
+	return row
+
+
+def plan_route(
+	origin: str, destination: str, count_request: bool = True
+) -> Popularroute:
+	"""
+	The planned route between origin and destination, from the table when it holds a
+	fresh entry and through the full route pipeline otherwise. Callers that counted
+	the request already (see TripJobQueue.enqueue) pass count_request=False.
+
+	Raises:
+	APIError: If the route had to be planned and any of the Google APIs fail.
+	"""
+	if count_request:
+		row = record_request(origin, destination)
+	else:
+		row = route_row(origin, destination)
+	if not is_fresh(row):
+		refresh_route(row)
+		db.session.commit()
+	return row
+
+
+def stream_route(
+	origin: str, destination: str, count_request: bool = True
+) -> Iterator[tuple]:
+	"""
+	plan_route as a stream of stages, for callers that use results as they arrive:
+	("route", row) once the row's distance and duration are known, which is after
+	the Directions call when the route has to be planned, then ("city", id,
+	[city, county, state]) for each route city in order as it is geocoded. The row is
+	committed with its cities once the stream is exhausted.
+
+	Raises:
+	APIError: If the route had to be planned and any of the Google APIs fail.
+	"""
+	if count_request:
+		row = record_request(origin, destination)
+	else:
+		row = route_row(origin, destination)
+	if is_fresh(row):
+		yield "route", row
+		for key, city_info in route_cities(row).items():
+			yield "city", key, city_info
+		return
+
+	_store_route(row, get_route(row.origin_key, row.destination_key))
+	yield "route", row
+
+	cities = {}
+	# the route is memoized by get_route above, so this goes straight to snapping
+	for key, city_info in background_loop.iterate(
+		iter_cities_list_async(row.origin_key, row.destination_key)
+	):
+		cities[key] = city_info
+		yield "city", key, city_info
+
+	_store_cities(row, cities)
+	db.session.commit()
+
+
+def find_route(origin: str, destination: str) -> Popularroute | None:
+	"""The pair's row as it stands, without counting a request or planning anything."""
+	return Popularroute.query.filter_by(
+		origin_key=normalize_place_name(origin),
+		destination_key=normalize_place_name(destination),
+	).first()
+
+
+class RouteWarmer:
+	"""Re-plans the most requested routes on a schedule, before they go stale.
+
+	Attributes:
+	        app (Flask): The app whose database holds the route table.
+	        interval_seconds (float): Time between warming passes.
+	        top_n (int): How many of the most requested pairs are kept warm.
+	        refresh_after_seconds (float): Age at which a warm route is re-planned.
+	"""
+
+	def __init__(
+		self,
+		app: Flask,
+		interval_seconds: float = Config.ROUTE_WARMER_INTERVAL_SECONDS,
+		top_n: int = Config.ROUTE_WARMER_TOP_N,
+		refresh_after_seconds: float = Config.ROUTE_TABLE_TTL_SECONDS / 2,
+	):
+		self.app = app
+		self.interval_seconds = interval_seconds
+		self.top_n = top_n
+		self.refresh_after_seconds = refresh_after_seconds
+		self._stop = threading.Event()
+		self._thread = None
+
+	def start(self) -> "RouteWarmer":
+		self._thread = threading.Thread(
+			target=self._run, name="route-warmer", daemon=True
+		)
+		self._thread.start()
+		return self
+
+	def stop(self):
+		self._stop.set()
+		if self._thread is not None:
+			self._thread.join()
+
+	def _run(self):
+		while not self._stop.wait(self.interval_seconds):
+			try:
+				self.warm_once()
+			except Exception:
+				log.exception("Route warming pass failed")
+
+	def warm_once(self) -> int:
+		"""Re-plans the stale routes among the top_n most requested; returns how many."""
+		with self.app.app_context():
+			popular = (
+				Popularroute.query.order_by(Popularroute.times_requested.desc())
+				.limit(self.top_n)
+				.all()
+			)
+			stale = [
+				row
+				for row in popular
+				if not is_fresh(row, max_age_seconds=self.refresh_after_seconds)
+			]
+
+			refreshed = 0
+			for row in stale:
+				try:
+					refresh_route(row, refresh=True)
+					db.session.commit()
+					refreshed += 1
+				except APIError as e:
+					db.session.rollback()
+					log.warning(f"Could not warm route {row}: {e}")
+
+			if refreshed:
+				log.info(
+					f"Warmed {refreshed} of the {len(popular)} most requested routes"
+				)
+			return refreshed
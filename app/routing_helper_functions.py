@@ -3,106 +3,246 @@ Stores the non-route, helper functions needed in routes.py
 """
 
 import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 
+from flask import current_app
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
+
+from app.gas_prices import gas_prices
 from app.log_manager import global_logger as log
-from app.map_requests import APIError, get_nearby_activities, get_route_distance_meters
-from app.models import Favoriteitem, Place, Searchitem, Searchlist, User
-from app.scraping_functions.gas_price_extractor import obtain_avg_gas_price
+from app.map_requests import (
+	APIError,
+	get_distances_meters,
+	get_nearby_activities,
+	get_nearby_activities_many,
+)
+from app.models import (
+	Favoriteitem,
+	Place,
+	Searchitem,
+	Searchlist,
+	Travel,
+	Travelplaceitem,
+	User,
+)
+from app.place_counters import add_to_place_counter
 from app.scraping_functions.population import get_place_pop
 from app.scraping_functions.state_abbreviations import state_abbr
 from app.scraping_functions.wiki_places import create_place_with_wiki
+from config import Config
 from database import db
 
 # used for parsing the Travel Form data
 TRAVEL_FORM_DELIMITER = ", "
 ROUTE_PLACES_DELIMITER = ";"
 LACKING_MSG = "information not available for"
-# calculate the average gas price scrape once per Flask session
-avg_gas_price = obtain_avg_gas_price()
+# (city, state) pairs looked up per query, well under SQLite's bound-parameter limit
+RESOLVE_BATCH_SIZE = 400
 
 
-# currently only uses a gas price calculation to estimate price
-def obtain_travel_price(origin_place, dest_place, avg_gas_mileage=26):
-	# find the org->dest distance; convert to miles
-	distance = 0.00062137 * float(get_route_distance_meters(origin_place, dest_place))
+# currently only uses a gas price calculation to estimate price, at the mean of the
+#   origin and destination states' gas prices (see app.gas_prices)
+# pass distance_meters when the route is already known (e.g. from the route table)
+def obtain_travel_price(
+	origin_place, dest_place, avg_gas_mileage=26, distance_meters=None
+):
+	if distance_meters is None:
+		(distance_meters,) = get_distances_meters([(origin_place, dest_place)])
+		if distance_meters is None:
+			raise APIError(
+				f"No driving route from {origin_place} to {dest_place}",
+				"distancematrix",
+			)
+
+	return _gas_cost(
+		distance_meters, avg_gas_mileage, _trip_gas_price(origin_place, dest_place)
+	)
 
-	# unit-conversion: miles * gal/mile * $/gal = $'s
-	gas_cost = round(distance / avg_gas_mileage * avg_gas_price, 2)
 
-	return gas_cost
+def obtain_travel_prices(pairs, avg_gas_mileage=26) -> list:
+	"""
+	Prices many (origin, destination) pairs at once, e.g. the legs of a multi-stop
+	itinerary or several candidate destinations, with their distances looked up in as
+	few Distance Matrix calls as possible. Pairs with no driving route price as None.
+	"""
+	return [
+		None
+		if distance_meters is None
+		else _gas_cost(distance_meters, avg_gas_mileage, _trip_gas_price(*pair))
+		for pair, distance_meters in zip(pairs, get_distances_meters(pairs))
+	]
+
 
+# $/gallon for a trip between two "City, State" places
+def _trip_gas_price(origin_place, dest_place) -> float:
+	return gas_prices.price_for(
+		*(
+			place.rsplit(TRAVEL_FORM_DELIMITER, 1)[-1]
+			for place in (origin_place, dest_place)
+		)
+	)
 
-# Function which will check each user's list.item.place's and see if it matches a newly deleted place from the admin page\
-# if found, remove it from the list
-def delete_removed_place_from_users_lists(deleted_place_id):
-	# query all the FavoriteList() objects
-	fav_items = Favoriteitem.query.all()
 
-	# search each item's place_id attr, and delete accordingly
-	for item in fav_items:
-		if item.place_id == deleted_place_id:
-			db.session.delete(item)
-			db.session.commit()
+def _gas_cost(distance_meters, avg_gas_mileage, gas_price):
+	# find the org->dest distance; convert to miles
+	distance = 0.00062137 * float(distance_meters)
+
+	# unit-conversion: miles * gal/mile * $/gal = $'s
+	return round(distance / avg_gas_mileage * gas_price, 2)
+
+
+# Removes a Place along with every list item pointing at it, in one transaction: one
+#   set-based DELETE per item table (through their place_id indexes), so the cost
+#   follows the Place's own items rather than the size of the tables
+# The tables' ON DELETE CASCADE does the same; the explicit deletes also cover databases
+#   created before those foreign keys were declared
+# returns -> True if the Place existed
+def delete_place(place_id) -> bool:
+	for item in (Favoriteitem, Searchitem, Travelplaceitem):
+		item.query.filter_by(place_id=place_id).delete(synchronize_session=False)
+	# Travels keep their other stops; an endpoint that is gone reads as None
+	for column in (Travel.origin_place_id, Travel.destination_place_id):
+		Travel.query.filter(column == place_id).update(
+			{column: None}, synchronize_session=False
+		)
+	deleted = Place.query.filter_by(id=place_id).delete(synchronize_session=False)
+	db.session.commit()
+	return deleted > 0
 
 
 # query Place() for the potentially cached Org/Dest locations
 # if the query results in an empty list (Place doesn't already exist), then create the new Place entity
-def place_generator(city: str, county: str, state: str) -> "Place":
+# with lazy, a new Place is only a stub for the PlaceEnricher to fill in afterwards
+def place_generator(
+	city: str, county: str, state: str, lazy: bool = Config.LAZY_PLACE_ENRICHMENT
+) -> "Place":
 	# TODO: "City,State" need to be sent to scraping method and that info
 	#         needs to be placed in the Place attrs here for instancing
-	if not (
-		place := Place.query.filter(Place.city == city, Place.state == state).all()
-	):
-		place_pop = get_place_pop(city, state)  # addd in
-
-		# TODO: The Activities-Scraper Developer needs to format the activities textblock and render the material within the Place.html so that it's cleanly displayed
-		if len(state) == 2:
-			try:
-				state = state_abbr[state]
-			except KeyError:
-				print("Invalid State")
-
-		place_wiki = create_place_with_wiki(city, county, state, LACKING_MSG)
-
-		if place_wiki is None or not place_wiki:
-			wiki_json = '{"error": "Wiki Not Availble!"}'
-		else:
-			wiki_json = json.dumps(place_wiki)
-		# note: old place for GPT implimentation DEPRECATED
-
+	found, missing = resolve_places([(city, state)])
+	if missing:
+		scrape = stub_place if lazy else enrich_place
+		place = Place(**scrape(city, county, state))
+		# add the new Place to the db
+		db.session.add(place)
 		try:
-			act_list = get_nearby_activities(city + ", " + state)
-		except APIError:
-			log.warn(f"No nearby results for '{city}, {state}'")
-			act_list = []
+			# commit the changes to the db.
+			db.session.commit()
+		except IntegrityError:
+			# another request created the same Place while this one was scraping
+			db.session.rollback()
+			found, _ = resolve_places([(city, state)])
+			place = found[place_key(city, state)]
+		if lazy:
+			wake_place_enricher()
+	else:
+		place = found[place_key(city, state)]
+
+	return place
 
-		org_acts = ""
 
-		for act in act_list:
-			org_acts = org_acts + act[0] + "^"
+# the (city, state) a Place is stored under, with state abbreviations spelled out
+def place_key(city: str, state: str) -> tuple:
+	return city, state_abbr.get(state, state) if len(state) == 2 else state
 
-		org_acts = org_acts[0:-1]
 
-		place = Place(
-			city=city,
-			state=state,
-			population=place_pop,
-			activities=org_acts,
-			wiki=wiki_json,
-			times_favorited=0,
-			times_searched=0,
-		)
-		# add the new Place to the db
-		db.session.add(place)
+# finds the Places for many (city, state) pairs at once through the (city, state)
+#   unique index: one query per RESOLVE_BATCH_SIZE pairs instead of one per pair
+# returns -> (found, missing): {place_key: Place} and the place_keys with no Place yet
+def resolve_places(pairs) -> tuple:
+	keys = list(dict.fromkeys(place_key(city, state) for city, state in pairs))
+	found = {}
+	for i in range(0, len(keys), RESOLVE_BATCH_SIZE):
+		batch = keys[i : i + RESOLVE_BATCH_SIZE]
+		for place in Place.query.filter(tuple_(Place.city, Place.state).in_(batch)):
+			found[(place.city, place.state)] = place
+
+	return found, [key for key in keys if key not in found]
+
+
+# scrapes everything a new Place holds; touches no database, so it can run on any thread
+# activities, when already looked up (see nearby_activities_of), spares a Nearby Search
+# returns -> dict of the new Place's column values
+def enrich_place(city: str, county: str, state: str, activities=None) -> dict:
+	place_pop = get_place_pop(city, state)  # addd in
+
+	# TODO: The Activities-Scraper Developer needs to format the activities textblock and render the material within the Place.html so that it's cleanly displayed
+	if len(state) == 2:
+		try:
+			state = state_abbr[state]
+		except KeyError:
+			print("Invalid State")
+
+	place_wiki = create_place_with_wiki(city, county, state, LACKING_MSG)
+
+	if place_wiki is None or not place_wiki:
+		wiki_json = '{"error": "Wiki Not Availble!"}'
 	else:
-		# if the original query resulted in a match, then 'place' was a list object.
-		# so convert the queried 'place' list into its first obtained element from the cached search
-		place = place[0]
+		wiki_json = json.dumps(place_wiki)
+	# note: old place for GPT implimentation DEPRECATED
 
-	# commit the changes to the db.
-	db.session.commit()
+	if activities is not None:
+		act_list = activities
+	else:
+		try:
+			act_list = get_nearby_activities(city + ", " + state)
+		except APIError:
+			log.warn(f"No nearby results for '{city}, {state}'")
+			act_list = []
 
-	return place
+	org_acts = ""
+
+	for act in act_list:
+		org_acts = org_acts + act[0] + "^"
+
+	org_acts = org_acts[0:-1]
+
+	return {
+		"city": city,
+		"county": county,
+		"state": state,
+		"population": place_pop,
+		"activities": org_acts,
+		"wiki": wiki_json,
+		"times_favorited": 0,
+		"times_searched": 0,
+		"enrichment_status": "ready",
+		"enriched_at": datetime.utcnow(),
+	}
+
+
+# looks up the activities of many new Places at once, so the paginated Nearby Searches
+#   of their tiles overlap instead of each waiting out its pages in turn
+# returns -> {place_key: activities}, with [] for Places whose search failed
+def nearby_activities_of(keys) -> dict:
+	cities = {key: f"{key[0]}, {key[1]}" for key in keys}
+	found = get_nearby_activities_many(list(cities.values()))
+	return {key: found[city] or [] for key, city in cities.items()}
+
+
+# the column values of a Place created before it is scraped: only what is known
+#   locally, with wiki and activities left for the PlaceEnricher (see enrich_place)
+def stub_place(city: str, county: str, state: str) -> dict:
+	city, state = place_key(city, state)
+	return {
+		"city": city,
+		"county": county,
+		"state": state,
+		"population": get_place_pop(city, state),
+		"activities": "",
+		"wiki": None,
+		"times_favorited": 0,
+		"times_searched": 0,
+		"enrichment_status": "pending",
+		"enriched_at": None,
+	}
+
+
+# lets this app's PlaceEnricher know new stubs are waiting, instead of at its next poll
+def wake_place_enricher():
+	if (enricher := current_app.extensions.get("place_enricher")) is not None:
+		enricher.wake()
 
 
 # Helper function for parsing User-inputted data in the travel form
@@ -124,24 +264,60 @@ def parse_travel_form_data(
 
 # Helper function for accepting strings of delimited city,state strings
 #   and returning a list of Place objects for Places along the RoadTrip route
-def create_places_from_scraped_place_dict(route_places):
-	# indent here
-
-	# turns route_places into a list of tuples where each tuple is a (city, state) representing a Place's city,state info
-	route_places = [
-		place_generator(city[0], city[1], city[2]) for city in route_places.values()
-	]
-
-	# city_county_state_list = route_places.split(ROUTE_PLACES_DELIMITER)
-	# for i, city_state_combo in enumerate(city_county_state_list):
-	#   city_county_state_list[i] = city_state_combo.split(", ")
-
-	# # route places then creates a list of Places
-	# route_places = [
-	#   place_generator(item[0], item[1], item[2]) for item in city_county_state_list
-	# ]
-
-	return route_places
+# Places already in the db are found with resolve_places; the missing ones are scraped
+#   on a pool of PLACE_ENRICH_CONCURRENCY threads and written with one bulk insert,
+#   so a route costs the same few queries however many cities it has
+# with lazy, the missing ones are inserted as stubs and scraped later by the PlaceEnricher
+def create_places_from_scraped_place_dict(
+	route_places, lazy: bool = Config.LAZY_PLACE_ENRICHMENT
+):
+	# (city, county, state) of each route city, in route order
+	route_places = [(city[0], city[1], city[2]) for city in route_places.values()]
+	keys = [place_key(city, state) for city, _, state in route_places]
+	found, missing = resolve_places(keys)
+
+	if missing:
+		counties = {key: county for key, (_, county, _) in zip(keys, route_places)}
+		if lazy:
+			new_rows = [stub_place(key[0], counties[key], key[1]) for key in missing]
+		else:
+			activities = nearby_activities_of(missing)
+			with ThreadPoolExecutor(
+				max_workers=Config.PLACE_ENRICH_CONCURRENCY,
+				thread_name_prefix="place-enrich",
+			) as pool:
+				new_rows = list(
+					pool.map(
+						lambda key: enrich_place(
+							key[0], counties[key], key[1], activities[key]
+						),
+						missing,
+					)
+				)
+
+		_insert_places(dict(zip(missing, new_rows)))
+		found.update(resolve_places(missing)[0])
+		if lazy:
+			wake_place_enricher()
+
+	return [found[key] for key in keys]
+
+
+# bulk inserts new Places' rows, given as {place_key: row}; the ones created concurrently
+#   meanwhile are skipped, retrying with the rest for as long as that leaves fewer
+def _insert_places(rows_by_key):
+	while rows_by_key:
+		try:
+			db.session.execute(Place.__table__.insert(), list(rows_by_key.values()))
+			db.session.commit()
+			return
+		except IntegrityError:
+			db.session.rollback()
+			_, still_missing = resolve_places(rows_by_key)
+			if len(still_missing) == len(rows_by_key):
+				# not a race with another insert of the same Places
+				raise
+			rows_by_key = {key: rows_by_key[key] for key in still_missing}
 
 
 # Checks if an item to be added is already in a list
@@ -168,11 +344,10 @@ def add_search_item(user_id, place_id, searchlist_id):
 
 	# If the place's associated SearchItem doesn't already exist, make one
 	if not exists(new_search_item, searchlist.searchplaces):
-		place = Place.query.get(place_id)
 		# add the new item to the db
 		db.session.add(new_search_item)
 		# increase the counter for the Place's number of times searched
-		place.times_searched += 1
+		add_to_place_counter(place_id, "times_searched")
 		# commit the database changes here
 		db.session.commit()
 
@@ -1,21 +1,30 @@
 import requests
 from bs4 import BeautifulSoup
 
+from config import Config
+
 
 class Gas:
 	def __init__(self):
 		self.lookup_state = {"data": []}
-		self.URL = "https://www.gasbuddy.com/usa"
+		self.URL = Config.GASBUDDY_URL
 		self.page = ""
 
-		page = requests.get(self.URL)
-		soup = BeautifulSoup(page.content, "html.parser")
+		page = requests.get(self.URL, timeout=Config.GAS_PRICE_TIMEOUT_SECONDS)
+		self.lookup_state.update(self.parse_state_prices(page.content))
+
+	@staticmethod
+	def parse_state_prices(content) -> dict[str, str]:
+		"""Reads {state: price} from the markup of the GasBuddy state averages page."""
+		prices = {}
+		soup = BeautifulSoup(content, "html.parser")
 		state_attrib = soup.find_all("div", class_="col-sm-12 col-xs-12")
 
 		for state in state_attrib:
 			name = state.find("div", class_="col-sm-6 col-xs-6 siteName")
 			price = state.find("div", class_="col-sm-2 col-xs-3 text-right")
-			self.lookup_state[name.text.strip().lower()] = price.text.strip().lower()
+			prices[name.text.strip().lower()] = price.text.strip().lower()
+		return prices
 
 	def getPrice(self, state):
 		value = self.lookup_state.get(state.lower())
@@ -2,6 +2,26 @@ import re
 
 import wikipedia
 
+from app.single_flight import upstream_flights
+from config import Config
+
+# the wikipedia package reads its endpoint from this module global on every request
+wikipedia.wikipedia.API_URL = Config.WIKIPEDIA_API_URL
+
+# the article sections kept for a Place's wiki
+ARTICLE_SECTIONS = [
+	"History",
+	"Geography",
+	"Demographics",
+	"Economy",
+	"Arts and Culture",
+	"Arts",
+	"Culture",
+	"Sports",
+	"Parks and Recreation",
+	"Notable People",
+]
+
 
 def get_subsections(section_content):
 	subsections = {}
@@ -41,8 +61,11 @@ def get_wiki_sections(city, county, state, article_secs, LACKING_MSG):
 	except wikipedia.exceptions.DisambiguationError:
 		return None
 
+	return parse_wiki_sections(page_py.content, article_secs)
+
+
+def parse_wiki_sections(content, article_secs):
 	# Split the page content into sections
-	content = page_py.content
 	sections = content.split("\n== ")
 
 	wiki_content = {}
@@ -65,20 +88,11 @@ def get_wiki_sections(city, county, state, article_secs, LACKING_MSG):
 
 
 def create_place_with_wiki(city, county, state, LACKING_MSG):
-	article_secs = [
-		"History",
-		"Geography",
-		"Demographics",
-		"Economy",
-		"Arts and Culture",
-		"Arts",
-		"Culture",
-		"Sports",
-		"Parks and Recreation",
-		"Notable People",
-	]
-
-	wiki_dict = get_wiki_sections(city, county, state, article_secs, LACKING_MSG)
+	# concurrent trips through the same place share one fetch of its article
+	wiki_dict = upstream_flights.do(
+		("wiki_sections", city, county, state),
+		lambda: get_wiki_sections(city, county, state, ARTICLE_SECTIONS, LACKING_MSG),
+	)
 
 	return wiki_dict
 
@@ -89,6 +103,12 @@ def get_main_image(city, state) -> str | None:
 	city = city.strip().title()
 	state = state.strip().title()
 
+	return upstream_flights.do(
+		("wiki_main_image", city, state), lambda: _get_main_image(city, state)
+	)
+
+
+def _get_main_image(city, state) -> str | None:
 	# create a search query string
 	search_query = f"{city}, {state}"
 
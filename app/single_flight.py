@@ -0,0 +1,89 @@
+"""
+Coalesces identical in-flight upstream calls so concurrent callers share one result.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+	"""Runs at most one call per key at a time; callers arriving meanwhile wait for it.
+
+	Flights are plain concurrent.futures.Future objects, so a call started by a
+	thread can be joined by a coroutine and vice versa. Nothing is kept once a
+	flight lands: this deduplicates concurrent work, it is not a cache.
+
+	Attributes:
+	        stats (dict): Counters of calls made ("calls") and calls saved ("shared").
+	"""
+
+	def __init__(self):
+		self.stats = {"calls": 0, "shared": 0}
+		self._flights: dict[Hashable, concurrent.futures.Future] = {}
+		self._lock = threading.Lock()
+
+	@property
+	def saved_calls(self) -> int:
+		return self.stats["shared"]
+
+	def _join_or_lead(self, key: Hashable) -> tuple[concurrent.futures.Future, bool]:
+		with self._lock:
+			if (flight := self._flights.get(key)) is not None:
+				self.stats["shared"] += 1
+				return flight, False
+			flight = self._flights[key] = concurrent.futures.Future()
+			self.stats["calls"] += 1
+			return flight, True
+
+	def _land(self, key: Hashable, flight: concurrent.futures.Future):
+		with self._lock:
+			if self._flights.get(key) is flight:
+				del self._flights[key]
+
+	def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+		"""Calls fn() unless a call for key is already in flight, then returns its result."""
+		flight, leader = self._join_or_lead(key)
+		if not leader:
+			return flight.result()
+
+		try:
+			result = fn()
+		except BaseException as e:
+			flight.set_exception(e)
+			raise
+		else:
+			flight.set_result(result)
+			return result
+		finally:
+			self._land(key, flight)
+
+	async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+		"""Async counterpart of do(); fn is a coroutine function, awaited only by the leader."""
+		flight, leader = self._join_or_lead(key)
+		if not leader:
+			# shield so a cancelled follower doesn't cancel the flight for everyone else
+			return await asyncio.shield(asyncio.wrap_future(flight))
+
+		# the call runs in a task of the flight's own, so cancelling the leader (e.g. its
+		#   trip failed or its client went away) leaves it running for the followers
+		call = asyncio.ensure_future(fn())
+
+		def land(call: asyncio.Future):
+			if call.cancelled():
+				flight.cancel()
+			elif (e := call.exception()) is not None:
+				flight.set_exception(e)
+			else:
+				flight.set_result(call.result())
+			self._land(key, flight)
+
+		call.add_done_callback(land)
+		return await asyncio.shield(call)
+
+
+# shared by the Google and Wikipedia lookups, so all workers' threads and tasks coalesce
+upstream_flights = SingleFlight()
@@ -1,4 +1,4 @@
-from flask import render_template
+from flask import abort, jsonify, render_template, url_for
 from flask_login import login_required
 
 from app.models import Place, Travel, User
@@ -24,3 +24,25 @@ def travel_profile(user_id, travel_id):
 	return render_template(
 		"profile_travels.html", user=user, travel=travel, places=places
 	)
+
+
+# Polled by the profile page while a Travel is still being planned by the trip workers
+# returns the Travel's status, plus its page once ready or the reason it failed
+@travel.route("/travel_status/<int:user_id>/<int:travel_id>")
+@login_required
+def travel_status(user_id, travel_id):
+	user = User.query.filter_by(id=user_id).first_or_404(
+		description="No such user found."
+	)
+	travel = Travel.query.get_or_404(travel_id)
+	if travel.travellist_id != user.travellist_id:
+		abort(404)
+
+	status = {"status": travel.status}
+	if travel.status == "ready":
+		status["url"] = url_for(
+			"travel.travel_profile", user_id=user.id, travel_id=travel.id
+		)
+	elif travel.status == "failed" and travel.job is not None:
+		status["error"] = travel.job.error
+	return jsonify(status)
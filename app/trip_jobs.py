@@ -0,0 +1,219 @@
+"""
+Trip planning on a persisted job queue, off the request thread.
+
+The profile's travel form only creates a pending Travel and its Tripjob row; worker
+threads claim queued jobs and do the slow part (enriching the origin and destination
+Places, planning and pricing the route, building the route Places). A claim is a
+lease: a job whose worker died mid-run is claimed again once TRIP_JOB_LEASE_SECONDS
+have passed, up to TRIP_JOB_MAX_ATTEMPTS times.
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import and_, or_
+
+from app.log_manager import global_logger as log
+from app.map_requests import APIError
+from app.models import Travel, Travelplaceitem, Tripjob, User
+from app.route_table import record_request, stream_route
+from app.routing_helper_functions import (
+	TRAVEL_FORM_DELIMITER,
+	add_search_item,
+	create_places_from_scraped_place_dict,
+	obtain_travel_price,
+	place_generator,
+)
+from config import Config
+from database import db
+
+
+def plan_trip(job: Tripjob, batch_size: int = Config.TRIP_PLACE_BATCH_SIZE):
+	"""
+	Plans the job's trip as the travel form used to within the request, filling in
+	its pending Travel, and marks both finished (committed). The price and then each
+	batch_size route Places are committed as the route is resolved, so the trip's
+	stream can show them before the job is done.
+
+	Raises:
+	APIError: If any of the Google APIs fail.
+	"""
+	user = User.query.get(job.user_id)
+	origin_city, origin_state = job.origin.split(TRAVEL_FORM_DELIMITER)
+	destination_city, destination_state = job.destination.split(TRAVEL_FORM_DELIMITER)
+
+	# query the Place table for the potentially cached Org/Dest Places
+	origin_place = place_generator(origin_city, "", origin_state)
+	dest_place = place_generator(destination_city, "", destination_state)
+
+	# Since the User searched these two locations, add them to their search list
+	add_search_item(user.id, origin_place.id, user.searchlist_id)
+	add_search_item(user.id, dest_place.id, user.searchlist_id)
+
+	travel = job.travel
+	travel.origin_place_id = origin_place.id
+	travel.destination_place_id = dest_place.id
+	# a retried job starts the route over
+	travel.route_places.delete()
+
+	def add_route_places(cities: dict):
+		# Format: cities = {cityID1: [city, county, state], cityID2: [...]}
+		for place in create_places_from_scraped_place_dict(cities):
+			db.session.add(Travelplaceitem(place_id=place.id, travel_id=travel.id))
+		db.session.commit()
+
+	# popular trips are served from the route table instead of being re-planned; the
+	#   request was counted when the job was queued, not on each attempt
+	batch = {}
+	for stage, *result in stream_route(
+		job.origin, job.destination, count_request=False
+	):
+		if stage == "route":
+			(planned_route,) = result
+			travel.price = obtain_travel_price(
+				job.origin,
+				job.destination,
+				distance_meters=planned_route.distance_meters,
+			)
+			db.session.commit()
+			continue
+
+		key, city_info = result
+		batch[key] = city_info
+		if len(batch) >= batch_size:
+			add_route_places(batch)
+			batch = {}
+	if batch:
+		add_route_places(batch)
+
+	travel.status = "ready"
+	job.status = "done"
+	job.finished_at = datetime.utcnow()
+	db.session.commit()
+
+
+class TripJobQueue:
+	"""Queues trips as Tripjob rows and works them on a pool of threads.
+
+	Attributes:
+	        app (Flask): The app whose database holds the jobs.
+	        workers (int): Worker threads run by start().
+	        lease_seconds (float): How long a claimed job is left to its worker.
+	        max_attempts (int): Claims allowed before a job is given up on.
+	        poll_seconds (float): How often idle workers check for jobs queued elsewhere.
+	"""
+
+	def __init__(
+		self,
+		app: Flask,
+		workers: int = Config.TRIP_JOB_WORKERS,
+		lease_seconds: float = Config.TRIP_JOB_LEASE_SECONDS,
+		max_attempts: int = Config.TRIP_JOB_MAX_ATTEMPTS,
+		poll_seconds: float = Config.TRIP_JOB_POLL_SECONDS,
+	):
+		self.app = app
+		self.workers = workers
+		self.lease_seconds = lease_seconds
+		self.max_attempts = max_attempts
+		self.poll_seconds = poll_seconds
+		self._wakeup = threading.Event()
+		self._stop = threading.Event()
+		self._threads = []
+
+	def enqueue(self, user: User, origin: str, destination: str) -> Travel:
+		"""Creates the user's pending Travel and queues its planning (committed)."""
+		record_request(origin, destination)
+		travel = Travel(travellist_id=user.travellist_id, status="pending")
+		db.session.add(
+			Tripjob(
+				travel=travel, user_id=user.id, origin=origin, destination=destination
+			)
+		)
+		db.session.commit()
+		self._wakeup.set()
+		return travel
+
+	def start(self) -> "TripJobQueue":
+		for i in range(self.workers):
+			thread = threading.Thread(
+				target=self._run, name=f"trip-worker-{i}", daemon=True
+			)
+			thread.start()
+			self._threads.append(thread)
+		return self
+
+	def stop(self):
+		self._stop.set()
+		self._wakeup.set()
+		for thread in self._threads:
+			thread.join()
+
+	def _run(self):
+		while not self._stop.is_set():
+			try:
+				while not self._stop.is_set() and self.work_once():
+					pass
+			except Exception:
+				log.exception("Trip job worker failed")
+			self._wakeup.wait(self.poll_seconds)
+			self._wakeup.clear()
+
+	def work_once(self) -> bool:
+		"""Claims and plans the oldest available job; returns False if there was none."""
+		with self.app.app_context():
+			if (job := self._claim()) is None:
+				return False
+
+			job_id = job.id
+			try:
+				plan_trip(job)
+				log.info(f"Planned {job}")
+			except APIError as e:
+				db.session.rollback()
+				self._fail(Tripjob.query.get(job_id), str(e))
+			except Exception:
+				# left running, so the job is claimed again once its lease runs out
+				db.session.rollback()
+				log.exception(f"Trip job {job_id} failed unexpectedly")
+			return True
+
+	def _claim(self) -> Tripjob | None:
+		while True:
+			now = datetime.utcnow()
+			lease_expired = and_(
+				Tripjob.status == "running",
+				Tripjob.started_at < now - timedelta(seconds=self.lease_seconds),
+			)
+			job = (
+				Tripjob.query.filter(or_(Tripjob.status == "queued", lease_expired))
+				.order_by(Tripjob.id)
+				.first()
+			)
+			if job is None:
+				return None
+			if job.attempts >= self.max_attempts:
+				self._fail(job, f"gave up after {job.attempts} attempts")
+				continue
+
+			# attempts doubles as a version: only one worker's update can match it
+			claimed = Tripjob.query.filter_by(id=job.id, attempts=job.attempts).update(
+				{
+					"status": "running",
+					"started_at": now,
+					"attempts": Tripjob.attempts + 1,
+				},
+				synchronize_session=False,
+			)
+			db.session.commit()
+			if claimed:
+				db.session.refresh(job)
+				return job
+
+	def _fail(self, job: Tripjob, error: str):
+		log.warning(f"Could not plan {job}: {error}")
+		job.status = "failed"
+		job.error = error[:500]
+		job.finished_at = datetime.utcnow()
+		job.travel.status = "failed"
+		db.session.commit()
@@ -1,8 +1,21 @@
-from flask import flash, redirect, render_template, request, session, url_for
+import json
+from typing import Optional
+
+from flask import (
+	Response,
+	abort,
+	current_app,
+	flash,
+	jsonify,
+	redirect,
+	render_template,
+	request,
+	session,
+	url_for,
+)
 from flask_login import login_required
 
 from app.forms import BudgetForm, OriginDestinationForm
-from app.map_requests import APIError, get_cities_list
 from app.models import (
 	Favoriteitem,
 	Favoritelist,
@@ -14,21 +27,21 @@ from app.models import (
 	Travelplaceitem,
 	User,
 )
+from app.place_counters import add_to_place_counter
 
 # from map_requests import APIError
 from app.routing_helper_functions import (
-	add_search_item,
-	create_places_from_scraped_place_dict,
 	exists,
-	obtain_travel_price,
 	parse_travel_form_data,
-	place_generator,
 )
+from app.route_table import find_route
 from app.user_profile import user_profile
 from database import db
 
 # constant; key for the session to store the logged-in user-id
 CURRENT_SESSION_USER = "current_session_user"
+# how long a browser waits before reconnecting to a trip's stream for what's new
+TRAVEL_STREAM_RETRY_MS = 1000
 
 
 # Lists all the users currently in the database
@@ -81,52 +94,26 @@ def profile(user_id):
 			travel_form, form_field="destination"
 		)
 
-		# query the Place table for the potentially cached Org/Dest Places
-		# a new Place will be returned if Place doesn't contain the Places already
-		origin_place = place_generator(origin_city, "", origin_state)
-		dest_place = place_generator(destination_city, "", destination_state)
-
-		# Since the User searched these two locations, add them to their search list
-		# call add_search_item()
-		add_search_item(user.id, origin_place.id, user.searchlist_id)
-		add_search_item(user.id, dest_place.id, user.searchlist_id)
-
-		# Create the Travel entity which identifies the origin/destination travel
-		# TODO: method for ensuring that a Travel() object doesn't already exist (unique city and state val tuples)
-
-		new_Travel = Travel(
-			origin_place_id=origin_place.id,
-			destination_place_id=dest_place.id,
-			travellist_id=user.travellist_id,
-			price=obtain_travel_price(
-				f"{origin_city}, {origin_state}",
-				f"{destination_city}, {destination_state}",
-			),
+		# planning takes many upstream calls, so it is queued for the trip workers;
+		# the pending Travel shows up in the Travel list right away
+		travel = current_app.extensions["trip_jobs"].enqueue(
+			user,
+			f"{origin_city}, {origin_state}",
+			f"{destination_city}, {destination_state}",
 		)
-		db.session.add(new_Travel)
-
-		# Format: route = {cityID1: [city, county, state], cityID2: [city, county, state]}
-		route = get_cities_list(
-			f"{origin_city}, {origin_state}", f"{destination_city}, {destination_state}"
+		# profile.html's script follows the trip on its stream instead of reloading
+		if _wants_json():
+			return jsonify(
+				travel_id=travel.id,
+				stream_url=url_for("user_profile.travel_stream", travel_id=travel.id),
+			), 202
+		flash(
+			f"Planning your trip from {origin_city} to {destination_city}. "
+			"It will be ready in Your Travels shortly."
 		)
-		try:
-			# route_str = ";".join([f"{city[0]}, {city[2]}" for city in route.values()])
-			route_places_list = create_places_from_scraped_place_dict(route)
-		except APIError:
-			# TODO: Handle in some way
-			print("Some garbage happened with get_cities_list")
-
-		# transform the route_places string repr into a list of Place() elements
-
-		# now create TravelPlaceItem for each route city, which will be mappable from the User's Travel List
-		for place in route_places_list:
-			new_travel_place_item = Travelplaceitem(
-				place_id=place.id, travel_id=new_Travel.id
-			)
-			db.session.add(new_travel_place_item)
 
-		# commit all changes !
-		db.session.commit()
+	if request.method == "POST" and _wants_json():
+		return jsonify(errors=travel_form.errors), 400
 
 	# obtain all Places, which now contain the Origin and Destination Places
 	places = Place.query.all()
@@ -147,6 +134,89 @@ def profile(user_id):
 	)
 
 
+# Streams a queued trip's progress as server-sent events, from what the trip workers
+#   have committed so far: "route" (distance and price) once the trip is priced, a
+#   "city" for each route Place as it is stored, then "done" with the Travel's page,
+#   or "failed" with the reason. profile.html opens it after posting the travel form.
+# Each response holds only what is already there and ends at once; the browser
+#   reconnects after TRAVEL_STREAM_RETRY_MS with the last event's id (Last-Event-ID:
+#   0 after the route, then the last city's Travelplaceitem id) to get what's new.
+@user_profile.route("/travel_stream/<int:travel_id>")
+@login_required
+def travel_stream(travel_id):
+	user = User.query.filter_by(id=session[CURRENT_SESSION_USER]).first_or_404(
+		description="No such user found."
+	)
+	travel = Travel.query.get_or_404(travel_id)
+	if travel.travellist_id != user.travellist_id:
+		abort(404)
+
+	last_sent = request.headers.get("Last-Event-ID", type=int)
+	events = [f"retry: {TRAVEL_STREAM_RETRY_MS}\n\n"]
+
+	if last_sent is None and travel.price is not None:
+		data = {"price": float(travel.price)}
+		if travel.job is not None and (
+			planned_route := find_route(travel.job.origin, travel.job.destination)
+		):
+			data["distance_miles"] = round(
+				planned_route.distance_meters * 0.000621371, 1
+			)
+			data["duration_seconds"] = planned_route.duration_seconds
+		events.append(_sse("route", data, event_id=0))
+		last_sent = 0
+
+	if last_sent is not None:
+		items = travel.route_places.filter(Travelplaceitem.id > last_sent).order_by(
+			Travelplaceitem.id
+		)
+		for item in items:
+			place = db.session.get(Place, item.place_id)
+			events.append(
+				_sse(
+					"city",
+					{
+						"id": place.id,
+						"name": str(place),
+						"url": url_for("places.place_info", place_id=place.id),
+					},
+					event_id=item.id,
+				)
+			)
+
+	if travel.status == "ready":
+		events.append(
+			_sse(
+				"done",
+				{
+					"travel_id": travel.id,
+					"url": url_for(
+						"travel.travel_profile", user_id=user.id, travel_id=travel.id
+					),
+				},
+			)
+		)
+	elif travel.status == "failed":
+		error = travel.job.error if travel.job is not None else None
+		events.append(_sse("failed", {"message": error}))
+
+	return Response(
+		"".join(events),
+		mimetype="text/event-stream",
+		headers={"Cache-Control": "no-cache"},
+	)
+
+
+# the request came from profile.html's script rather than a plain form submit
+def _wants_json() -> bool:
+	return request.accept_mimetypes.best == "application/json"
+
+
+def _sse(event: str, data: dict, event_id: Optional[int] = None) -> str:
+	message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+	return message if event_id is None else f"id: {event_id}\n{message}"
+
+
 # When a user clicks the 'Add' button next to a Place,
 #   that Place is added to their Favorite List (as represented by a FavoriteItem)
 # redirects back to the User's profile.html page
@@ -166,11 +236,10 @@ def add_favorite_item(user_id, place_id, favoritelist_id):
 
 	# If the place's associated FavoriteItem doesn't already exist, make one
 	if not exists(new_favorite_item, favoritelist.favoriteplaces):
-		place = Place.query.get(place_id)
 		# add the new item to the db
 		db.session.add(new_favorite_item)
 		# increase the times favorited counter for the Place associated with the new item
-		place.times_favorited += 1
+		add_to_place_counter(place_id, "times_favorited")
 		# commit the database changes here
 		db.session.commit()
 
@@ -189,15 +258,12 @@ def remove_item(user_id, item_id, item_type):
 
 	removed_item = item_table.query.get(item_id)
 
-	# find the place associated with this item-record, and decrement it's attribute
-	associated_place = Place.query.get(removed_item.place_id)
-
-	# decrement the appropriate metric based on which remove_item operation occurred
+	# decrement the appropriate metric of the associated Place based on which remove_item operation occurred
 	if item_type == "favorite":
-		associated_place.times_favorited -= 1
+		add_to_place_counter(removed_item.place_id, "times_favorited", -1)
 	# when item_type == "search"
 	else:
-		associated_place.times_searched -= 1
+		add_to_place_counter(removed_item.place_id, "times_searched", -1)
 
 	# remove the appropriate item
 	db.session.delete(removed_item)
@@ -1,10 +1,8 @@
 from flask import redirect, render_template, url_for
 from flask_login import login_required
 
-from app.models import Place
-from app.routing_helper_functions import delete_removed_place_from_users_lists
+from app.routing_helper_functions import delete_place
 from app.utility import utility
-from database import db
 
 
 # Remove a Place from the available Place() visible from the prospective dashboard, available to only an Admin, perhaps?
@@ -12,15 +10,8 @@ from database import db
 @utility.route("/remove_place/<int:place_id>")
 @login_required
 def remove_place(place_id):
-	# from the Favitem model, fetch the item with primary key item_id to be deleted
-	removed_place = Place.query.get(place_id)
-	# using db.session delete the item
-	db.session.delete(removed_place)
-	# commit the deletion
-	db.session.commit()
-
-	# call this function in order to remove any list Items() which contain the deleted place
-	delete_removed_place_from_users_lists(place_id)
+	# delete the Place along with any list Items() which contain it
+	delete_place(place_id)
 
 	return redirect(url_for("dashboard.dashboard"))
 
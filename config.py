@@ -2,6 +2,32 @@ import os
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
+# queries per second allowed per Google endpoint (keyed by a substring of its URL)
+DEFAULT_GOOGLE_QPS_LIMITS = {
+	"directions": 10,
+	"distancematrix": 10,
+	"snapToRoads": 50,
+	"geocode": 50,
+	"findplacefromtext": 10,
+	"details": 10,
+	"nearbysearch": 10,
+	"place/photo": 10,
+}
+
+
+def _qps_limits(env_value: str | None) -> dict[str, float]:
+	"""Overrides the default limits from e.g. GOOGLE_QPS_LIMITS="geocode=25,directions=5"."""
+	limits = dict(DEFAULT_GOOGLE_QPS_LIMITS)
+	for pair in filter(None, (env_value or "").split(",")):
+		endpoint, qps = pair.split("=")
+		limits[endpoint.strip()] = float(qps)
+	return limits
+
+
+# Set to e.g. http://127.0.0.1:8765 to send every upstream call to the local
+# stand-in server (python -m tests.standin) instead of Google/Wikipedia/GasBuddy
+UPSTREAM_BASE_URL = os.getenv("UPSTREAM_BASE_URL")
+
 
 class Config:
 	"""Base configuration."""
@@ -16,6 +42,103 @@ class Config:
 	# SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///travel_library.db")
 	SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+	# Shared async HTTP client used for the Google API fan-out
+	GOOGLE_MAX_CONNECTIONS_PER_HOST = int(
+		os.getenv("GOOGLE_MAX_CONNECTIONS_PER_HOST", "10")
+	)
+	GOOGLE_KEEPALIVE_TIMEOUT = float(os.getenv("GOOGLE_KEEPALIVE_TIMEOUT", "30"))
+	# Per-endpoint quotas and retry/backoff on OVER_QUERY_LIMIT, 429 and 5xx
+	GOOGLE_QPS_LIMITS = _qps_limits(os.getenv("GOOGLE_QPS_LIMITS"))
+	GOOGLE_MAX_RETRIES = int(os.getenv("GOOGLE_MAX_RETRIES", "4"))
+	GOOGLE_BACKOFF_BASE = float(os.getenv("GOOGLE_BACKOFF_BASE", "0.5"))
+	GOOGLE_BACKOFF_MAX = float(os.getenv("GOOGLE_BACKOFF_MAX", "8"))
+	# Along-route spacing of the points sent to Snap-to-Roads
+	ROUTE_SAMPLE_SPACING_KM = float(os.getenv("ROUTE_SAMPLE_SPACING_KM", "2"))
+	# Max Snap-to-Roads chunks requested at once for long routes
+	ROADS_MAX_CONCURRENCY = int(os.getenv("ROADS_MAX_CONCURRENCY", "8"))
+
+	# Durable placeId -> [city, county, state] cache consulted before geocoding
+	PLACE_CACHE_PATH = os.getenv(
+		"PLACE_CACHE_PATH", os.path.join(BASE_DIR, "place_cache.db")
+	)
+	PLACE_CACHE_TTL_SECONDS = int(os.getenv("PLACE_CACHE_TTL_SECONDS", "2592000"))
+	PLACE_CACHE_MAX_ENTRIES = int(os.getenv("PLACE_CACHE_MAX_ENTRIES", "200000"))
+	# Nearby Search results are cached per geohash tile of this precision (~39x20 km)
+	ACTIVITY_TILE_PRECISION = int(os.getenv("ACTIVITY_TILE_PRECISION", "4"))
+	ACTIVITY_TILE_TTL_SECONDS = int(os.getenv("ACTIVITY_TILE_TTL_SECONDS", "604800"))
+	NEARBY_MAX_PAGES = int(os.getenv("NEARBY_MAX_PAGES", "3"))
+	# New route Places scraped (Wikipedia, Nearby Search) at once
+	PLACE_ENRICH_CONCURRENCY = int(os.getenv("PLACE_ENRICH_CONCURRENCY", "8"))
+	# Create new Places as stubs and scrape them in the background (0 interval disables
+	# the background enricher in this process)
+	LAZY_PLACE_ENRICHMENT = (
+		os.getenv("LAZY_PLACE_ENRICHMENT", "false").lower() == "true"
+	)
+	PLACE_ENRICHER_INTERVAL_SECONDS = float(
+		os.getenv("PLACE_ENRICHER_INTERVAL_SECONDS", "30")
+	)
+	PLACE_ENRICHER_BATCH_SIZE = int(os.getenv("PLACE_ENRICHER_BATCH_SIZE", "50"))
+	# A stub that can't be scraped is tried again after PLACE_ENRICHER_RETRY_SECONDS,
+	# doubling each time, and marked failed after PLACE_ENRICHER_MAX_ATTEMPTS
+	PLACE_ENRICHER_RETRY_SECONDS = float(
+		os.getenv("PLACE_ENRICHER_RETRY_SECONDS", "60")
+	)
+	PLACE_ENRICHER_MAX_ATTEMPTS = int(os.getenv("PLACE_ENRICHER_MAX_ATTEMPTS", "5"))
+	# Place.times_searched/times_favorited increments are buffered in memory and written
+	# in batches every PLACE_COUNTER_FLUSH_SECONDS, instead of with each request
+	PLACE_COUNTER_WRITE_BEHIND = (
+		os.getenv("PLACE_COUNTER_WRITE_BEHIND", "false").lower() == "true"
+	)
+	PLACE_COUNTER_FLUSH_SECONDS = float(os.getenv("PLACE_COUNTER_FLUSH_SECONDS", "5"))
+	# Driving distance per origin/destination pair, from Distance Matrix
+	PAIR_DISTANCE_TTL_SECONDS = int(os.getenv("PAIR_DISTANCE_TTL_SECONDS", "2592000"))
+
+	# Offline reverse geocoding from a US Census Gazetteer places file
+	GAZETTEER_PATH = os.getenv(
+		"GAZETTEER_PATH", os.path.join(BASE_DIR, "data", "Gaz_place_national.txt")
+	)
+	GAZETTEER_MAX_KM = float(os.getenv("GAZETTEER_MAX_KM", "10"))
+	OFFLINE_GEOCODING = os.getenv("OFFLINE_GEOCODING", "false").lower() == "true"
+	# Geocode the route points the gazetteer misses through Google; off, they are skipped
+	GAZETTEER_FALLBACK = os.getenv("GAZETTEER_FALLBACK", "false").lower() == "true"
+
+	# On-disk store for Google Place photos
+	IMAGE_STORE_PATH = os.getenv(
+		"IMAGE_STORE_PATH", os.path.join(BASE_DIR, "photo_store")
+	)
+	THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_SIZE", "320"))
+	PHOTO_MAX_CONCURRENCY = int(os.getenv("PHOTO_MAX_CONCURRENCY", "6"))
+
+	# Materialized popular routes, kept fresh by a background warmer (0 disables it)
+	ROUTE_TABLE_TTL_SECONDS = int(os.getenv("ROUTE_TABLE_TTL_SECONDS", "86400"))
+	ROUTE_WARMER_INTERVAL_SECONDS = int(
+		os.getenv("ROUTE_WARMER_INTERVAL_SECONDS", "900")
+	)
+	ROUTE_WARMER_TOP_N = int(os.getenv("ROUTE_WARMER_TOP_N", "300"))
+
+	# Persisted trip planning queue; 0 workers queues trips without working them here
+	TRIP_JOB_WORKERS = int(os.getenv("TRIP_JOB_WORKERS", "4"))
+	TRIP_JOB_LEASE_SECONDS = int(os.getenv("TRIP_JOB_LEASE_SECONDS", "600"))
+	TRIP_JOB_MAX_ATTEMPTS = int(os.getenv("TRIP_JOB_MAX_ATTEMPTS", "3"))
+	TRIP_JOB_POLL_SECONDS = float(os.getenv("TRIP_JOB_POLL_SECONDS", "5"))
+	# Route Places a trip worker makes and commits at a time, for the trip's stream
+	TRIP_PLACE_BATCH_SIZE = int(os.getenv("TRIP_PLACE_BATCH_SIZE", "8"))
+
+	# GasBuddy state prices, kept as an on-disk snapshot refreshed in the background
+	# (0 disables the periodic refresh; stale snapshots are still refreshed on use)
+	GAS_PRICE_SNAPSHOT_PATH = os.getenv(
+		"GAS_PRICE_SNAPSHOT_PATH", os.path.join(BASE_DIR, "gas_prices.json")
+	)
+	GAS_PRICE_MAX_AGE_SECONDS = int(os.getenv("GAS_PRICE_MAX_AGE_SECONDS", "21600"))
+	GAS_PRICE_REFRESH_SECONDS = int(os.getenv("GAS_PRICE_REFRESH_SECONDS", "3600"))
+	GAS_PRICE_TIMEOUT_SECONDS = float(os.getenv("GAS_PRICE_TIMEOUT_SECONDS", "10"))
+
+	# Upstream endpoints (all overridden by UPSTREAM_BASE_URL)
+	GOOGLE_MAPS_BASE_URL = UPSTREAM_BASE_URL or "https://maps.googleapis.com"
+	GOOGLE_ROADS_BASE_URL = UPSTREAM_BASE_URL or "https://roads.googleapis.com"
+	WIKIPEDIA_API_URL = f"{UPSTREAM_BASE_URL or 'http://en.wikipedia.org'}/w/api.php"
+	GASBUDDY_URL = f"{UPSTREAM_BASE_URL or 'https://www.gasbuddy.com'}/usa"
+
 
 class DevelopmentConfig(Config):
 	"""Development configuration."""
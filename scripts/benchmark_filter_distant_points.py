@@ -0,0 +1,79 @@
+"""
+Compares the anchor-based filter_distant_points with the previous per-pair geopy
+implementation on synthetic routes of 1k to 50k snapped points.
+
+Usage:
+        poetry run python scripts/benchmark_filter_distant_points.py
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.map_requests import filter_distant_points, get_point_distance
+
+ROUTE_SIZES = [1_000, 5_000, 10_000, 50_000]
+
+
+def legacy_filter_distant_points(points: list) -> list:
+	"""The original filter: one geodesic solve per consecutive pair of points."""
+	placeIDs = []
+	for i, point in enumerate(points):
+		if (
+			i == 0
+			or get_point_distance(
+				_as_tuple(points[i - 1]["location"]), _as_tuple(point["location"])
+			)
+			> 5
+		):
+			placeIDs.append(point["placeId"])
+	return placeIDs
+
+
+def _as_tuple(location: dict) -> tuple[float, float]:
+	return (location["latitude"], location["longitude"])
+
+
+def synthetic_route(n_points: int, seed: int = 0) -> list[dict]:
+	"""A meandering eastbound route with 0.2-2 km between consecutive points."""
+	rng = random.Random(seed)
+	lat, lng = 34.05, -118.24
+	points = []
+	for i in range(n_points):
+		points.append(
+			{"location": {"latitude": lat, "longitude": lng}, "placeId": f"place{i}"}
+		)
+		step_km = rng.uniform(0.2, 2.0)
+		lat += rng.uniform(-0.3, 0.3) * step_km / 111
+		lng += step_km / 92
+	return points
+
+
+def _time(func, *args, **kwargs) -> tuple[float, list]:
+	start = time.perf_counter()
+	result = func(*args, **kwargs)
+	return time.perf_counter() - start, result
+
+
+def main():
+	print(
+		f"{'points':>8} {'legacy s':>10} {'haversine s':>12} {'geodesic s':>11} "
+		f"{'speedup':>8} {'legacy kept':>12} {'anchor kept':>12}"
+	)
+	for n_points in ROUTE_SIZES:
+		points = synthetic_route(n_points)
+		legacy_s, legacy_kept = _time(legacy_filter_distant_points, points)
+		fast_s, kept = _time(filter_distant_points, points)
+		exact_s, exact_kept = _time(filter_distant_points, points, exact=True)
+
+		print(
+			f"{n_points:>8} {legacy_s:>10.3f} {fast_s:>12.4f} {exact_s:>11.3f} "
+			f"{legacy_s / fast_s:>7.0f}x {len(legacy_kept):>12} {len(kept):>12}"
+		)
+
+
+if __name__ == "__main__":
+	main()
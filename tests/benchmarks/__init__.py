@@ -0,0 +1,7 @@
+"""
+Microbenchmark suite for the app's CPU hot spots.
+
+    poetry run python -m tests.benchmarks            # run and compare to baseline.json
+    poetry run python -m tests.benchmarks --save     # record a new baseline
+    poetry run pytest --benchmarks tests/test_benchmarks.py   # regression gate
+"""
@@ -0,0 +1,34 @@
+import argparse
+
+from tests.benchmarks import suite
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Run the microbenchmark suite.")
+	parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+	parser.add_argument("--repeat", type=int, default=5)
+	parser.add_argument(
+		"--save", action="store_true", help="record the results as the new baseline"
+	)
+	args = parser.parse_args()
+
+	baseline = suite.load_baseline()["benchmarks"]
+	results = suite.run(args.names, args.repeat)
+
+	print(
+		f"{'benchmark':<24} {'best ms':>10} {'median ms':>10} {'baseline ms':>12} {'ratio':>7}"
+	)
+	for name, result in results.items():
+		line = f"{name:<24} {result['best_s'] * 1000:>10.2f} {result['median_s'] * 1000:>10.2f}"
+		if name in baseline:
+			ratio = result["best_s"] / baseline[name]["best_s"]
+			line += f" {baseline[name]['best_s'] * 1000:>12.2f} {ratio:>6.2f}x"
+		print(line)
+
+	if args.save:
+		suite.save_baseline(results)
+		print(f"Saved baseline to {suite.BASELINE_PATH}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,331 @@
+"""
+Microbenchmarks of the app's CPU hot spots, a stored baseline, and the comparison
+used by the regression gate in tests/test_benchmarks.py.
+
+Each benchmark's setup builds its inputs once and returns the callable that is
+timed; the best of several runs is kept, as it is the least noisy estimate.
+"""
+
+import json
+import os
+import platform
+import random
+import statistics
+import time
+import warnings
+from contextlib import contextmanager
+from typing import Callable
+
+from config import Config
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+# a benchmark fails the gate once it is this much slower than its baseline
+DEFAULT_TOLERANCE = 0.5
+
+BENCHMARKS: dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+	"""Registers a setup function under name."""
+
+	def register(setup):
+		BENCHMARKS[name] = setup
+		return setup
+
+	return register
+
+
+def measure(fn: Callable[[], object], repeat: int = 5) -> dict:
+	"""Times fn after one warm-up call; returns the best and median of repeat runs."""
+	fn()
+	times = []
+	for _ in range(repeat):
+		start = time.perf_counter()
+		fn()
+		times.append(time.perf_counter() - start)
+	return {
+		"best_s": min(times),
+		"median_s": statistics.median(times),
+		"repeat": repeat,
+	}
+
+
+def run(names: list[str] | None = None, repeat: int = 5) -> dict[str, dict]:
+	results = {}
+	for name in names or BENCHMARKS:
+		with _setup(name) as fn:
+			results[name] = measure(fn, repeat)
+	return results
+
+
+@contextmanager
+def _setup(name: str):
+	setup = BENCHMARKS[name]()
+	# benchmarks needing teardown (e.g. an app context) set themselves up as generators
+	if hasattr(setup, "__next__"):
+		fn = next(setup)
+		try:
+			yield fn
+		finally:
+			next(setup, None)
+	else:
+		yield setup
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+	if not os.path.exists(path):
+		return {"benchmarks": {}}
+	with open(path) as f:
+		return json.load(f)
+
+
+def save_baseline(results: dict[str, dict], path: str = BASELINE_PATH):
+	"""Merges results into the baseline file, keeping benchmarks that weren't rerun."""
+	baseline = load_baseline(path)
+	baseline["machine"] = f"{platform.machine()} {platform.processor()}".strip()
+	baseline["python"] = platform.python_version()
+	baseline["benchmarks"].update(results)
+	with open(path, "w") as f:
+		json.dump(baseline, f, indent=2, sort_keys=True)
+		f.write("\n")
+
+
+def regression(result: dict, baseline: dict, tolerance: float) -> float | None:
+	"""How many times slower than baseline result is, if that exceeds 1 + tolerance."""
+	ratio = result["best_s"] / baseline["best_s"]
+	return ratio if ratio > 1 + tolerance else None
+
+
+# ---- inputs ---------------------------------------------------------------
+
+
+def synthetic_route(n_points: int, seed: int = 0) -> list[dict]:
+	"""Snapped points of a meandering eastbound route, 0.2-2 km apart."""
+	rng = random.Random(seed)
+	lat, lng = 34.05, -118.24
+	points = []
+	for i in range(n_points):
+		points.append(
+			{"location": {"latitude": lat, "longitude": lng}, "placeId": f"place{i}"}
+		)
+		step_km = rng.uniform(0.2, 2.0)
+		lat += rng.uniform(-0.3, 0.3) * step_km / 111
+		lng += step_km / 92
+	return points
+
+
+def synthetic_article(n_sections: int, n_subsections: int, paragraph: str) -> str:
+	from app.scraping_functions.wiki_places import ARTICLE_SECTIONS
+
+	names = ARTICLE_SECTIONS + [f"Section {i}" for i in range(n_sections)]
+	sections = [
+		f"== {name} ==\n"
+		+ "\n\n".join(
+			f"=== Part {j} ===\n{paragraph * 5}" for j in range(n_subsections)
+		)
+		for name in names
+	]
+	return "Intro paragraph.\n\n\n" + "\n\n\n".join(sections)
+
+
+@contextmanager
+def app_with_places(n_places: int):
+	"""An app context over a throwaway in-memory database holding n_places Places."""
+	from app import create_app
+	from app.models import Place
+	from database import db
+
+	database_uri, Config.SQLALCHEMY_DATABASE_URI = (
+		Config.SQLALCHEMY_DATABASE_URI,
+		"sqlite://",
+	)
+	warmer_interval, Config.ROUTE_WARMER_INTERVAL_SECONDS = (
+		Config.ROUTE_WARMER_INTERVAL_SECONDS,
+		0,
+	)
+	trip_workers, Config.TRIP_JOB_WORKERS = Config.TRIP_JOB_WORKERS, 0
+	enricher_interval, Config.PLACE_ENRICHER_INTERVAL_SECONDS = (
+		Config.PLACE_ENRICHER_INTERVAL_SECONDS,
+		0,
+	)
+	gas_refresh, Config.GAS_PRICE_REFRESH_SECONDS = Config.GAS_PRICE_REFRESH_SECONDS, 0
+	try:
+		flask_app = create_app()
+	finally:
+		Config.SQLALCHEMY_DATABASE_URI = database_uri
+		Config.ROUTE_WARMER_INTERVAL_SECONDS = warmer_interval
+		Config.TRIP_JOB_WORKERS = trip_workers
+		Config.PLACE_ENRICHER_INTERVAL_SECONDS = enricher_interval
+		Config.GAS_PRICE_REFRESH_SECONDS = gas_refresh
+
+	with flask_app.app_context():
+		db.create_all()
+		db.session.bulk_save_objects(
+			[
+				Place(
+					city=f"City {i}",
+					state=f"State {i % 50}",
+					population=i,
+					activities="Museum^Park",
+					wiki="{}",
+					times_favorited=0,
+					times_searched=0,
+				)
+				for i in range(n_places)
+			]
+		)
+		db.session.commit()
+		yield flask_app
+		db.session.remove()
+
+
+# ---- benchmarks -----------------------------------------------------------
+
+
+@benchmark("filter_distant_points")
+def bench_filter_distant_points():
+	from app.map_requests import filter_distant_points
+
+	points = synthetic_route(20_000)
+	return lambda: filter_distant_points(points)
+
+
+@benchmark("get_city_name")
+def bench_get_city_name():
+	from app.map_requests import get_city_name
+	from tests.standin import fixtures
+
+	extra = [
+		{"long_name": "100", "types": ["street_number"]},
+		{"long_name": "Main Street", "types": ["route"]},
+		{"long_name": "United States", "types": ["country", "political"]},
+		{"long_name": "87571", "types": ["postal_code"]},
+	]
+	components = [
+		extra + fixtures.address_components(city) for city in fixtures.CITIES
+	] * 500
+
+	def run_all():
+		for address_components in components:
+			get_city_name(address_components)
+
+	return run_all
+
+
+@benchmark("get_subsections")
+def bench_get_subsections():
+	from app.scraping_functions.wiki_places import get_subsections
+
+	paragraph = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. "
+	section = "\n\n".join(f"=== Part {j} ===\n{paragraph * 20}" for j in range(300))
+	return lambda: get_subsections(section)
+
+
+@benchmark("parse_wiki_sections")
+def bench_parse_wiki_sections():
+	from app.scraping_functions.wiki_places import ARTICLE_SECTIONS, parse_wiki_sections
+
+	article = synthetic_article(200, 30, "Lorem ipsum dolor sit amet. ")
+	return lambda: parse_wiki_sections(article, ARTICLE_SECTIONS)
+
+
+@benchmark("get_place_pop")
+def bench_get_place_pop():
+	from app.scraping_functions.population import get_place_pop
+	from app.scraping_functions.population_dictionary import pop_dictionary
+	from app.scraping_functions.state_abbreviations import state_abbr
+
+	abbreviation = {name: abbr for abbr, name in state_abbr.items()}
+	lookups = []
+	for i, place in enumerate(list(pop_dictionary)[::2]):
+		city, state = place.rsplit(", ", 1)
+		lookups.append((city, abbreviation[state] if i % 2 else state))
+	lookups += [("Nowhere", "NM"), ("Saint Nowhere", "Texas")] * 500
+
+	def run_all():
+		for city, state in lookups:
+			get_place_pop(city, state)
+
+	return run_all
+
+
+@benchmark("gas_parse")
+def bench_gas_parse():
+	from app.scraping_functions.gas import Gas
+	from tests.standin import fixtures
+
+	# the real page carries a lot of unrelated markup around the state rows
+	noise = '<div class="row"><span>ad</span><a href="/x">link</a></div>' * 2000
+	page = f"<html><body>{noise}{fixtures.gasbuddy_page()}{noise}</body></html>"
+	return lambda: Gas.parse_state_prices(page)
+
+
+@benchmark("place_generator")
+def bench_place_generator():
+	with app_with_places(20_000):
+		from app.routing_helper_functions import place_generator
+
+		lookups = [(f"City {i}", f"State {i % 50}") for i in range(0, 20_000, 40)]
+
+		def run_all():
+			for city, state in lookups:
+				place_generator(city, "", state)
+
+		yield run_all
+
+
+@benchmark("render_profile")
+def bench_render_profile():
+	from flask import render_template
+	from sqlalchemy.exc import SAWarning
+
+	from app.forms import BudgetForm, OriginDestinationForm
+	from app.models import (
+		Favoriteitem,
+		Favoritelist,
+		Place,
+		Searchitem,
+		Searchlist,
+		Travellist,
+		User,
+	)
+	from database import db
+
+	with app_with_places(10_000) as flask_app:
+		favorites, searches, travels = Favoritelist(), Searchlist(), Travellist()
+		db.session.add_all([favorites, searches, travels])
+		db.session.flush()
+		user = User(
+			username="bench",
+			email="bench@example.com",
+			budget=1000,
+			favoritelist_id=favorites.id,
+			searchlist_id=searches.id,
+			travellist_id=travels.id,
+		)
+		db.session.add(user)
+		for place_id in range(1, 10_000, 400):
+			db.session.add(
+				Favoriteitem(place_id=place_id, favoritelist_id=favorites.id)
+			)
+			db.session.add(Searchitem(place_id=place_id + 1, searchlist_id=searches.id))
+		db.session.commit()
+
+		def render():
+			with flask_app.test_request_context(
+				"/profile/1"
+			), warnings.catch_warnings():
+				# Numeric columns on SQLite warn about Decimal conversion on every load
+				warnings.simplefilter("ignore", SAWarning)
+				render_template(
+					"profile.html",
+					template_user=user,
+					template_places=Place.query.all(),
+					template_favorite_list=favorites,
+					template_search_list=searches,
+					template_travel_list=travels,
+					travel_form=OriginDestinationForm(csrf_enabled=False),
+					budget_form=BudgetForm(csrf_enabled=False),
+				)
+
+		yield render
@@ -0,0 +1,123 @@
+import sys
+from pathlib import Path
+
+import pytest
+import wikipedia
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app import create_app, map_requests, place_cache
+from app.gas_prices import gas_prices
+from app.image_store import image_store
+from config import Config
+from database import db
+from tests.standin.server import StandinServer
+
+
+def pytest_addoption(parser):
+	parser.addoption(
+		"--benchmarks",
+		action="store_true",
+		help="run the benchmark regression gate (tests marked 'benchmark')",
+	)
+	parser.addoption(
+		"--benchmark-tolerance",
+		type=float,
+		default=None,
+		help="allowed slowdown vs. tests/benchmarks/baseline.json (0.5 = 50%%)",
+	)
+
+
+def pytest_configure(config):
+	config.addinivalue_line(
+		"markers", "benchmark: timing test, only run with --benchmarks"
+	)
+
+
+def pytest_collection_modifyitems(config, items):
+	if config.getoption("--benchmarks"):
+		return
+	skip = pytest.mark.skip(reason="benchmarks only run with --benchmarks")
+	for item in items:
+		if item.get_closest_marker("benchmark"):
+			item.add_marker(skip)
+
+
+@pytest.fixture
+def app(standin, monkeypatch, tmp_path):
+	"""
+	The Flask app over a throwaway in-memory database, inside an app context.
+	Gas prices are scraped from the stand-in into a snapshot of the test's own.
+	"""
+	monkeypatch.setattr(gas_prices, "path", str(tmp_path / "gas_prices.json"))
+	monkeypatch.setattr(gas_prices, "_snapshot", None)
+	monkeypatch.setattr(Config, "GAS_PRICE_REFRESH_SECONDS", 0)
+	monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", "sqlite://")
+	monkeypatch.setattr(Config, "ROUTE_WARMER_INTERVAL_SECONDS", 0)
+	monkeypatch.setattr(Config, "TRIP_JOB_WORKERS", 0)
+	monkeypatch.setattr(Config, "PLACE_ENRICHER_INTERVAL_SECONDS", 0)
+	flask_app = create_app()
+	with flask_app.app_context():
+		db.create_all()
+		yield flask_app
+		db.session.remove()
+
+
+@pytest.fixture
+def user_client(app):
+	"""A test client logged in as a new User (with empty lists), and that User."""
+	from app.models import Favoritelist, Searchlist, Travellist, User
+
+	lists = Favoritelist(), Searchlist(), Travellist()
+	db.session.add_all(lists)
+	db.session.flush()
+	user = User(
+		username="traveler",
+		email="traveler@example.com",
+		budget=500,
+		favoritelist_id=lists[0].id,
+		searchlist_id=lists[1].id,
+		travellist_id=lists[2].id,
+	)
+	db.session.add(user)
+	db.session.commit()
+
+	client = app.test_client()
+	with client.session_transaction() as session:
+		session["_user_id"] = str(user.id)
+		session["current_session_user"] = user.id
+	return client, user
+
+
+@pytest.fixture
+def standin(monkeypatch, tmp_path):
+	"""
+	A running stand-in server with every upstream URL pointed at it, and the durable
+	caches and photo store moved to the test's own directory so stand-in results never
+	reach the real ones (nor leak between tests).
+	"""
+	for cache in (
+		place_cache.place_cache,
+		place_cache.coordinates_cache,
+		place_cache.activity_tile_cache,
+		place_cache.pair_distance_cache,
+	):
+		monkeypatch.setattr(cache, "path", str(tmp_path / "place_cache.db"))
+		monkeypatch.setattr(cache, "_conn", None)
+		monkeypatch.setattr(cache, "_touched", {})
+	monkeypatch.setattr(image_store, "root", str(tmp_path / "photo_store"))
+
+	with StandinServer() as server:
+		for setting, path in [
+			("GOOGLE_MAPS_BASE_URL", ""),
+			("GOOGLE_ROADS_BASE_URL", ""),
+			("WIKIPEDIA_API_URL", "/w/api.php"),
+			("GASBUDDY_URL", "/usa"),
+		]:
+			monkeypatch.setattr(Config, setting, f"{server.base_url}{path}")
+		monkeypatch.setattr(
+			wikipedia.wikipedia, "API_URL", f"{server.base_url}/w/api.php"
+		)
+		map_requests.clear_route_memo()
+		yield server
+		map_requests.clear_route_memo()
@@ -0,0 +1,7 @@
+"""
+Local stand-ins for the Google Maps, Wikipedia and GasBuddy upstreams, for tests,
+benchmarks and load tests that must not spend real quota.
+
+Run `python -m tests.standin --port 8765` and start the app with
+UPSTREAM_BASE_URL=http://127.0.0.1:8765 to point every upstream call at it.
+"""
@@ -0,0 +1,38 @@
+import argparse
+
+from tests.standin.server import StandinOptions, StandinServer
+
+
+def main():
+	parser = argparse.ArgumentParser(
+		description="Serve the stand-in Google Maps, Wikipedia and GasBuddy upstreams."
+	)
+	parser.add_argument("--host", default="127.0.0.1")
+	parser.add_argument("--port", type=int, default=8765)
+	parser.add_argument("--latency-ms", type=float, default=0.0)
+	parser.add_argument("--jitter-ms", type=float, default=0.0)
+	parser.add_argument("--error-rate", type=float, default=0.0)
+	parser.add_argument("--quota-error-rate", type=float, default=0.0)
+	parser.add_argument("--nearby-pages", type=int, default=1)
+	parser.add_argument("--seed", type=int, default=0)
+	args = parser.parse_args()
+
+	options = StandinOptions(
+		latency_ms=args.latency_ms,
+		jitter_ms=args.jitter_ms,
+		error_rate=args.error_rate,
+		quota_error_rate=args.quota_error_rate,
+		nearby_pages=args.nearby_pages,
+		seed=args.seed,
+	)
+	server = StandinServer(options, host=args.host, port=args.port)
+	print(f"Stand-in upstreams on {server.base_url}")
+	print(f"Start the app with UPSTREAM_BASE_URL={server.base_url}")
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,295 @@
+"""
+Deterministic fixture data served by the stand-in upstreams.
+
+A fixed set of cities stands in for the world: routes run in a straight line
+between two of them, every point snaps and reverse-geocodes to the nearest one,
+and Wikipedia articles, attractions and gas prices are generated from their names.
+"""
+
+import base64
+import re
+
+from app.route_geometry import encode_polyline, haversine_km, resample
+from app.scraping_functions.state_abbreviations import state_abbr
+
+# (city, county, state abbreviation, lat, lng)
+CITIES = [
+	("Socorro", "Socorro County", "NM", 34.0584, -106.8914),
+	("Albuquerque", "Bernalillo County", "NM", 35.0844, -106.6504),
+	("Santa Fe", "Santa Fe County", "NM", 35.6870, -105.9378),
+	("Taos", "Taos County", "NM", 36.4072, -105.5731),
+	("Tucumcari", "Quay County", "NM", 35.1717, -103.7250),
+	("Flagstaff", "Coconino County", "AZ", 35.1983, -111.6513),
+	("Denver", "Denver County", "CO", 39.7392, -104.9903),
+	("Amarillo", "Potter County", "TX", 35.2220, -101.8313),
+	("Dodge City", "Ford County", "KS", 37.7528, -100.0171),
+	("Oklahoma City", "Oklahoma County", "OK", 35.4676, -97.5164),
+	("Wichita", "Sedgwick County", "KS", 37.6872, -97.3301),
+	("Tulsa", "Tulsa County", "OK", 36.1540, -95.9928),
+	("Kansas City", "Jackson County", "MO", 39.0997, -94.5786),
+	("Springfield", "Greene County", "MO", 37.2090, -93.2923),
+	("Columbia", "Boone County", "MO", 38.9517, -92.3341),
+	("St. Louis", "St. Louis City", "MO", 38.6270, -90.1994),
+	("Indianapolis", "Marion County", "IN", 39.7684, -86.1581),
+	("Dayton", "Montgomery County", "OH", 39.7589, -84.1916),
+	("Columbus", "Franklin County", "OH", 39.9612, -82.9988),
+	("Wheeling", "Ohio County", "WV", 40.0640, -80.7209),
+	("Pittsburgh", "Allegheny County", "PA", 40.4406, -79.9959),
+	("Harrisburg", "Dauphin County", "PA", 40.2732, -76.8867),
+	("Philadelphia", "Philadelphia County", "PA", 39.9526, -75.1652),
+	("New York City", "New York County", "NY", 40.7128, -74.0060),
+]
+
+# Directions: polyline vertex spacing, road distance vs great circle, average speed
+ROUTE_VERTEX_SPACING_KM = 10.0
+ROAD_DETOUR_FACTOR = 1.2
+AVERAGE_SPEED_MPS = 29.0
+STEPS_PER_LEG = 5
+
+ATTRACTION_KINDS = ["Museum", "State Park", "Historic District", "Botanical Garden"]
+WIKI_SECTIONS = ["History", "Geography", "Demographics", "Economy", "Notable People"]
+
+# a 1x1 pixel JPEG returned for every place photo
+PHOTO_JPEG = base64.b64decode(
+	"/9j/4AAQSkZJRgABAQEASABIAAD/2wBDAP//////////////////////////////////////"
+	"////////////////////////////////////////////////wgALCAABAAEBAREA/8QAFBAB"
+	"AAAAAAAAAAAAAAAAAAAAAP/aAAgBAQABPxA="
+)
+
+
+def slug(city: tuple) -> str:
+	return re.sub(r"[^a-z0-9]+", "-", f"{city[0]} {city[2]}".lower()).strip("-")
+
+
+def place_id(city: tuple) -> str:
+	return f"standin-{slug(city)}"
+
+
+def find_city(text: str) -> tuple | None:
+	"""The fixture city named by free text ("Taos, New Mexico") or a stand-in place ID."""
+	text = text.strip()
+	by_id = {place_id(city): city for city in CITIES}
+	if text in by_id:
+		return by_id[text]
+	name = text.split(",")[0].strip().lower()
+	return next((city for city in CITIES if city[0].lower() == name), None)
+
+
+def nearest_city(lat: float, lng: float) -> tuple:
+	distances = haversine_km((lat, lng), [(city[3], city[4]) for city in CITIES])
+	return min(zip(distances, CITIES))[1]
+
+
+def parse_latlng(value: str) -> tuple[float, float]:
+	lat, lng = value.split(",")
+	return float(lat), float(lng)
+
+
+def road_distance(start: tuple, end: tuple) -> int:
+	"""Driving distance in meters between two fixture cities."""
+	return int(haversine_km(start[3:], [end[3:]])[0] * 1000 * ROAD_DETOUR_FACTOR)
+
+
+def directions(origin: str, destination: str) -> dict:
+	start, end = find_city(origin), find_city(destination)
+	if start is None or end is None:
+		return {"status": "ZERO_RESULTS", "routes": []}
+
+	coords = resample([start[3:], end[3:]], ROUTE_VERTEX_SPACING_KM)
+	distance = road_distance(start, end)
+	step_ends = coords[:: max(1, len(coords) // STEPS_PER_LEG)][1:] + [coords[-1]]
+	leg = {
+		"distance": {"value": distance, "text": f"{round(distance / 1609.34)} mi"},
+		"duration": {"value": int(distance / AVERAGE_SPEED_MPS)},
+		"start_address": f"{start[0]}, {start[2]}, USA",
+		"end_address": f"{end[0]}, {end[2]}, USA",
+		"steps": [
+			{"end_location": {"lat": float(lat), "lng": float(lng)}}
+			for lat, lng in step_ends
+		],
+	}
+	return {
+		"status": "OK",
+		"routes": [
+			{"legs": [leg], "overview_polyline": {"points": encode_polyline(coords)}}
+		],
+	}
+
+
+def distance_matrix(origins: str, destinations: str) -> dict:
+	"""Every origin x destination element; places not in CITIES are NOT_FOUND."""
+	starts = [find_city(origin) for origin in origins.split("|")]
+	ends = [find_city(destination) for destination in destinations.split("|")]
+
+	def element(start, end):
+		if start is None or end is None:
+			return {"status": "NOT_FOUND"}
+		distance = road_distance(start, end)
+		return {
+			"status": "OK",
+			"distance": {"value": distance, "text": f"{round(distance / 1609.34)} mi"},
+			"duration": {"value": int(distance / AVERAGE_SPEED_MPS)},
+		}
+
+	return {
+		"status": "OK",
+		"origin_addresses": [f"{c[0]}, {c[2]}, USA" if c else "" for c in starts],
+		"destination_addresses": [f"{c[0]}, {c[2]}, USA" if c else "" for c in ends],
+		"rows": [
+			{"elements": [element(start, end) for end in ends]} for start in starts
+		],
+	}
+
+
+def snap_to_roads(path: str) -> dict:
+	snapped = []
+	for index, point in enumerate(filter(None, path.split("|"))):
+		lat, lng = parse_latlng(point)
+		snapped.append(
+			{
+				"location": {"latitude": lat, "longitude": lng},
+				"originalIndex": index,
+				"placeId": place_id(nearest_city(lat, lng)),
+			}
+		)
+	return {"snappedPoints": snapped}
+
+
+def address_components(city: tuple) -> list[dict]:
+	return [
+		{
+			"long_name": city[0],
+			"short_name": city[0],
+			"types": ["locality", "political"],
+		},
+		{
+			"long_name": city[1],
+			"short_name": city[1],
+			"types": ["administrative_area_level_2", "political"],
+		},
+		{
+			"long_name": state_abbr[city[2]],
+			"short_name": city[2],
+			"types": ["administrative_area_level_1", "political"],
+		},
+	]
+
+
+def geocode(place_id_param: str | None, latlng: str | None) -> dict:
+	city = (
+		find_city(place_id_param)
+		if place_id_param
+		else nearest_city(*parse_latlng(latlng))
+	)
+	if city is None:
+		return {"status": "INVALID_REQUEST", "results": []}
+	return {
+		"status": "OK",
+		"results": [
+			{"address_components": address_components(city), "place_id": place_id(city)}
+		],
+	}
+
+
+def photos(city: tuple) -> list[dict]:
+	return [{"photo_reference": f"{slug(city)}-photo-{i}"} for i in range(3)]
+
+
+def find_place(text: str) -> dict:
+	if (city := find_city(text)) is None:
+		return {"status": "ZERO_RESULTS", "candidates": []}
+	return {
+		"status": "OK",
+		"candidates": [
+			{
+				"place_id": place_id(city),
+				"name": city[0],
+				"geometry": {"location": {"lat": city[3], "lng": city[4]}},
+				"photos": photos(city),
+			}
+		],
+	}
+
+
+def place_details(place_id_param: str) -> dict:
+	if (city := find_city(place_id_param)) is None:
+		return {"status": "NOT_FOUND"}
+	return {"status": "OK", "result": {"photos": photos(city)}}
+
+
+def nearby_search(location: str | None, page_token: str | None, pages: int) -> dict:
+	"""Attractions of the city nearest location, split over `pages` pages."""
+	if page_token:
+		city_slug, page = page_token.rsplit(":", 1)
+		city = next((c for c in CITIES if slug(c) == city_slug), None)
+		page = int(page)
+		if city is None:
+			return {"status": "INVALID_REQUEST", "results": []}
+	else:
+		city, page = nearest_city(*parse_latlng(location)), 0
+
+	results = [
+		{"name": f"{city[0]} {kind}", "place_id": f"{place_id(city)}-{page}-{i}"}
+		for i, kind in enumerate(ATTRACTION_KINDS)
+	]
+	response = {"status": "OK", "results": results}
+	if page + 1 < pages:
+		response["next_page_token"] = f"{slug(city)}:{page + 1}"
+	return response
+
+
+def wiki_title(city: tuple) -> str:
+	return f"{city[0]}, {state_abbr[city[2]]}"
+
+
+def wiki_article(city: tuple) -> str:
+	intro = f"{city[0]} is a city in {city[1]}, {state_abbr[city[2]]}, United States."
+	sections = [
+		f"== {section} ==\n"
+		f"=== Overview ===\nThe {section.lower()} of {city[0]} in brief.\n\n"
+		f"=== Details ===\nMore about the {section.lower()} of {city[0]}."
+		for section in WIKI_SECTIONS
+	]
+	return "\n\n\n".join([intro, *sections])
+
+
+def wikipedia_api(params: dict, base_url: str) -> dict:
+	"""Answers the MediaWiki API queries made by the `wikipedia` package."""
+	if "srsearch" in params:
+		city = find_city(params["srsearch"])
+		search = [{"title": wiki_title(city)}] if city else []
+		return {"query": {"search": search}}
+
+	title = params.get("titles", "")
+	city = next((c for c in CITIES if wiki_title(c) == title), None)
+	if city is None:
+		return {"query": {"pages": {"-1": {"title": title, "missing": ""}}}}
+
+	page_id = str(CITIES.index(city) + 1)
+	page = {"pageid": int(page_id), "title": title}
+	if params.get("generator") == "images":
+		url = f"{base_url}/w/images/{slug(city)}.jpg"
+		return {"query": {"pages": {"-1": {"imageinfo": [{"url": url}]}}}}
+	if "extracts" in params.get("prop", ""):
+		page["extract"] = wiki_article(city)
+		page["revisions"] = [{"revid": 1, "parentid": 0}]
+	else:
+		page["fullurl"] = f"{base_url}/wiki/{title.replace(' ', '_')}"
+	return {"query": {"pages": {page_id: page}}}
+
+
+def gas_price(state: str) -> str:
+	index = sorted(state_abbr.values()).index(state)
+	return f"{3 + (index * 37 % 150) / 100:.2f}"
+
+
+def gasbuddy_page() -> str:
+	"""The GasBuddy state averages page, reduced to the markup app.scraping_functions.gas reads."""
+	rows = "".join(
+		'<div class="col-sm-12 col-xs-12">'
+		f'<div class="col-sm-6 col-xs-6 siteName">{state}</div>'
+		f'<div class="col-sm-2 col-xs-3 text-right">{gas_price(state)}</div>'
+		"</div>"
+		for state in sorted(state_abbr.values())
+	)
+	return f"<html><body>{rows}</body></html>"
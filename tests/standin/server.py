@@ -0,0 +1,219 @@
+"""
+A local HTTP server standing in for the Google Maps, Wikipedia and GasBuddy endpoints
+the app calls, with injectable latency and errors.
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from tests.standin import fixtures
+
+# request path -> endpoint name (the same names the rate governor's limits use)
+ENDPOINTS = {
+	"/maps/api/directions/json": "directions",
+	"/maps/api/distancematrix/json": "distancematrix",
+	"/v1/snapToRoads": "snapToRoads",
+	"/maps/api/geocode/json": "geocode",
+	"/maps/api/place/findplacefromtext/json": "findplacefromtext",
+	"/maps/api/place/details/json": "details",
+	"/maps/api/place/nearbysearch/json": "nearbysearch",
+	"/maps/api/place/photo": "photo",
+	"/w/api.php": "wikipedia",
+	"/usa": "gasbuddy",
+}
+# endpoints that report quota errors in a 200 JSON body rather than an HTTP status
+GOOGLE_BODY_STATUS_ENDPOINTS = {
+	"directions",
+	"distancematrix",
+	"geocode",
+	"findplacefromtext",
+	"details",
+	"nearbysearch",
+}
+
+
+@dataclass
+class StandinOptions:
+	"""How the stand-in misbehaves.
+
+	Attributes:
+	        latency_ms (float): Delay added to every response.
+	        jitter_ms (float): Extra uniformly random delay, up to this much.
+	        endpoint_latency_ms (dict): Per-endpoint overrides of latency_ms.
+	        error_rate (float): Fraction of requests answered with HTTP 503.
+	        quota_error_rate (float): Fraction answered with OVER_QUERY_LIMIT (or HTTP 429).
+	        nearby_pages (int): Pages of results each Nearby Search spans.
+	        seed (int): Seed for the jitter and error draws.
+	"""
+
+	latency_ms: float = 0.0
+	jitter_ms: float = 0.0
+	endpoint_latency_ms: dict[str, float] = field(default_factory=dict)
+	error_rate: float = 0.0
+	quota_error_rate: float = 0.0
+	nearby_pages: int = 1
+	seed: int = 0
+
+
+class StandinServer:
+	"""Serves the fixture upstreams on a background thread.
+
+	Attributes:
+	        options (StandinOptions): Latency and error injection settings.
+	        hits (dict): Requests received per endpoint name.
+	        base_url (str): Where the server listens, once started.
+	"""
+
+	def __init__(
+		self,
+		options: StandinOptions | None = None,
+		host: str = "127.0.0.1",
+		port: int = 0,
+	):
+		self.options = options or StandinOptions()
+		self.hits = {}
+		self._rng = random.Random(self.options.seed)
+		self._lock = threading.Lock()
+		self._httpd = _QuietHTTPServer((host, port), _handler_for(self))
+		self._thread = None
+
+	@property
+	def base_url(self) -> str:
+		host, port = self._httpd.server_address[:2]
+		return f"http://{host}:{port}"
+
+	def start(self) -> "StandinServer":
+		self._thread = threading.Thread(
+			target=self._httpd.serve_forever, name="standin-server", daemon=True
+		)
+		self._thread.start()
+		return self
+
+	def serve_forever(self):
+		self._httpd.serve_forever()
+
+	def stop(self):
+		self._httpd.shutdown()
+		self._httpd.server_close()
+		if self._thread is not None:
+			self._thread.join()
+
+	def __enter__(self) -> "StandinServer":
+		return self.start()
+
+	def __exit__(self, *exc_info):
+		self.stop()
+
+	def _draw(self, endpoint: str) -> tuple[float, str | None]:
+		"""Counts the hit and decides this request's delay (seconds) and injected error."""
+		options = self.options
+		with self._lock:
+			self.hits[endpoint] = self.hits.get(endpoint, 0) + 1
+			jitter = self._rng.uniform(0, options.jitter_ms)
+			roll = self._rng.random()
+		latency = options.endpoint_latency_ms.get(endpoint, options.latency_ms)
+		if roll < options.error_rate:
+			error = "unavailable"
+		elif roll < options.error_rate + options.quota_error_rate:
+			error = "quota"
+		else:
+			error = None
+		return (latency + jitter) / 1000, error
+
+	def respond(self, path: str, params: dict) -> tuple[int, str, bytes]:
+		"""(status, content type, body) for a request; runs on the handler's thread."""
+		endpoint = ENDPOINTS.get(path)
+		if endpoint is None:
+			return 404, "text/plain", b"not found"
+
+		delay, error = self._draw(endpoint)
+		if delay:
+			time.sleep(delay)
+
+		if error == "unavailable":
+			return 503, "text/plain", b"service unavailable"
+		if error == "quota":
+			if endpoint in GOOGLE_BODY_STATUS_ENDPOINTS:
+				return _json(200, {"status": "OVER_QUERY_LIMIT"})
+			return _json(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}})
+
+		return HANDLERS[endpoint](self, params)
+
+
+def _json(status: int, body: dict) -> tuple[int, str, bytes]:
+	return status, "application/json", json.dumps(body).encode()
+
+
+# endpoint name -> (server, query params) -> (status, content type, body)
+HANDLERS = {
+	"directions": lambda server, params: _json(
+		200, fixtures.directions(params["origin"], params["destination"])
+	),
+	"distancematrix": lambda server, params: _json(
+		200, fixtures.distance_matrix(params["origins"], params["destinations"])
+	),
+	"snapToRoads": lambda server, params: _json(
+		200, fixtures.snap_to_roads(params["path"])
+	),
+	"geocode": lambda server, params: _json(
+		200, fixtures.geocode(params.get("place_id"), params.get("latlng"))
+	),
+	"findplacefromtext": lambda server, params: _json(
+		200, fixtures.find_place(params["input"])
+	),
+	"details": lambda server, params: _json(
+		200, fixtures.place_details(params["place_id"])
+	),
+	"nearbysearch": lambda server, params: _json(
+		200,
+		fixtures.nearby_search(
+			params.get("location"), params.get("pagetoken"), server.options.nearby_pages
+		),
+	),
+	"photo": lambda server, params: (200, "image/jpeg", fixtures.PHOTO_JPEG),
+	"wikipedia": lambda server, params: _json(
+		200, fixtures.wikipedia_api(params, server.base_url)
+	),
+	"gasbuddy": lambda server, params: (
+		200,
+		"text/html",
+		fixtures.gasbuddy_page().encode(),
+	),
+}
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+	daemon_threads = True
+
+	def handle_error(self, request, client_address):
+		# clients dropping pooled keep-alive connections is routine, not an error
+		if not isinstance(sys.exc_info()[1], ConnectionError):
+			super().handle_error(request, client_address)
+
+
+def _handler_for(server: StandinServer) -> type[BaseHTTPRequestHandler]:
+	class Handler(BaseHTTPRequestHandler):
+		# keep-alive, like the real upstreams, so connection pooling is exercised
+		protocol_version = "HTTP/1.1"
+
+		def do_GET(self):
+			url = urlsplit(self.path)
+			status, content_type, body = server.respond(
+				url.path, dict(parse_qsl(url.query, keep_blank_values=True))
+			)
+			self.send_response(status)
+			self.send_header("Content-Type", content_type)
+			self.send_header("Content-Length", str(len(body)))
+			self.end_headers()
+			self.wfile.write(body)
+
+		def log_message(self, format, *args):
+			pass
+
+	return Handler
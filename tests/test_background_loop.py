@@ -0,0 +1,87 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.background_loop import BackgroundEventLoop
+
+
+async def _current_loop():
+	await asyncio.sleep(0)
+	return asyncio.get_running_loop()
+
+
+def test_sync_calls_share_one_long_lived_loop():
+	bg = BackgroundEventLoop(name="test-loop")
+	try:
+		first, second = bg.run(_current_loop()), bg.run(_current_loop())
+		assert first is second
+		assert first.is_running()
+	finally:
+		bg.stop()
+
+
+def test_run_works_while_caller_has_its_own_loop():
+	"""Unlike asyncio.run, the facade can be called from inside a running loop."""
+	bg = BackgroundEventLoop(name="test-loop")
+
+	async def caller():
+		return bg.run(_current_loop()) is not asyncio.get_running_loop()
+
+	try:
+		assert asyncio.run(caller())
+	finally:
+		bg.stop()
+
+
+def test_run_from_own_loop_raises_instead_of_deadlocking():
+	bg = BackgroundEventLoop(name="test-loop")
+
+	async def reenter():
+		bg.run(_current_loop())
+
+	try:
+		with pytest.raises(RuntimeError):
+			bg.run(reenter(), timeout=5)
+	finally:
+		bg.stop()
+
+
+def test_shutdown_hooks_run_on_the_loop():
+	bg = BackgroundEventLoop(name="test-loop")
+	closed = []
+
+	async def close():
+		closed.append(asyncio.get_running_loop())
+
+	bg.add_shutdown_hook(close)
+	loop = bg.run(_current_loop())
+	bg.stop()
+
+	assert closed == [loop]
+	assert loop.is_closed()
+
+
+def test_iterate_yields_items_before_the_generator_finishes():
+	bg = BackgroundEventLoop(name="test-loop")
+	closed = []
+
+	async def stages():
+		try:
+			yield "route"
+			yield "city"
+			await asyncio.Event().wait()  # never finishes on its own
+		finally:
+			closed.append(True)
+
+	try:
+		items = bg.iterate(stages(), timeout=5)
+		assert next(items) == "route"
+		assert next(items) == "city"
+		items.close()
+		assert closed == [True]
+	finally:
+		bg.stop()
@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from tests.benchmarks import suite
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("name", list(suite.BENCHMARKS))
+def test_no_regression_against_baseline(name, request):
+	baseline = suite.load_baseline()["benchmarks"]
+	if name not in baseline:
+		pytest.skip(
+			f"no baseline for {name}; record one with python -m tests.benchmarks --save"
+		)
+	tolerance = request.config.getoption("--benchmark-tolerance")
+	if tolerance is None:
+		tolerance = suite.DEFAULT_TOLERANCE
+
+	result = suite.run([name])[name]
+	ratio = suite.regression(result, baseline[name], tolerance)
+
+	assert ratio is None, (
+		f"{name} took {result['best_s'] * 1000:.1f} ms, {ratio:.2f}x its baseline "
+		f"of {baseline[name]['best_s'] * 1000:.1f} ms (tolerance {tolerance:.0%})"
+	)
+
+
+def test_regression_threshold():
+	baseline = {"best_s": 0.100}
+
+	assert suite.regression({"best_s": 0.140}, baseline, 0.5) is None
+	assert suite.regression({"best_s": 0.160}, baseline, 0.5) == pytest.approx(1.6)
@@ -0,0 +1,80 @@
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.gas_prices import GasPriceService
+from app.map_requests import APIError
+from config import Config
+from tests.standin import fixtures
+
+
+def test_importing_the_app_scrapes_nothing():
+	# the blueprints import routing_helper_functions, which used to scrape GasBuddy
+	code = "from app import create_app, routing_helper_functions"
+	result = subprocess.run(
+		[sys.executable, "-c", code],
+		cwd=Path(__file__).resolve().parent.parent,
+		env={"UPSTREAM_BASE_URL": "http://127.0.0.1:9", "PATH": ""},
+		capture_output=True,
+		text=True,
+		timeout=60,
+	)
+	assert result.returncode == 0, result.stderr
+
+
+def test_first_use_scrapes_a_snapshot_later_processes_load(standin, tmp_path):
+	path = str(tmp_path / "gas_prices.json")
+	service = GasPriceService(path)
+	assert "gasbuddy" not in standin.hits
+
+	new_mexico = float(fixtures.gas_price("New Mexico"))
+	colorado = float(fixtures.gas_price("Colorado"))
+	assert service.state_price("NM") == service.state_price("New Mexico") == new_mexico
+	assert service.price_for("NM", "CO") == round((new_mexico + colorado) / 2, 2)
+	assert service.price_for("Atlantis") == service.national_average()
+	assert standin.hits["gasbuddy"] == 1
+
+	# another worker starts from the snapshot on disk
+	assert GasPriceService(path).state_price("NM") == new_mexico
+	assert standin.hits["gasbuddy"] == 1
+
+
+def test_stale_snapshot_is_served_while_it_refreshes(standin, tmp_path):
+	path = tmp_path / "gas_prices.json"
+	fetched_at = time.time() - 2 * Config.GAS_PRICE_MAX_AGE_SECONDS
+	path.write_text(
+		json.dumps({"fetched_at": fetched_at, "prices": {"new mexico": 9.99}})
+	)
+	service = GasPriceService(str(path))
+
+	assert service.state_price("NM") == 9.99
+	service._background.join()
+
+	assert standin.hits["gasbuddy"] == 1
+	assert service.state_price("NM") == float(fixtures.gas_price("New Mexico"))
+	assert json.loads(path.read_text())["fetched_at"] > fetched_at
+
+
+def test_unreachable_gasbuddy(tmp_path, monkeypatch):
+	monkeypatch.setattr(Config, "GASBUDDY_URL", "http://127.0.0.1:9/usa")
+	path = tmp_path / "gas_prices.json"
+
+	# nothing to fall back on
+	with pytest.raises(APIError):
+		GasPriceService(str(path)).national_average()
+
+	# a stale snapshot keeps being served
+	fetched_at = time.time() - 2 * Config.GAS_PRICE_MAX_AGE_SECONDS
+	path.write_text(
+		json.dumps({"fetched_at": fetched_at, "prices": {"new mexico": 3.5}})
+	)
+	service = GasPriceService(str(path))
+	assert service.national_average() == 3.5
+	service._background.join()
+	assert service.national_average() == 3.5
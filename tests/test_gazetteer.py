@@ -0,0 +1,82 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app import map_requests
+from app.gazetteer import Gazetteer
+from app.map_requests import RouteResult
+from app.scraping_functions.population import get_place_pop
+
+CENSUS_PLACES = """USPS	GEOID	ANSICODE	NAME	LSAD	FUNCSTAT	ALAND	AWATER	ALAND_SQMI	AWATER_SQMI	INTPTLAT	INTPTLONG
+NM	3574520	02411945	Socorro city	25	A	37606573	0	14.520	0.000	34.046246	-106.904476
+NM	3517580	02409608	Belen city	25	A	31144187	3037	12.025	0.001	34.651985	-106.760460
+NM	3502000	02409678	Albuquerque city	25	A	484432069	4692017	187.040	1.812	35.105552	-106.647388
+AL	0100124	02582661	Abbeville city	25	A	40342012	107267	15.576	0.041	31.564724	-85.259123
+PR	7200000	02414967	Adjuntas zona urbana	62	S	3357779	0	1.296	0.000	18.163486	-66.723161
+"""
+
+
+def _gazetteer(tmp_path, max_km=10):
+	path = tmp_path / "Gaz_place_national.txt"
+	path.write_text(CENSUS_PLACES)
+	return Gazetteer.from_census_file(str(path), max_km=max_km)
+
+
+def test_census_names_line_up_with_population_keys(tmp_path):
+	gazetteer = _gazetteer(tmp_path)
+
+	assert [(city, state) for city, state, _, _ in gazetteer.places] == [
+		("Socorro", "New Mexico"),
+		("Belen", "New Mexico"),
+		("Albuquerque", "New Mexico"),
+		("Abbeville city", "Alabama"),
+	]
+	assert all(get_place_pop(city, state) > 0 for city, state, _, _ in gazetteer.places)
+
+
+def test_reverse_geocode_nearest_place_within_radius(tmp_path):
+	gazetteer = _gazetteer(tmp_path)
+
+	assert gazetteer.reverse_geocode(34.06, -106.89) == ["Socorro", None, "New Mexico"]
+	assert gazetteer.reverse_geocode(35.09, -106.62) == [
+		"Albuquerque",
+		None,
+		"New Mexico",
+	]
+	# halfway between Socorro and Belen is farther than 10 km from both
+	assert gazetteer.reverse_geocode(34.35, -106.83) is None
+
+
+def test_offline_cities_list_falls_back_to_google_only_when_asked(tmp_path, monkeypatch):
+	gazetteer = _gazetteer(tmp_path)
+	route = RouteResult(
+		origin="socorro, nm",
+		destination="albuquerque, nm",
+		distance_meters=120000,
+		duration_seconds=4000,
+		legs=[],
+		geometry=[(34.046, -106.904), (34.652, -106.760), (35.106, -106.647)],
+	)
+	geocoded = []
+
+	async def fake_get_city_from_latlng(latlng, client=None):
+		geocoded.append(latlng)
+		return latlng, None
+
+	monkeypatch.setattr(map_requests, "get_city_from_latlng", fake_get_city_from_latlng)
+	# offline means offline unless GAZETTEER_FALLBACK is set
+	cities = asyncio.run(map_requests._get_cities_from_gazetteer(route, gazetteer))
+	assert [city[0] for city in cities.values()] == ["Socorro", "Belen", "Albuquerque"]
+	assert not geocoded
+
+	cities = asyncio.run(
+		map_requests._get_cities_from_gazetteer(route, gazetteer, fallback=True)
+	)
+	assert [city[0] for city in cities.values()] == ["Socorro", "Belen", "Albuquerque"]
+	# only points away from every indexed place needed a Geocoding call
+	assert geocoded
+	assert all(
+		gazetteer.reverse_geocode(*map(float, ll.split(","))) is None for ll in geocoded
+	)
@@ -0,0 +1,40 @@
+import asyncio
+import sys
+from pathlib import Path
+
+from aiohttp import web
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.http_client import AsyncHTTPClient
+
+
+async def _serve_and_fetch(client: AsyncHTTPClient, n_requests: int) -> list[dict]:
+	async def handler(request):
+		return web.json_response({"status": "OK", "path": request.path})
+
+	app = web.Application()
+	app.router.add_get("/{tail:.*}", handler)
+	runner = web.AppRunner(app)
+	await runner.setup()
+	site = web.TCPSite(runner, "127.0.0.1", 0)
+	await site.start()
+	port = site._server.sockets[0].getsockname()[1]
+
+	try:
+		urls = [f"http://127.0.0.1:{port}/geocode/{i}" for i in range(n_requests)]
+		return await asyncio.gather(*(client.get_json(url) for url in urls))
+	finally:
+		await client.close()
+		await runner.cleanup()
+
+
+def test_pooled_client_reuses_connections():
+	"""Many requests through the shared client should reuse a handful of connections."""
+	client = AsyncHTTPClient(limit_per_host=2)
+	results = asyncio.run(_serve_and_fetch(client, 20))
+
+	assert [r["path"] for r in results] == [f"/geocode/{i}" for i in range(20)]
+	assert client.stats["requests"] == 20
+	assert client.stats["connections_created"] <= 2
+	assert client.stats["connections_reused"] >= 18
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app import map_requests
+from app.image_store import ImageStore
+from app.models import Place
+from database import db
+from tests.standin import fixtures
+
+
+class FakePhotoClient:
+	"""Answers Find Place with three photos and 'downloads' each photo as a few bytes."""
+
+	def __init__(self):
+		self.downloads = []
+
+	async def get_json(self, url):
+		photos = [{"photo_reference": f"ref{i}"} for i in range(3)]
+		return {"status": "OK", "candidates": [{"photos": photos}]}
+
+	async def download(self, url, dest_path):
+		self.downloads.append(url)
+		await asyncio.sleep(0)
+		with open(dest_path, "wb") as f:
+			f.write(b"not really a jpeg")
+		return 200
+
+
+def test_photos_stored_once_and_returned_as_handles(tmp_path):
+	store = ImageStore(str(tmp_path))
+	client = FakePhotoClient()
+
+	handles = asyncio.run(
+		map_requests.get_place_images_async("Taos, NM", client=client, store=store)
+	)
+	again = asyncio.run(
+		map_requests.get_place_images_async("Taos, NM", client=client, store=store)
+	)
+
+	assert [h.photo_reference for h in handles] == ["ref0", "ref1", "ref2"]
+	assert handles == again
+	assert len(client.downloads) == 3
+	for handle in handles:
+		assert handle.key == ImageStore.key_for(handle.photo_reference)
+		assert handle.path.startswith(str(tmp_path))
+		assert os.path.getsize(handle.path) == len(b"not really a jpeg")
+
+
+def test_path_for_rejects_keys_outside_the_store(tmp_path):
+	store = ImageStore(str(tmp_path))
+
+	for key in ["../../etc/passwd", "A" * 64, ""]:
+		with pytest.raises(ValueError):
+			store.path_for(key)
+
+
+def test_place_page_serves_its_photos_from_the_store(user_client, standin):
+	client, _ = user_client
+	place = Place(
+		city="Taos",
+		state="New Mexico",
+		population=1,
+		activities="",
+		wiki="{}",
+		times_favorited=0,
+		times_searched=0,
+	)
+	db.session.add(place)
+	db.session.commit()
+
+	page = client.get(f"/place_info/{place.id}").get_data(as_text=True)
+
+	(first, *_) = fixtures.photos(fixtures.find_city("Taos, New Mexico"))
+	key = ImageStore.key_for(first["photo_reference"])
+	assert f"/place_photo/{key}" in page
+	assert f"/place_photo/{key}/thumbnail" in page
+	photo = client.get(f"/place_photo/{key}")
+	assert photo.status_code == 200 and photo.data == fixtures.PHOTO_JPEG
+	assert standin.hits["photo"] == 3
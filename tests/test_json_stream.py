@@ -0,0 +1,149 @@
+import asyncio
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app import json_stream, map_requests
+from app.http_client import AsyncHTTPClient
+
+
+@pytest.fixture(params=["ijson", "json"])
+def parser(request, monkeypatch):
+	if request.param == "json":
+		monkeypatch.setattr(json_stream, "ijson", None)
+	elif json_stream.ijson is None:
+		pytest.skip("ijson not installed")
+
+
+class _ByteStream:
+	"""Just enough of aiohttp's StreamReader for parse_fields_async."""
+
+	def __init__(self, body: bytes, chunk_size: int = 7):
+		self._body = body
+		self._chunk_size = chunk_size
+
+	async def read(self, n: int = -1) -> bytes:
+		n = len(self._body) if n < 0 else min(n, self._chunk_size)
+		chunk, self._body = self._body[:n], self._body[n:]
+		return chunk
+
+
+def _directions_response(n_legs: int = 2, n_steps: int = 3) -> dict:
+	def step(i):
+		return {
+			"end_location": {"lat": 35.0 + i / 10, "lng": -106.5},
+			"html_instructions": "Turn <b>left</b> onto Main St " * 20,
+			"polyline": {"points": "a~l~Fjk~uOwHJy@P" * 20},
+			"distance": {"text": "1 mi", "value": 1609},
+		}
+
+	leg = {
+		"distance": {"text": "10 mi", "value": 16093},
+		"duration": {"text": "12 mins", "value": 720},
+		"start_address": "Socorro, NM, USA",
+		"end_address": "Santa Fe, NM, USA",
+		"steps": [step(i) for i in range(n_steps)],
+	}
+	return {
+		"geocoded_waypoints": [{"place_id": "abc", "types": ["locality"]}],
+		"routes": [
+			{
+				"summary": "I-25 N",
+				"legs": [leg] * n_legs,
+				"overview_polyline": {"points": "_p~iF~ps|U_ulLnnqC"},
+				"warnings": [],
+			}
+		],
+		"status": "OK",
+	}
+
+
+def test_prune_keeps_only_fields_in_shape(parser):
+	response = _directions_response()
+	body = json.dumps(response).encode()
+
+	pruned = asyncio.run(
+		json_stream.parse_fields_async(
+			_ByteStream(body), map_requests.DIRECTIONS_FIELDS
+		)
+	)
+
+	leg = {
+		"distance": {"text": "10 mi", "value": 16093},
+		"duration": {"text": "12 mins", "value": 720},
+		"steps": [
+			{"end_location": {"lat": 35.0 + i / 10, "lng": -106.5}} for i in range(3)
+		],
+	}
+	assert pruned == {
+		"routes": [
+			{"legs": [leg, leg], "overview_polyline": {"points": "_p~iF~ps|U_ulLnnqC"}}
+		],
+		"status": "OK",
+	}
+	assert pruned == json_stream.prune(response, map_requests.DIRECTIONS_FIELDS)
+
+
+def test_prune_error_and_missing_fields(parser):
+	body = json.dumps({"status": "OVER_QUERY_LIMIT", "error_message": "slow down"})
+
+	pruned = asyncio.run(
+		json_stream.parse_fields_async(
+			_ByteStream(body.encode()), map_requests.DIRECTIONS_FIELDS
+		)
+	)
+
+	assert pruned == {"status": "OVER_QUERY_LIMIT"}
+
+
+def test_prune_top_level_array():
+	document = [{"a": 1, "b": [2, 3]}, {"a": 4}, 5]
+	assert json_stream.prune(document, ["item.b"]) == [{"b": [2, 3]}, {}]
+
+
+async def _serve_and_fetch(body: bytes, fields) -> tuple[tuple, int]:
+	async def handler(request):
+		return web.Response(body=body, content_type="application/json")
+
+	app = web.Application()
+	app.router.add_get("/{tail:.*}", handler)
+	runner = web.AppRunner(app)
+	await runner.setup()
+	site = web.TCPSite(runner, "127.0.0.1", 0)
+	await site.start()
+	port = site._server.sockets[0].getsockname()[1]
+
+	client = AsyncHTTPClient()
+	try:
+		tracemalloc.start()
+		result = await client.fetch_json(f"http://127.0.0.1:{port}/directions", fields)
+		_, peak = tracemalloc.get_traced_memory()
+		return result, peak
+	finally:
+		tracemalloc.stop()
+		await client.close()
+		await runner.cleanup()
+
+
+def test_streamed_response_peak_memory_well_below_full_parse():
+	"""A long route's body is never held whole; only its pruned fields are built."""
+	if json_stream.ijson is None:
+		pytest.skip("ijson not installed")
+	response = _directions_response(n_legs=1, n_steps=4000)
+	body = json.dumps(response).encode()
+
+	(status, pruned), streamed_peak = asyncio.run(
+		_serve_and_fetch(body, map_requests.DIRECTIONS_FIELDS)
+	)
+	_, full_peak = asyncio.run(_serve_and_fetch(body, None))
+
+	assert status == 200
+	assert pruned == json_stream.prune(response, map_requests.DIRECTIONS_FIELDS)
+	assert len(pruned["routes"][0]["legs"][0]["steps"]) == 4000
+	assert streamed_peak < full_peak / 3
@@ -1,17 +1,25 @@
+import asyncio
+import functools
 import sys
 import time
 from pathlib import Path
 
+import pytest
+
 # Append the project root directory to sys.path
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 # Now the script can import modules from app as if they were on the Python path
+from app import map_requests
 from app.map_requests import get_cities_list
+from app.place_cache import SQLiteCache
+from tests.standin import fixtures
 
 
 def timing(func):
 	"""Decorator to measure execution time of a function."""
 
+	@functools.wraps(func)
 	def wrapper(*args, **kwargs):
 		start_time = time.time()
 		result = func(*args, **kwargs)
@@ -25,8 +33,8 @@ def timing(func):
 
 
 @timing
-def test_route():
-	"""Test for the route functionality."""
+def test_route(standin):
+	"""Test for the route functionality, against the stand-in upstreams."""
 	origin = "Socorro, New Mexico"
 	destination = "New York City, New York"
 
@@ -39,6 +47,177 @@ def test_route():
 			"\n".join([f"{city[0]}, {city[1]}, {city[2]}" for city in cities.values()])
 		)
 
+	names = [city[0] for city in cities.values()]
+	assert names[0] == "Socorro"
+	assert names[-1] == "New York City"
+	assert standin.hits["directions"] == 1
+
+
+def _fake_directions_response():
+	step = {"end_location": {"lat": 35.08, "lng": -106.65}}
+	leg = {
+		"distance": {"value": 1000},
+		"duration": {"value": 60},
+		"steps": [step, step],
+	}
+	return {"status": "OK", "routes": [{"legs": [leg, leg]}]}
+
+
+def test_route_fetched_once_for_price_and_path(monkeypatch):
+	"""Pricing and city extraction for one trip should share a single Directions call."""
+	urls = []
+
+	async def fake_get_json(url, fields=None):
+		urls.append(url)
+		return _fake_directions_response()
+
+	monkeypatch.setattr(map_requests.google_client, "get_json", fake_get_json)
+	map_requests.clear_route_memo()
+
+	map_requests.get_route_distance_meters(
+		"Socorro, New Mexico", "Santa Fe, New Mexico"
+	)
+	route = map_requests.get_route(" socorro ,New Mexico", "SANTA FE,  New Mexico")
+
+	assert len(urls) == 1
+	assert route.distance_meters == 2000
+	assert route.duration_seconds == 120
+	assert route.geometry == [(35.08, -106.65)] * 4
+
+
+def test_long_path_snapped_in_stitched_chunks(monkeypatch):
+	"""A 250-point path should be snapped in overlapping chunks and stitched without seams."""
+	path = "|".join(f"{i},{-i}" for i in range(250))
+	requested_paths = []
+
+	async def fake_fetch_snapped_chunk(chunk_path):
+		coords = chunk_path.split("|")
+		requested_paths.append(coords)
+		snapped = []
+		for j, coord in enumerate(coords):
+			lat, lng = map(float, coord.split(","))
+			# an interpolated point ahead of every original point
+			snapped.append({"location": {"latitude": lat - 0.5, "longitude": lng}})
+			snapped.append(
+				{
+					"location": {"latitude": lat, "longitude": lng},
+					"originalIndex": j,
+					"placeId": coord,
+				}
+			)
+		return {"snappedPoints": snapped}
+
+	monkeypatch.setattr(map_requests, "_fetch_snapped_chunk", fake_fetch_snapped_chunk)
+	points = map_requests.fetch_snapped_points(path)["snappedPoints"]
+
+	assert all(len(c) <= map_requests.ROADS_MAX_POINTS for c in requested_paths)
+	assert len(requested_paths) == 3
+	originals = [p for p in points if "originalIndex" in p]
+	assert [p["originalIndex"] for p in originals] == list(range(250))
+	assert [p["placeId"] for p in originals] == path.split("|")
+	assert len(points) == 500
+
+
+class FakePlacesClient:
+	"""Find Place puts both suburbs in one tile; Nearby Search returns two pages."""
+
+	def __init__(self):
+		self.urls = []
+
+	async def get_json(self, url):
+		self.urls.append(url)
+		if "findplacefromtext" in url:
+			lat, lng = (35.14, -106.60) if "Rio Rancho" in url else (35.10, -106.65)
+			location = {"lat": lat, "lng": lng}
+			return {
+				"status": "OK",
+				"candidates": [{"geometry": {"location": location}}],
+			}
+		if "pagetoken=page2" in url:
+			return {"status": "OK", "results": [{"name": "Old Town", "place_id": "p2"}]}
+		return {
+			"status": "OK",
+			"results": [{"name": "Sandia Peak Tramway", "place_id": "p1"}],
+			"next_page_token": "page2",
+		}
+
+
+def test_nearby_activities_shared_per_geohash_tile(monkeypatch):
+	monkeypatch.setattr(map_requests, "NEARBY_PAGE_TOKEN_DELAY", 0)
+	client = FakePlacesClient()
+	tiles = SQLiteCache(":memory:", table="activity_tile")
+	coords = SQLiteCache(":memory:", table="city_coordinates")
+
+	get_coordinates_async = map_requests.get_coordinates_async
+
+	async def get_coordinates_uncached(city, client):
+		return await get_coordinates_async(city, client, coords)
+
+	async def lookup(city):
+		return await map_requests.get_nearby_activities_async(city, client, tiles)
+
+	monkeypatch.setattr(map_requests, "get_coordinates_async", get_coordinates_uncached)
+	first = asyncio.run(lookup("Albuquerque, New Mexico"))
+	second = asyncio.run(lookup("Rio Rancho, New Mexico"))
+
+	assert first == second == [("Sandia Peak Tramway", "p1"), ("Old Town", "p2")]
+	nearby_calls = [url for url in client.urls if "nearbysearch" in url]
+	assert len(nearby_calls) == 2  # both pages of one tile, fetched once
+	assert len(client.urls) == 4
+
+
+def test_itinerary_distances_fetched_element_for_element(standin):
+	"""A multi-stop trip's legs are priced with only the elements they need, then cached."""
+	cache = SQLiteCache(":memory:", table="pair_distance")
+	stops = ["Socorro, NM", "Santa Fe, NM", "Taos, NM", "Denver, CO"]
+	legs = list(zip(stops, stops[1:])) + [("Taos, NM", "Atlantis, NM")]
+
+	async def distances(pairs):
+		return await map_requests.get_distances_meters_async(pairs, cache=cache)
+
+	first = asyncio.run(distances(legs))
+	second = asyncio.run(distances(legs + [("Socorro, NM", "Denver, CO")]))
+
+	by_name = {city[0]: city for city in fixtures.CITIES}
+	expected = [
+		fixtures.road_distance(by_name[origin[:-4]], by_name[destination[:-4]])
+		for origin, destination in legs[:-1]
+	]
+	assert first == expected + [None]
+	assert second[:-1] == first
+	assert second[-1] == fixtures.road_distance(by_name["Socorro"], by_name["Denver"])
+	# Taos' two legs share a row; the cached legs aren't fetched again
+	assert standin.hits["distancematrix"] == 4
+	assert "directions" not in standin.hits
+
+
+def _elements(tiles) -> list[tuple[str, str]]:
+	return [(o, d) for origins, ds in tiles for o in origins for d in ds]
+
+
+def test_matrix_tiles_request_only_the_pairs_within_limits():
+	one_to_many = [("origin", f"destination {i}") for i in range(60)]
+	assert [len(d) for _, d in map_requests._matrix_tiles(one_to_many)] == [25, 25, 10]
+
+	many_to_one = [(f"origin {i}", "destination") for i in range(30)]
+	tiles = map_requests._matrix_tiles(many_to_one)
+	assert [(len(o), len(d)) for o, d in tiles] == [(25, 1), (5, 1)]
+
+	many_to_many = [(f"o{i}", f"d{j}") for i in range(30) for j in range(30)]
+	tiles = map_requests._matrix_tiles(many_to_many)
+	assert all(
+		len(o) <= 25 and len(d) <= 25 and len(o) * len(d) <= 100 for o, d in tiles
+	)
+	assert sorted(_elements(tiles)) == sorted(many_to_many)
+	assert len(tiles) == 10
+
+	# unrelated pairs cost one element each, not the grid they span
+	diagonal = [(f"o{i}", f"d{i}") for i in range(30)]
+	assert sorted(_elements(map_requests._matrix_tiles(diagonal))) == sorted(diagonal)
+
+	mixed = one_to_many[:3] + many_to_one[:4] + [("origin", "destination")]
+	assert sorted(_elements(map_requests._matrix_tiles(mixed))) == sorted(mixed)
+
 
 if __name__ == "__main__":
-	test_route()
+	pytest.main([__file__, "-s", "-k", "test_route"])
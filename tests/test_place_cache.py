@@ -0,0 +1,81 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app import map_requests
+from app.place_cache import SQLiteCache
+
+
+def test_cache_hits_misses_and_ttl(tmp_path):
+	cache = SQLiteCache(str(tmp_path / "cache.db"), ttl_seconds=60, max_entries=10)
+	cache.set_many({"a": ["Albuquerque", "Bernalillo County", "New Mexico"], "b": None})
+
+	assert cache.get_many(["a", "b", "c"]) == {
+		"a": ["Albuquerque", "Bernalillo County", "New Mexico"],
+		"b": None,
+	}
+	assert cache.stats["hits"] == 2
+	assert cache.stats["misses"] == 1
+
+	# entries survive reopening the file, but expire once past the TTL
+	assert SQLiteCache(str(tmp_path / "cache.db"), ttl_seconds=60).get_many(["a"])
+	assert SQLiteCache(str(tmp_path / "cache.db"), ttl_seconds=-1).get_many(["a"]) == {}
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+	cache = SQLiteCache(str(tmp_path / "cache.db"), max_entries=3)
+	for i in range(5):
+		cache.set_many({f"id{i}": [f"City{i}", None, "Texas"]})
+
+	assert len(cache) == 3
+	assert cache.stats["evictions"] == 2
+	assert set(cache.get_many([f"id{i}" for i in range(5)])) == {"id2", "id3", "id4"}
+
+
+def test_reads_write_nothing_until_the_next_set(tmp_path):
+	cache = SQLiteCache(str(tmp_path / "cache.db"), max_entries=3)
+	cache.set_many({"id0": "Socorro", "id1": "Taos", "id2": "Santa Fe"})
+	statements = []
+	cache._conn.set_trace_callback(statements.append)
+
+	assert cache.get_many(["id0"]) == {"id0": "Socorro"}
+	assert all(statement.startswith("SELECT") for statement in statements)
+
+	# the hit still counts for the LRU order, and no full count is taken
+	cache.set_many({"id3": "Denver"})
+	assert set(cache.get_many(["id0", "id1", "id2", "id3"])) == {"id0", "id2", "id3"}
+	assert not [s for s in statements if "COUNT(*)" in s and "WHERE" not in s]
+
+
+def test_caches_sharing_a_file_keep_to_one_bound(tmp_path):
+	# e.g. two gunicorn workers' caches
+	first = SQLiteCache(str(tmp_path / "cache.db"), max_entries=4)
+	second = SQLiteCache(str(tmp_path / "cache.db"), max_entries=4)
+	for i in range(3):
+		first.set_many({f"a{i}": i})
+		second.set_many({f"b{i}": i})
+	first.set_many({"b2": 2})
+
+	assert len(first) == len(second) == 4
+	assert first.stats["evictions"] + second.stats["evictions"] == 2
+
+
+def test_build_cities_list_only_geocodes_misses(monkeypatch):
+	cache = SQLiteCache(":memory:")
+	cache.set_many({"cached": ["Flagstaff", "Coconino County", "Arizona"]})
+	geocoded = []
+
+	async def fake_get_city_from_id(placeID, client):
+		geocoded.append(placeID)
+		return placeID, [f"City-{placeID}", None, "Arizona"]
+
+	monkeypatch.setattr(map_requests, "get_city_from_id", fake_get_city_from_id)
+	cities = asyncio.run(
+		map_requests.build_cities_list(["cached", "new", "new"], cache=cache)
+	)
+
+	assert geocoded == ["new"]
+	assert list(cities) == ["cached", "new"]
+	assert cache.get_many(["new"]) == {"new": ["City-new", None, "Arizona"]}
@@ -0,0 +1,90 @@
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.models import Favoriteitem, Place
+from app.place_counters import PlaceCounters
+from database import db
+
+
+@pytest.fixture
+def places(app):
+	rows = [
+		Place(city=city, state="New Mexico", times_searched=0, times_favorited=0)
+		for city in ("Taos", "Socorro")
+	]
+	db.session.add_all(rows)
+	db.session.commit()
+	return rows
+
+
+@pytest.fixture
+def statements(app):
+	executed = []
+
+	def record(conn, cursor, statement, parameters, context, executemany):
+		executed.append((statement, executemany))
+
+	event.listen(db.engine, "before_cursor_execute", record)
+	yield executed
+	event.remove(db.engine, "before_cursor_execute", record)
+
+
+def test_increments_are_atomic_sql(app, places, statements):
+	place_id = places[0].id
+	counters = PlaceCounters(app)
+	statements.clear()
+
+	# each count is added to by the database, never written back from a loaded Place
+	counters.add(place_id, "times_searched")
+	db.session.commit()
+	counters.add(place_id, "times_searched")
+	db.session.commit()
+
+	(update, _), _ = [s for s in statements if s[0].startswith("UPDATE")]
+	assert "times_searched=(place.times_searched + ?)" in update
+	assert db.session.get(Place, place_id).times_searched == 2
+
+	with pytest.raises(ValueError):
+		counters.add(place_id, "population")
+
+
+def test_write_behind_flushes_increments_in_one_batch(app, places, statements):
+	taos, socorro = places
+	taos_id, socorro_id = taos.id, socorro.id
+	counters = PlaceCounters(app, write_behind=True)
+	statements.clear()
+
+	for _ in range(50):
+		counters.add(taos_id, "times_searched")
+		counters.add(socorro_id, "times_favorited")
+	counters.add(socorro_id, "times_favorited", -1)
+	assert not statements
+
+	assert counters.flush() == 2
+	assert counters.flush() == 0
+
+	updates = [s for s in statements if s[0].startswith("UPDATE")]
+	assert updates == [(updates[0][0], True)]  # one executemany for both Places
+	db.session.expire_all()
+	assert (taos.times_searched, taos.times_favorited) == (50, 0)
+	assert (socorro.times_searched, socorro.times_favorited) == (0, 49)
+
+
+def test_favoriting_and_unfavoriting_keep_the_count(user_client, places):
+	client, user = user_client
+	taos, _ = places
+
+	client.get(f"/add_favorite_item/{user.id}/{taos.id}/{user.favoritelist_id}")
+	client.get(f"/add_favorite_item/{user.id}/{taos.id}/{user.favoritelist_id}")
+	db.session.expire_all()
+	assert taos.times_favorited == 1
+
+	item = Favoriteitem.query.one()
+	client.get(f"/remove_item/{user.id}/{item.id}/favorite")
+	db.session.expire_all()
+	assert taos.times_favorited == 0 and Favoriteitem.query.count() == 0
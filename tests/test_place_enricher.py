@@ -0,0 +1,98 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app import place_enricher
+from app.models import Place
+from app.routing_helper_functions import (
+	create_places_from_scraped_place_dict,
+	place_generator,
+)
+from database import db
+
+ROUTE = {
+	"id-socorro": ["Socorro", "Socorro County", "NM"],
+	"id-taos": ["Taos", "Taos County", "New Mexico"],
+}
+
+
+def test_lazy_route_places_are_stubs_until_enriched(app, standin):
+	hits = dict(standin.hits)
+	places = create_places_from_scraped_place_dict(ROUTE, lazy=True)
+
+	# the Places exist at once, with nothing scraped upstream
+	assert standin.hits == hits
+	assert [str(place) for place in places] == [
+		"Socorro, New Mexico",
+		"Taos, New Mexico",
+	]
+	assert all(place.enrichment_status == "pending" for place in places)
+	assert places[0].county == "Socorro County" and places[0].wiki is None
+	assert places[0].created_at is not None and places[0].enriched_at is None
+
+	enricher = app.extensions["place_enricher"]
+	assert enricher.enrich_once() == 2
+	assert enricher.enrich_once() == 0
+
+	for place in places:
+		db.session.refresh(place)
+		assert place.enrichment_status == "ready" and place.enriched_at is not None
+	assert "Museum" in places[0].activities and "History" in places[0].wiki
+	# a second pass finds the enriched Places and creates nothing
+	assert create_places_from_scraped_place_dict(ROUTE, lazy=True) == places
+
+
+def test_stub_that_cannot_be_scraped_is_retried_then_marked_failed(
+	app, standin, monkeypatch
+):
+	enrich_place = place_enricher.enrich_place
+	outages = iter([True, False, True, True])
+
+	def flaky_enrich_place(city, county, state, activities):
+		if next(outages):
+			raise RuntimeError("wikipedia is down")
+		return enrich_place(city, county, state, activities)
+
+	def retry_now(place):
+		place.enrichment_retry_at = datetime.utcnow() - timedelta(seconds=1)
+		db.session.commit()
+
+	monkeypatch.setattr(place_enricher, "enrich_place", flaky_enrich_place)
+	enricher = place_enricher.PlaceEnricher(app, retry_seconds=3600, max_attempts=2)
+	taos = place_generator("Taos", "", "NM", lazy=True)
+
+	# a failed scrape leaves the stub pending, backing off before the next try
+	assert enricher.enrich_once() == 1
+	db.session.refresh(taos)
+	assert taos.enrichment_status == "pending" and taos.enrichment_attempts == 1
+	assert taos.enrichment_retry_at > datetime.utcnow()
+	assert enricher.enrich_once() == 0
+
+	retry_now(taos)
+	assert enricher.enrich_once() == 1
+	db.session.refresh(taos)
+	assert taos.enrichment_status == "ready" and "History" in taos.wiki
+
+	# a stub that keeps failing is given up on after max_attempts
+	socorro = place_generator("Socorro", "", "NM", lazy=True)
+	assert enricher.enrich_once() == 1
+	retry_now(socorro)
+	assert enricher.enrich_once() == 1
+	db.session.refresh(socorro)
+	assert socorro.enrichment_status == "failed" and socorro.wiki is None
+	assert socorro.enrichment_attempts == 2
+
+
+def test_place_page_renders_a_pending_stub(user_client, standin):
+	client, _ = user_client
+	place = place_generator("Taos", "Taos County", "NM", lazy=True)
+	hits = dict(standin.hits)
+
+	response = client.get(f"/place_info/{place.id}")
+
+	assert response.status_code == 200
+	assert b"still being gathered" in response.data
+	assert standin.hits == hits
+	assert Place.query.count() == 1
@@ -0,0 +1,98 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.rate_governor import RateGovernor, TokenBucket, is_retryable_response
+
+
+def test_token_bucket_allows_a_burst_then_spaces_calls_out():
+	bucket = TokenBucket(rate=10, capacity=2)
+
+	delays = [bucket.reserve() for _ in range(4)]
+
+	assert delays[:2] == [0.0, 0.0]
+	assert 0.05 < delays[2] <= 0.1
+	assert 0.15 < delays[3] <= 0.2
+
+
+def test_endpoint_for_matches_the_url_path():
+	governor = RateGovernor(limits={"directions": 10, "geocode": 50})
+
+	assert (
+		governor.endpoint_for("https://maps.googleapis.com/maps/api/geocode/json?x=1")
+		== "geocode"
+	)
+	assert governor.endpoint_for("https://en.wikipedia.org/wiki/Taos") is None
+	# a place name in the query string doesn't pick the quota
+	assert (
+		governor.endpoint_for(
+			"https://maps.googleapis.com/maps/api/geocode/json?address=directions+rd"
+		)
+		== "geocode"
+	)
+
+
+def test_retries_over_query_limit_then_returns_the_success():
+	governor = RateGovernor(limits={}, max_retries=3, backoff_base=0.001)
+	responses = iter(
+		[(200, {"status": "OVER_QUERY_LIMIT"}), (503, {}), (200, {"status": "OK"})]
+	)
+
+	result = governor.call(
+		None, lambda: next(responses), lambda r: is_retryable_response(*r)
+	)
+
+	assert result == (200, {"status": "OK"})
+	assert governor.stats["retried"] == 2
+	assert governor.stats["gave_up"] == 0
+
+
+def test_gives_up_after_max_retries():
+	governor = RateGovernor(limits={}, max_retries=2, backoff_base=0.001)
+	sent = []
+
+	def send():
+		sent.append(1)
+		return 429
+
+	assert governor.call(None, send, is_retryable_response) == 429
+	assert len(sent) == 3
+	assert governor.stats["gave_up"] == 1
+
+
+def test_non_retryable_errors_are_returned_immediately():
+	governor = RateGovernor(limits={}, backoff_base=0.001)
+
+	result = governor.call(
+		None,
+		lambda: (200, {"status": "ZERO_RESULTS"}),
+		lambda r: is_retryable_response(*r),
+	)
+
+	assert result == (200, {"status": "ZERO_RESULTS"})
+	assert governor.stats["retried"] == 0
+
+
+def test_async_calls_share_the_endpoint_quota():
+	governor = RateGovernor(limits={"directions": 20}, backoff_base=0.001)
+	governor._buckets["directions"] = TokenBucket(rate=20, capacity=1)
+
+	async def send():
+		return 200
+
+	async def burst():
+		return await asyncio.gather(
+			*(
+				governor.call_async("directions", send, is_retryable_response)
+				for _ in range(5)
+			)
+		)
+
+	start = time.monotonic()
+	assert asyncio.run(burst()) == [200] * 5
+	# one token up front, then four more at 20 per second
+	assert time.monotonic() - start >= 0.18
+	assert governor.stats["throttled"] == 4
@@ -0,0 +1,75 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app import route_geometry
+from app.map_requests import filter_distant_points, get_point_distance
+
+# ~1 km steps heading due north from Socorro, NM
+ONE_KM_STEPS = [(34.0 + i / 111.2, -106.9) for i in range(101)]
+
+
+@pytest.fixture(params=["numpy", "pure-python"])
+def kernel(request, monkeypatch):
+	if request.param == "pure-python":
+		monkeypatch.setattr(route_geometry, "np", None)
+	elif route_geometry.np is None:
+		pytest.skip("numpy not installed")
+
+
+def test_haversine_matches_geodesic(kernel):
+	anchor = (35.08, -106.65)
+	coords = [(35.69, -105.94), (40.71, -74.01), (34.05, -118.24)]
+
+	distances = route_geometry.haversine_km(anchor, coords)
+	for coord, distance in zip(coords, distances):
+		assert distance == pytest.approx(get_point_distance(anchor, coord), rel=0.005)
+
+
+@pytest.mark.parametrize("exact", [False, True])
+def test_anchor_filter_measures_from_last_kept_point(kernel, exact):
+	"""A run of 1 km steps must still keep a point roughly every 5 km."""
+	kept = route_geometry.anchor_filter(ONE_KM_STEPS, min_km=5.0, exact=exact)
+
+	assert kept == list(range(0, 101, 6))
+
+
+def test_filter_distant_points_returns_place_ids(kernel):
+	points = [
+		{"location": {"latitude": lat, "longitude": lng}, "placeId": f"id{i}"}
+		for i, (lat, lng) in enumerate(ONE_KM_STEPS)
+	]
+
+	assert filter_distant_points(points)[:3] == ["id0", "id6", "id12"]
+	assert filter_distant_points([]) == []
+
+
+def test_decode_polyline():
+	# example from Google's encoded polyline algorithm documentation
+	coords = route_geometry.decode_polyline("_p~iF~ps|U_ulLnnqC_mqNvxq`@")
+
+	assert coords == [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+
+
+def test_encode_polyline_round_trips():
+	coords = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+
+	assert route_geometry.encode_polyline(coords) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+	assert (
+		route_geometry.decode_polyline(route_geometry.encode_polyline(coords)) == coords
+	)
+
+
+def test_resample_spaces_points_evenly(kernel):
+	# a dense city stretch followed by one long 100 km highway segment
+	coords = ONE_KM_STEPS[:11] + [(34.0 + 110 / 111.2, -106.9)]
+	resampled = route_geometry.resample(coords, spacing_km=5.0)
+	spacing = route_geometry.segment_lengths_km(resampled)
+
+	assert resampled[0] == coords[0]
+	assert resampled[-1] == pytest.approx(coords[-1])
+	assert len(resampled) == 23
+	assert all(d == pytest.approx(5.0, rel=1e-3) for d in spacing[:-1])
@@ -0,0 +1,59 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app import map_requests, route_table
+from app.models import Popularroute
+from app.route_geometry import decode_polyline
+from database import db
+
+ORIGIN = "Albuquerque, New Mexico"
+DESTINATION = "Amarillo, Texas"
+
+
+def test_fresh_entry_served_without_replanning(app, standin):
+	first = route_table.plan_route(ORIGIN, DESTINATION)
+	map_requests.clear_route_memo()
+	second = route_table.plan_route(" albuquerque,  New Mexico", "AMARILLO, Texas")
+
+	assert second.id == first.id
+	assert second.times_requested == 2
+	assert standin.hits["directions"] == 1
+	cities = [city[0] for city in route_table.route_cities(second).values()]
+	assert cities[0] == "Albuquerque" and cities[-1] == "Amarillo"
+	assert decode_polyline(second.geometry)[0] == (35.0844, -106.6504)
+
+
+def test_stale_entry_is_replanned(app, standin):
+	row = route_table.plan_route(ORIGIN, DESTINATION)
+	row.refreshed_at = datetime.utcnow() - timedelta(days=30)
+	db.session.commit()
+	map_requests.clear_route_memo()
+
+	route_table.plan_route(ORIGIN, DESTINATION)
+
+	assert standin.hits["directions"] == 2
+
+
+def test_warmer_refreshes_only_the_most_requested_stale_routes(app, standin):
+	for _ in range(3):
+		route_table.plan_route(ORIGIN, DESTINATION)
+	for _ in range(2):
+		route_table.plan_route("Taos, New Mexico", "Denver, Colorado")
+	route_table.record_request("Tulsa, Oklahoma", "Wichita, Kansas")
+	for row in Popularroute.query.all():
+		row.refreshed_at = None
+	db.session.commit()
+
+	warmer = route_table.RouteWarmer(app, top_n=2)
+	assert warmer.warm_once() == 2
+	assert warmer.warm_once() == 0
+
+	rows = {row.origin_key: row for row in Popularroute.query.all()}
+	assert rows["albuquerque, new mexico"].refreshed_at is not None
+	assert rows["taos, new mexico"].refreshed_at is not None
+	assert rows["tulsa, oklahoma"].refreshed_at is None
+	# the warmer bypasses the route memo, so Directions is asked again
+	assert standin.hits["directions"] == 4
@@ -0,0 +1,212 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app import routing_helper_functions
+from app.models import Favoriteitem, Place, Searchitem, Travel, Travelplaceitem
+from app.routing_helper_functions import (
+	create_places_from_scraped_place_dict,
+	delete_place,
+	resolve_places,
+)
+from database import db
+
+
+def _place(city: str, state: str) -> Place:
+	return Place(
+		city=city,
+		state=state,
+		population=1,
+		activities="",
+		wiki="{}",
+		times_favorited=0,
+		times_searched=0,
+	)
+
+
+def test_route_places_enriched_in_parallel_and_inserted_together(
+	app, standin, monkeypatch
+):
+	albuquerque = _place("Albuquerque", "New Mexico")
+	db.session.add(albuquerque)
+	db.session.commit()
+
+	enrich_place = routing_helper_functions.enrich_place
+	threads, searched_first = set(), []
+
+	def recording_enrich_place(city, county, state, activities):
+		threads.add(threading.current_thread().name)
+		searched_first.append(activities is not None)
+		return enrich_place(city, county, state, activities)
+
+	monkeypatch.setattr(
+		routing_helper_functions, "enrich_place", recording_enrich_place
+	)
+	commits = []
+	monkeypatch.setattr(
+		db.session, "commit", lambda: commits.append(db.session.flush())
+	)
+
+	route = {
+		"id-socorro": ["Socorro", "Socorro County", "New Mexico"],
+		"id-albuquerque": ["Albuquerque", "Bernalillo County", "New Mexico"],
+		"id-santa-fe": ["Santa Fe", "Santa Fe County", "New Mexico"],
+		"id-taos": ["Taos", "Taos County", "NM"],
+	}
+	places = create_places_from_scraped_place_dict(route)
+
+	assert [str(place) for place in places] == [
+		"Socorro, New Mexico",
+		"Albuquerque, New Mexico",
+		"Santa Fe, New Mexico",
+		"Taos, New Mexico",
+	]
+	assert places[1] is albuquerque
+	assert all(name.startswith("place-enrich") for name in threads)
+	# the new Places' activities were looked up together, ahead of the pool
+	assert searched_first == [True, True, True]
+	assert len(commits) == 1
+	assert Place.query.count() == 4
+	assert "Museum" in places[0].activities and "History" in places[0].wiki
+
+	# a second pass finds every Place in the db and scrapes nothing
+	threads.clear()
+	assert create_places_from_scraped_place_dict(route) == places
+	assert not threads
+
+
+def test_resolving_a_route_costs_the_same_queries_for_any_length(app, standin):
+	db.session.add_all(_place(f"City {i}", "Kansas") for i in range(1000))
+	db.session.commit()
+
+	statements = []
+
+	def count(conn, cursor, statement, *args):
+		statements.append(statement)
+
+	event.listen(db.engine, "before_cursor_execute", count)
+	try:
+		found, missing = resolve_places(
+			[(f"City {i}", "KS") for i in range(0, 2000, 2)]
+		)
+	finally:
+		event.remove(db.engine, "before_cursor_execute", count)
+
+	assert len(found) == 500 and found[("City 0", "Kansas")].city == "City 0"
+	assert missing == [(f"City {i}", "Kansas") for i in range(1000, 2000, 2)]
+	assert len(statements) == 3  # 1000 pairs, RESOLVE_BATCH_SIZE at a time
+
+
+def test_places_are_unique_per_city_and_state(app):
+	db.session.add_all([_place("Taos", "New Mexico"), _place("Taos", "New Mexico")])
+	with pytest.raises(IntegrityError):
+		db.session.commit()
+
+
+def test_places_created_concurrently_are_not_inserted_again(app, monkeypatch):
+	route = {
+		"id-socorro": ["Socorro", "Socorro County", "NM"],
+		"id-santa-fe": ["Santa Fe", "Santa Fe County", "NM"],
+		"id-taos": ["Taos", "Taos County", "NM"],
+	}
+	stub_place = routing_helper_functions.stub_place
+	raced = []
+
+	def racing_stub_place(city, county, state):
+		row = stub_place(city, county, state)
+		# another request inserts the Places between the lookup and this insert
+		#   (all but Taos, the first time)
+		if city == "Taos" and not raced:
+			raced.append(city)
+		else:
+			db.session.add(_place(city, row["state"]))
+			db.session.commit()
+		return row
+
+	monkeypatch.setattr(routing_helper_functions, "stub_place", racing_stub_place)
+	places = create_places_from_scraped_place_dict(route, lazy=True)
+
+	assert [str(place) for place in places] == [
+		"Socorro, New Mexico",
+		"Santa Fe, New Mexico",
+		"Taos, New Mexico",
+	]
+	assert Place.query.count() == 3
+	assert Place.query.filter(Place.city.is_(None)).count() == 0
+
+	# every one of them created elsewhere: nothing is left to insert
+	db.session.execute(Place.__table__.delete())
+	db.session.commit()
+	raced.append("all")
+	create_places_from_scraped_place_dict(route, lazy=True)
+	assert Place.query.count() == 3
+	assert Place.query.filter(Place.city.is_(None)).count() == 0
+
+
+def _add_items(place: Place, n: int):
+	travel = Travel(origin_place_id=place.id, destination_place_id=place.id, price=10)
+	db.session.add(travel)
+	db.session.flush()
+	db.session.add_all(
+		item
+		for _ in range(n)
+		for item in (
+			Favoriteitem(place_id=place.id),
+			Searchitem(place_id=place.id),
+			Travelplaceitem(place_id=place.id, travel_id=travel.id),
+		)
+	)
+
+
+def test_removing_a_place_removes_its_items_in_one_transaction(user_client):
+	client, _ = user_client
+	taos, socorro = _place("Taos", "New Mexico"), _place("Socorro", "New Mexico")
+	db.session.add_all([taos, socorro])
+	db.session.flush()
+	_add_items(taos, 3)
+	_add_items(socorro, 200)
+	db.session.commit()
+	taos_id = taos.id
+
+	statements = []
+
+	def count(conn, cursor, statement, *args):
+		statements.append(statement)
+
+	event.listen(db.engine, "before_cursor_execute", count)
+	try:
+		response = client.get(f"/remove_place/{taos_id}")
+	finally:
+		event.remove(db.engine, "before_cursor_execute", count)
+
+	assert response.status_code == 302
+	# a DELETE per item table, the Travel endpoints, the Place: nothing per item
+	assert sum(s.startswith(("DELETE", "UPDATE")) for s in statements) == 6
+	assert db.session.get(Place, taos_id) is None
+	for item in (Favoriteitem, Searchitem, Travelplaceitem):
+		assert item.query.filter_by(place_id=taos_id).count() == 0
+		assert item.query.filter_by(place_id=socorro.id).count() == 200
+	assert Travel.query.filter_by(origin_place_id=None).count() == 1
+	assert not delete_place(taos_id)
+
+
+def test_item_foreign_keys_cascade_from_their_place(app):
+	taos = _place("Taos", "New Mexico")
+	db.session.add(taos)
+	db.session.flush()
+	_add_items(taos, 2)
+	db.session.commit()
+
+	# a Place deleted without delete_place still takes its items with it
+	db.session.execute(Place.__table__.delete())
+	db.session.commit()
+
+	assert Favoriteitem.query.count() == Searchitem.query.count() == 0
+	assert Travelplaceitem.query.count() == 0
+	assert Travel.query.one().origin_place_id is None
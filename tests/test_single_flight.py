@@ -0,0 +1,153 @@
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app import map_requests
+from app.single_flight import SingleFlight
+
+
+def test_threads_share_one_call():
+	flights = SingleFlight()
+	calls = []
+	release = threading.Event()
+
+	def fetch():
+		calls.append(1)
+		release.wait(5)
+		return "Taos"
+
+	with ThreadPoolExecutor(max_workers=8) as pool:
+		futures = [pool.submit(flights.do, "taos", fetch) for _ in range(8)]
+		while flights.saved_calls < 7:
+			time.sleep(0.001)
+		release.set()
+		results = [f.result() for f in futures]
+
+	assert results == ["Taos"] * 8
+	assert len(calls) == 1
+	assert flights.stats == {"calls": 1, "shared": 7}
+
+
+def test_tasks_share_one_call_and_its_exception():
+	flights = SingleFlight()
+	calls = []
+
+	async def fetch():
+		calls.append(1)
+		await asyncio.sleep(0.01)
+		raise ValueError("upstream down")
+
+	async def many():
+		return await asyncio.gather(
+			*(flights.do_async("taos", fetch) for _ in range(5)),
+			return_exceptions=True,
+		)
+
+	results = asyncio.run(many())
+
+	assert len(calls) == 1
+	assert all(isinstance(r, ValueError) for r in results)
+	assert flights.saved_calls == 4
+
+
+def test_cancelled_leader_leaves_the_call_to_its_followers():
+	flights = SingleFlight()
+	calls = []
+
+	async def fetch():
+		calls.append(1)
+		await asyncio.sleep(0.02)
+		return "Taos"
+
+	async def lead_then_give_up():
+		leader = asyncio.create_task(flights.do_async("taos", fetch))
+		await asyncio.sleep(0)
+		follower = asyncio.create_task(flights.do_async("taos", fetch))
+		await asyncio.sleep(0)
+		leader.cancel()
+		return await asyncio.gather(leader, follower, return_exceptions=True)
+
+	leader, follower = asyncio.run(lead_then_give_up())
+
+	assert isinstance(leader, asyncio.CancelledError)
+	assert follower == "Taos" and len(calls) == 1
+	assert flights.do("taos", lambda: "landed") == "landed"
+
+
+def test_coroutine_joins_a_flight_led_by_a_thread():
+	flights = SingleFlight()
+	started, release = threading.Event(), threading.Event()
+
+	def fetch():
+		started.set()
+		release.wait(5)
+		return 42
+
+	async def follow():
+		return await flights.do_async("answer", lambda: pytest.fail("not shared"))
+
+	leader = threading.Thread(target=flights.do, args=("answer", fetch))
+	leader.start()
+	started.wait(5)
+	threading.Timer(0.02, release.set).start()
+
+	assert asyncio.run(follow()) == 42
+	leader.join()
+
+
+def test_finished_flights_are_not_cached():
+	flights = SingleFlight()
+
+	assert flights.do("k", lambda: 1) == 1
+	assert flights.do("k", lambda: 2) == 2
+	assert flights.saved_calls == 0
+
+
+class CountingGeocodeClient:
+	def __init__(self):
+		self.urls = []
+
+	async def get_json(self, url):
+		self.urls.append(url)
+		await asyncio.sleep(0.01)
+		return {
+			"status": "OK",
+			"results": [
+				{
+					"address_components": [
+						{"long_name": "Taos", "types": ["locality"]},
+						{
+							"long_name": "Taos County",
+							"types": ["administrative_area_level_2"],
+						},
+						{
+							"long_name": "New Mexico",
+							"types": ["administrative_area_level_1"],
+						},
+					]
+				}
+			],
+		}
+
+
+def test_concurrent_geocodes_of_one_place_id_hit_google_once():
+	flights = SingleFlight()
+	client = CountingGeocodeClient()
+
+	async def many():
+		return await asyncio.gather(
+			*(map_requests.get_city_from_id("pid", client, flights) for _ in range(4))
+		)
+
+	results = asyncio.run(many())
+
+	assert len(client.urls) == 1
+	assert len(set(map(str, results))) == 1
+	assert flights.saved_calls == 3
@@ -0,0 +1,99 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import requests
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app import map_requests
+from app.http_client import AsyncHTTPClient
+from app.rate_governor import RateGovernor
+from app.scraping_functions.gas import Gas
+from app.scraping_functions.wiki_places import create_place_with_wiki
+from tests.standin import fixtures
+from tests.standin.server import StandinOptions, StandinServer
+
+
+def test_directions_route_runs_between_the_two_cities(standin):
+	route = map_requests.get_route("Albuquerque, New Mexico", "Amarillo, Texas")
+
+	assert route.geometry[0] == (35.0844, -106.6504)
+	assert route.geometry[-1] == (35.222, -101.8313)
+	assert 500_000 < route.distance_meters < 600_000
+
+
+def test_unknown_places_have_no_route(standin):
+	status = requests.get(
+		f"{standin.base_url}/maps/api/directions/json",
+		params={"origin": "Nowhere, Nevada", "destination": "Taos, New Mexico"},
+	).json()["status"]
+
+	assert status == "ZERO_RESULTS"
+
+
+def test_nearby_search_follows_pages(standin, monkeypatch):
+	monkeypatch.setattr(map_requests, "NEARBY_PAGE_TOKEN_DELAY", 0)
+	standin.options.nearby_pages = 2
+	client = AsyncHTTPClient()
+
+	async def lookup():
+		try:
+			tile = map_requests.geohash_encode(36.4072, -105.5731, 4)
+			return await map_requests._nearby_search_tile(tile, client)
+		finally:
+			await client.close()
+
+	activities = asyncio.run(lookup())
+
+	assert len(activities) == 8
+	assert activities[0][0] == "Taos Museum"
+	assert standin.hits["nearbysearch"] == 2
+
+
+def test_gas_prices_and_wikipedia_are_served(standin):
+	gas = Gas()
+	wiki = create_place_with_wiki("Taos", "Taos County", "New Mexico", "")
+
+	assert 3.0 <= float(gas.getPrice("new mexico")) < 4.5
+	assert set(wiki) == set(fixtures.WIKI_SECTIONS)
+	assert wiki["History"]["Overview"] == "The history of Taos in brief."
+
+
+def test_injected_errors_are_retried_by_the_governor():
+	options = StandinOptions(error_rate=0.3, quota_error_rate=0.3, seed=7)
+	governor = RateGovernor(limits={}, max_retries=10, backoff_base=0.001)
+	client = AsyncHTTPClient(governor=governor)
+
+	async def geocode_all(base_url):
+		try:
+			return await asyncio.gather(
+				*(
+					client.get_json(
+						f"{base_url}/maps/api/geocode/json?latlng=35.0,-106.6&n={i}"
+					)
+					for i in range(20)
+				)
+			)
+		finally:
+			await client.close()
+
+	with StandinServer(options) as server:
+		responses = asyncio.run(geocode_all(server.base_url))
+
+	assert all(response["status"] == "OK" for response in responses)
+	assert governor.stats["retried"] > 0
+	assert server.hits["geocode"] == 20 + governor.stats["retried"]
+
+
+def test_latency_is_injected_per_endpoint():
+	options = StandinOptions(endpoint_latency_ms={"gasbuddy": 50})
+
+	with StandinServer(options) as server:
+		elapsed = requests.get(f"{server.base_url}/usa").elapsed.total_seconds()
+		fast = requests.get(
+			f"{server.base_url}/maps/api/place/details/json?place_id=x"
+		).elapsed.total_seconds()
+
+	assert elapsed >= 0.05
+	assert fast < 0.05
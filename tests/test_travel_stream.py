@@ -0,0 +1,179 @@
+import json
+import sys
+import threading
+from functools import partial
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app import trip_jobs
+from app.models import Favoritelist, Searchlist, Travel, Travellist, Tripjob, User
+from database import db
+
+
+def _events(response) -> list[tuple[str, dict, str]]:
+	"""(event, data, id) for each message of a stream response, skipping retry hints"""
+	events = []
+	for message in response.get_data(as_text=True).strip().split("\n\n"):
+		fields = dict(line.split(": ", 1) for line in message.split("\n"))
+		if "event" in fields:
+			events.append(
+				(fields["event"], json.loads(fields["data"]), fields.get("id"))
+			)
+	return events
+
+
+def _queue_trip(client, user, origin: str, destination: str, csrf: bool = False):
+	client.application.config["WTF_CSRF_ENABLED"] = csrf
+	return client.post(
+		f"/profile/{user.id}",
+		data={"origin_city_state": origin, "destination_city_state": destination},
+		headers={"Accept": "application/json"},
+	)
+
+
+def _stream(client, stream_url: str, last_event_id=None):
+	# requests share the test's session, which still holds what it read before the
+	# trip worker (in its own app context) committed
+	db.session.expire_all()
+	headers = {} if last_event_id is None else {"Last-Event-ID": last_event_id}
+	return client.get(stream_url, headers=headers)
+
+
+def test_trip_is_queued_by_the_form_then_streamed_as_its_job_runs(
+	app, user_client, standin
+):
+	client, user = user_client
+	hits = dict(standin.hits)
+
+	response = _queue_trip(client, user, "Socorro, NM", "Taos, NM")
+
+	# the post only queues the trip; a trip worker plans it
+	assert response.status_code == 202
+	assert standin.hits == hits
+	(travel,) = Travel.query.all()
+	assert response.json["travel_id"] == travel.id
+	stream_url = response.json["stream_url"]
+
+	# nothing is stored yet, and reading the stream queues nothing more
+	queued = _stream(client, stream_url)
+	assert queued.mimetype == "text/event-stream"
+	assert queued.get_data(as_text=True).startswith("retry: ")
+	assert _events(queued) == []
+	assert _events(_stream(client, stream_url)) == []
+	assert Tripjob.query.count() == 1
+
+	assert app.extensions["trip_jobs"].work_once()
+
+	events = _events(_stream(client, stream_url))
+	kinds = [kind for kind, _, _ in events]
+	assert kinds[0] == "route" and kinds[-1] == "done"
+	assert set(kinds[1:-1]) == {"city"}
+
+	route = events[0][1]
+	assert route["distance_miles"] > 100 and route["price"] > 0
+	cities = [data["name"] for kind, data, _ in events if kind == "city"]
+	assert cities[0].startswith("Socorro") and cities[-1].startswith("Taos")
+	assert events[-1][1]["travel_id"] == travel.id
+
+	db.session.refresh(travel)
+	assert float(travel.price) == route["price"]
+	assert travel.route_places.count() == len(cities)
+
+	# a reconnect resumes after the last event it saw
+	resumed = _events(_stream(client, stream_url, last_event_id=events[-2][2]))
+	assert [kind for kind, _, _ in resumed] == ["done"]
+
+
+def test_cities_stream_in_before_the_job_finishes(
+	app, user_client, standin, monkeypatch
+):
+	client, user = user_client
+	stream_url = _queue_trip(client, user, "Socorro, NM", "Taos, NM").json["stream_url"]
+	monkeypatch.setattr(
+		trip_jobs, "plan_trip", partial(trip_jobs.plan_trip, batch_size=1)
+	)
+
+	mid_job = []
+	make_places = trip_jobs.create_places_from_scraped_place_dict
+
+	def read_stream_then_make_places(cities):
+		if len(mid_job) == 1:
+			# the first batch is committed; read the stream as another request would,
+			#   outside the worker's app context
+			reader = threading.Thread(
+				target=lambda: mid_job.append(_events(client.get(stream_url)))
+			)
+			reader.start()
+			reader.join()
+		mid_job.append(None)
+		return make_places(cities)
+
+	monkeypatch.setattr(
+		trip_jobs, "create_places_from_scraped_place_dict", read_stream_then_make_places
+	)
+	assert app.extensions["trip_jobs"].work_once()
+
+	early = mid_job[1]
+	assert [kind for kind, _, _ in early] == ["route", "city"]
+	assert early[1][1]["name"].startswith("Socorro")
+
+	# resuming after the early city gets the rest of the route, then done
+	rest = _events(_stream(client, stream_url, last_event_id=early[-1][2]))
+	kinds = [kind for kind, _, _ in rest]
+	assert kinds[-1] == "done" and set(kinds[:-1]) == {"city"}
+	assert len(kinds) - 1 == len(mid_job) - 2 > 0
+	assert rest[-2][1]["name"].startswith("Taos")
+
+
+def test_trip_stream_reports_unroutable_trips(app, user_client, standin):
+	client, user = user_client
+
+	stream_url = _queue_trip(client, user, "Socorro, NM", "Atlantis, NM").json[
+		"stream_url"
+	]
+	app.extensions["trip_jobs"].work_once()
+
+	events = _events(_stream(client, stream_url))
+	assert [kind for kind, _, _ in events] == ["failed"]
+	assert "ZERO_RESULTS" in events[0][1]["message"]
+	assert Travel.query.one().status == "failed"
+
+
+def test_travel_form_is_validated_before_a_trip_is_queued(user_client):
+	client, user = user_client
+
+	missing_origin = _queue_trip(client, user, "", "Taos, NM")
+	no_csrf_token = _queue_trip(client, user, "Socorro, NM", "Taos, NM", csrf=True)
+
+	assert missing_origin.status_code == 400
+	assert "origin_city_state" in missing_origin.json["errors"]
+	assert no_csrf_token.status_code == 400
+	assert "csrf_token" in no_csrf_token.json["errors"]
+	assert Travel.query.count() == 0
+
+
+def test_trip_stream_is_only_for_its_owner(app, user_client, standin):
+	client, user = user_client
+	stream_url = _queue_trip(client, user, "Socorro, NM", "Taos, NM").json["stream_url"]
+
+	lists = Favoritelist(), Searchlist(), Travellist()
+	db.session.add_all(lists)
+	db.session.flush()
+	other = User(
+		username="stranger",
+		email="stranger@example.com",
+		budget=500,
+		favoritelist_id=lists[0].id,
+		searchlist_id=lists[1].id,
+		travellist_id=lists[2].id,
+	)
+	db.session.add(other)
+	db.session.commit()
+	with client.session_transaction() as session:
+		session["_user_id"] = str(other.id)
+		session["current_session_user"] = other.id
+
+	# the app's not-found page, not the trip's events
+	response = client.get(stream_url)
+	assert response.mimetype == "text/html" and b"event:" not in response.data
@@ -0,0 +1,97 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.models import Travel, Tripjob
+from app.route_table import find_route
+from database import db
+
+
+def _submit_trip(client, user, origin: str, destination: str):
+	client.application.config["WTF_CSRF_ENABLED"] = False
+	return client.post(
+		f"/profile/{user.id}",
+		data={"origin_city_state": origin, "destination_city_state": destination},
+	)
+
+
+def test_travel_form_queues_a_pending_trip_for_the_workers(app, user_client, standin):
+	client, user = user_client
+	hits = dict(standin.hits)
+
+	response = _submit_trip(client, user, "Socorro, NM", "Taos, NM")
+
+	assert response.status_code == 200
+	# nothing upstream is called while the request is served
+	assert standin.hits == hits
+	(travel,) = Travel.query.all()
+	assert travel.status == "pending" and travel.job.status == "queued"
+	status = client.get(f"/travel_status/{user.id}/{travel.id}").get_json()
+	assert status == {"status": "pending"}
+
+	assert app.extensions["trip_jobs"].work_once()
+	assert not app.extensions["trip_jobs"].work_once()
+
+	db.session.refresh(travel)
+	assert travel.status == "ready" and travel.job.status == "done"
+	assert travel.price > 0 and travel.route_places.count() >= 2
+	assert str(travel) == "Socorro, New Mexico   --->   Taos, New Mexico"
+	status = client.get(f"/travel_status/{user.id}/{travel.id}").get_json()
+	assert status == {
+		"status": "ready",
+		"url": f"/travel_profile/{user.id}/{travel.id}",
+	}
+
+
+def test_unroutable_trip_fails_with_its_reason(app, user_client, standin):
+	client, user = user_client
+	_submit_trip(client, user, "Socorro, NM", "Atlantis, NM")
+	(travel,) = Travel.query.all()
+
+	app.extensions["trip_jobs"].work_once()
+
+	db.session.refresh(travel)
+	assert travel.status == "failed" and travel.job.attempts == 1
+	status = client.get(f"/travel_status/{user.id}/{travel.id}").get_json()
+	assert status["status"] == "failed" and "ZERO_RESULTS" in status["error"]
+
+
+def test_jobs_of_a_dead_worker_are_reclaimed_after_their_lease(app, user_client):
+	_, user = user_client
+	queue = app.extensions["trip_jobs"]
+	travel = queue.enqueue(user, "Socorro, NM", "Taos, NM")
+	job = travel.job
+	job.status, job.attempts = "running", 1
+	job.started_at = datetime.utcnow() - timedelta(seconds=60)
+	db.session.commit()
+
+	queue.lease_seconds = 3600
+	assert queue._claim() is None
+
+	queue.lease_seconds = 30
+	assert queue._claim() == job
+	assert job.status == "running" and job.attempts == 2
+
+	job.started_at = datetime.utcnow() - timedelta(seconds=60)
+	job.attempts = queue.max_attempts
+	db.session.commit()
+	assert queue._claim() is None
+	assert job.status == "failed" and travel.status == "failed"
+	assert Tripjob.query.filter_by(status="running").count() == 0
+
+
+def test_a_retried_trip_is_counted_once(app, user_client, standin):
+	_, user = user_client
+	queue = app.extensions["trip_jobs"]
+	travel = queue.enqueue(user, "Socorro, NM", "Taos, NM")
+	assert queue.work_once()
+
+	# as if the worker had died before finishing: the job is planned again
+	travel.job.status = "queued"
+	db.session.commit()
+	assert queue.work_once()
+
+	assert travel.job.attempts == 2
+	assert find_route("Socorro, NM", "Taos, NM").times_requested == 1